@@ -0,0 +1,96 @@
+"""Compare the task list serialization paths on a single core.
+
+"orm" is the previous path: ORM instances validated through
+list[TaskResponse], passed through jsonable_encoder and json.dumps.
+"rows" is the current one: plain rows encoded directly with orjson.
+Both include the SELECT against an in-memory SQLite database.
+
+Usage: python benchmarks/bench_serialization.py [--sizes 100 1000 10000] [--seconds 2]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models import Task, TaskPriority, TaskStatus  # noqa: E402
+from app.responses import ORJSONResponse  # noqa: E402
+from app.schemas import TaskResponse  # noqa: E402
+
+TASK_LIST_ADAPTER = TypeAdapter(list[TaskResponse])
+
+
+async def setup(rows: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(TaskStatus), [{"id": 1, "title": "To Do"}])
+        await conn.execute(insert(TaskPriority), [{"id": 1, "title": "Normal"}])
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        await conn.execute(insert(Task), [
+            {
+                "title": f"Task {i}",
+                "description": "Benchmark task " * 4,
+                "status_id": 1,
+                "priority_id": 1,
+                "start_time": start + timedelta(minutes=i),
+                "end_time": start + timedelta(minutes=i + 30),
+            }
+            for i in range(rows)
+        ])
+    return engine
+
+
+async def orm_path(session, limit: int) -> bytes:
+    result = await session.execute(select(Task).order_by(Task.id).limit(limit))
+    tasks = TASK_LIST_ADAPTER.validate_python(result.scalars().all(), from_attributes=True)
+    return json.dumps(jsonable_encoder(tasks), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def rows_path(session, limit: int) -> bytes:
+    result = await session.execute(select(*Task.__table__.columns).order_by(Task.id).limit(limit))
+    return ORJSONResponse([row._asdict() for row in result.all()]).body
+
+
+async def measure(engine, path, limit: int, seconds: float) -> float:
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as session:
+        await path(session, limit)  # warmup
+        session.expunge_all()
+        runs = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            await path(session, limit)
+            session.expunge_all()
+            runs += 1
+        return runs / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'orm req/s':>12} {'rows req/s':>12} {'speedup':>8}")
+    for size in args.sizes:
+        engine = await setup(size)
+        before = await measure(engine, orm_path, size, args.seconds)
+        after = await measure(engine, rows_path, size, args.seconds)
+        await engine.dispose()
+        print(f"{size:>8} {before:>12.1f} {after:>12.1f} {after / before:>7.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,318 @@
+"""Mixed-workload HTTP load test for the task API.
+
+Workers loop over a weighted mix of operations (list, filter, get, create,
+patch, delete) against one of three targets:
+
+  asgi   the app in this process via httpx.ASGITransport, on a scratch copy
+         of a seeded SQLite database (see bench_repositories.py). Client and
+         server share one event loop, so numbers are for comparing changes,
+         not for capacity planning.
+  spawn  uvicorn started here with the app's own config (config/*.yaml),
+         seeded through POST /api/tasks/batch up to --dataset live tasks.
+  URL    an already running server, seeded the same way.
+
+Concurrency is ramped through --concurrency stages of --stage-seconds each.
+Every stage reports throughput, p50/p95/p99 latency and error rate per
+route; the full report is written to --output as JSON.
+
+Usage: python benchmarks/load_harness.py [--target asgi|spawn|http://host:8000] [--dataset 10000]
+       [--concurrency 1 8 32] [--mix list=40 filter=20 get=25 create=7 patch=6 delete=2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from bench_repositories import PRIORITY_IDS, START, STATUS_IDS, git_commit, prepare, summarize, task_row
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_MIX = {"list": 40, "filter": 20, "get": 25, "create": 7, "patch": 6, "delete": 2}
+SEED_BATCH = 1000
+PAGE_SIZE = 1000
+# List requests spread over these so they are not all served by one cached page.
+LIST_SORTS = ["id", "-id", "title", "-created_at", "start_time", "-end_time"]
+LIST_LIMITS = [20, 50, 100]
+
+
+def parse_mix(items: list[str]) -> dict[str, int]:
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"invalid mix entry {item!r}, expected one of {list(DEFAULT_MIX)}=N")
+        mix[name] = int(weight)
+    return mix
+
+
+def task_payload(rng: random.Random) -> dict:
+    row = task_row(rng.randint(0, 1_000_000))
+    return {**row, "start_time": row["start_time"].isoformat(), "end_time": row["end_time"].isoformat()}
+
+
+class Workload:
+    """The operations of the mix. Each returns (route, response)."""
+
+    def __init__(self, client: httpx.AsyncClient, ids: list[int], rng: random.Random):
+        self.client = client
+        self.ids = ids
+        self.rng = rng
+        # Next-page cursor per sort, so list requests also walk deeper pages.
+        self.cursors: dict[str, str] = {}
+
+    def pick_id(self) -> int | None:
+        return self.rng.choice(self.ids) if self.ids else None
+
+    async def list(self):
+        sort = self.rng.choice(LIST_SORTS)
+        params = {"sort": sort, "limit": self.rng.choice(LIST_LIMITS)}
+        cursor = self.cursors.pop(sort, None)
+        if cursor is not None and self.rng.random() < 0.8:
+            params["cursor"] = cursor
+        response = await self.client.get("/api/tasks", params=params)
+        if response.status_code == 200 and "X-Next-Cursor" in response.headers:
+            self.cursors[sort] = response.headers["X-Next-Cursor"]
+        return "GET /api/tasks", response
+
+    async def filter(self):
+        params = {
+            "status_id": self.rng.choice(STATUS_IDS),
+            "priority_id": self.rng.choice(PRIORITY_IDS),
+            "start_time": (START + timedelta(days=self.rng.randint(0, 365))).isoformat(),
+            "limit": 50,
+        }
+        return "GET /api/tasks?filter", await self.client.get("/api/tasks", params=params)
+
+    async def get(self):
+        return "GET /api/tasks/{task_id}", await self.client.get(f"/api/tasks/{self.pick_id()}")
+
+    async def create(self):
+        response = await self.client.post("/api/tasks", json=task_payload(self.rng))
+        if response.status_code == 201:
+            self.ids.append(response.json()["id"])
+        return "POST /api/tasks", response
+
+    async def patch(self):
+        body = {"title": f"Renamed {self.rng.random():.6f}", "status_id": self.rng.choice(STATUS_IDS)}
+        return "PATCH /api/tasks/{task_id}", await self.client.patch(f"/api/tasks/{self.pick_id()}", json=body)
+
+    async def delete(self):
+        if not self.ids:
+            return "DELETE /api/tasks/{task_id}", None
+        # Take the id out of the pool first so other workers stop picking it.
+        index = self.rng.randrange(len(self.ids))
+        self.ids[index], self.ids[-1] = self.ids[-1], self.ids[index]
+        task_id = self.ids.pop()
+        return "DELETE /api/tasks/{task_id}", await self.client.delete(f"/api/tasks/{task_id}")
+
+
+async def run_stage(workload: Workload, mix: dict[str, int], concurrency: int, seconds: float) -> dict:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    timings: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    deadline = time.perf_counter() + seconds
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            operation = getattr(workload, workload.rng.choices(names, weights)[0])
+            started = time.perf_counter()
+            try:
+                route, response = await operation()
+            except httpx.HTTPError:
+                route, response = f"{operation.__name__} (transport error)", None
+            else:
+                if response is None:
+                    continue
+            timings[route].append(time.perf_counter() - started)
+            if response is None or response.status_code >= 400:
+                errors[route] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    routes = {}
+    for route, samples in sorted(timings.items()):
+        stats = summarize(samples) if len(samples) > 1 else {"iterations": len(samples)}
+        routes[route] = {
+            **stats,
+            "rps": len(samples) / elapsed,
+            "errors": errors[route],
+            "error_rate": errors[route] / len(samples),
+        }
+    total = sum(len(samples) for samples in timings.values())
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "rps": total / elapsed,
+        "error_rate": sum(errors.values()) / total if total else 0.0,
+        "routes": routes,
+    }
+
+
+def print_stage(stage: dict) -> None:
+    print(f"\nconcurrency {stage['concurrency']}: {stage['rps']:.1f} req/s, {stage['error_rate']:.2%} errors")
+    print(f"  {'route':<30} {'n':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for route, stats in stage["routes"].items():
+        if "p50_ms" not in stats:
+            continue
+        print(f"  {route:<30} {stats['iterations']:>7} {stats['rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['error_rate']:>7.2%}")
+
+
+async def seed_over_http(client: httpx.AsyncClient, dataset: int, rng: random.Random) -> list[int]:
+    """Top the server up to `dataset` live tasks and return their ids."""
+    response = await client.get("/api/tasks/stats")
+    response.raise_for_status()
+    missing = dataset - response.json()["total"]
+    while missing > 0:
+        batch = [task_payload(rng) for _ in range(min(SEED_BATCH, missing))]
+        response = await client.post("/api/tasks/batch", json=batch, timeout=120)
+        response.raise_for_status()
+        missing -= response.json()["created"]
+
+    ids: list[int] = []
+    params = {"limit": PAGE_SIZE}
+    while len(ids) < dataset:
+        response = await client.get("/api/tasks", params=params)
+        response.raise_for_status()
+        ids.extend(task["id"] for task in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+    return ids
+
+
+async def asgi_client(dataset: int, db_dir: Path, work_dir: Path):
+    """An httpx client bound to the app, backed by a copy of a seeded SQLite database."""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from app.database import get_read_session, get_session, get_sessionmaker
+    from app.main import app
+    from app.metrics import instrument_queries
+    from app.reference import reference_registry
+
+    seeded = await prepare("sqlite", dataset, db_dir, reseed=False)
+    await seeded.dispose()
+    scratch = work_dir / "load_harness.db"
+    shutil.copyfile(db_dir / f"bench_tasks_{dataset}.db", scratch)
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{scratch}")
+    instrument_queries(engine)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def override_get_session():
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_sessionmaker] = lambda: session_maker
+    async with session_maker() as session:
+        await reference_registry.load(session)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://harness"), engine
+
+
+def spawn_server(workers: int) -> tuple[subprocess.Popen, str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR / "src",
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR / "src")},
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, process: subprocess.Popen | None, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {process.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit(f"server not healthy after {timeout:.0f}s")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", default="asgi", help="asgi, spawn or a base URL")
+    parser.add_argument("--dataset", type=int, default=10_000, help="live tasks before the run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--stage-seconds", type=float, default=15.0)
+    parser.add_argument("--warmup-seconds", type=float, default=3.0)
+    parser.add_argument("--mix", nargs="+", type=str, help="operation=weight entries, e.g. list=40 get=30")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --target spawn")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db-dir", type=Path, default=Path(tempfile.gettempdir()))
+    parser.add_argument("--output", type=Path, default=Path("load_harness.json"))
+    args = parser.parse_args()
+    try:
+        mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+
+    rng = random.Random(args.seed)
+    process = engine = None
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.target == "asgi":
+            client, engine = await asgi_client(args.dataset, args.db_dir, Path(work_dir))
+            ids = list(range(1, args.dataset + 1))
+        else:
+            if args.target == "spawn":
+                process, base_url = spawn_server(args.workers)
+            else:
+                base_url = args.target
+            connections = max(args.concurrency)
+            limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+            client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30)
+        try:
+            if args.target != "asgi":
+                await wait_until_healthy(client, process)
+                ids = await seed_over_http(client, args.dataset, rng)
+            workload = Workload(client, ids, rng)
+            if args.warmup_seconds > 0:
+                await run_stage(workload, mix, args.concurrency[0], args.warmup_seconds)
+            stages = []
+            for concurrency in args.concurrency:
+                stage = await run_stage(workload, mix, concurrency, args.stage_seconds)
+                stages.append(stage)
+                print_stage(stage)
+        finally:
+            await client.aclose()
+            if engine is not None:
+                await engine.dispose()
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    args.output.write_text(json.dumps({
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.target,
+        "dataset": args.dataset,
+        "mix": mix,
+        "stages": stages,
+    }, indent=2))
+    print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
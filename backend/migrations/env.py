@@ -0,0 +1,107 @@
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import models  # noqa: F401 - register models on Base.metadata
+from app.config import settings
+from app.database import Base
+from app.search import UNMANAGED_COLUMNS, UNMANAGED_INDEXES, UNMANAGED_TABLES
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Every backend replica runs `alembic upgrade head` before starting; this
+# PostgreSQL advisory lock lets one of them migrate while the others wait.
+MIGRATION_LOCK_KEY = 0x7461736B
+
+
+def get_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or settings.database.url
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Skip search objects that exist in the database but not on the models."""
+    if reflected and compare_to is None:
+        if type_ == "table" and name in UNMANAGED_TABLES:
+            return False
+        if type_ == "column" and name in UNMANAGED_COLUMNS:
+            return False
+        if type_ == "index" and name in UNMANAGED_INDEXES:
+            return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    """Emit migration SQL to stdout without connecting to the database."""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def drop_invalid_indexes(connection: Connection) -> None:
+    """Drop our indexes left INVALID by a failed CREATE INDEX CONCURRENTLY.
+
+    The migrations create indexes with IF NOT EXISTS, which would otherwise
+    keep the broken index forever instead of building it again.
+    """
+    managed = {index.name for table in target_metadata.tables.values() for index in table.indexes}
+    managed |= UNMANAGED_INDEXES
+    invalid = connection.execute(text(
+        "SELECT c.relname FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE NOT i.indisvalid AND n.nspname = current_schema()"
+    )).scalars()
+    quote = connection.dialect.identifier_preparer.quote
+    for name in invalid:
+        if name in managed:
+            connection.execute(text(f"DROP INDEX IF EXISTS {quote(name)}"))
+
+
+def do_run_migrations(connection: Connection) -> None:
+    locked = connection.dialect.name == "postgresql"
+    if locked:
+        # Session-level lock: it survives the commits of autocommit_block().
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        drop_invalid_indexes(connection)
+        connection.commit()
+    try:
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+
+        with context.begin_transaction():
+            context.run_migrations()
+    finally:
+        if locked:
+            connection.rollback()
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
+
+
+async def run_async_migrations() -> None:
+    connectable = create_async_engine(get_url(), poolclass=pool.NullPool)
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_async_migrations())
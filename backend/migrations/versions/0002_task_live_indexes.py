@@ -0,0 +1,51 @@
+"""Partial indexes over non-deleted tasks.
+
+Each index leads with a TaskRepository filter or sort column and ends with id,
+so filtered lists and keyset pages are served by an index range scan.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_TASKS = sa.text("deleted_at IS NULL")
+
+INDEXES = {
+    "ix_tasks_live_status_id": ["status_id", "id"],
+    "ix_tasks_live_priority_id": ["priority_id", "id"],
+    "ix_tasks_live_start_time": ["start_time", "id"],
+    "ix_tasks_live_end_time": ["end_time", "id"],
+    "ix_tasks_live_created_at": ["created_at", "id"],
+    "ix_tasks_live_title": ["title", "id"],
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the table writable while indexes build, but cannot run
+    # inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                "tasks",
+                columns,
+                postgresql_where=LIVE_TASKS,
+                sqlite_where=LIVE_TASKS,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name="tasks", postgresql_concurrently=True, if_exists=True)
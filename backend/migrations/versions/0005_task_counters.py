@@ -0,0 +1,34 @@
+"""Live task counters per status and priority.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_counters",
+        sa.Column("status_id", sa.Integer(), nullable=False),
+        sa.Column("priority_id", sa.Integer(), nullable=False),
+        sa.Column("live_count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("status_id", "priority_id"),
+    )
+    op.execute(
+        "INSERT INTO task_counters (status_id, priority_id, live_count) "
+        "SELECT status_id, priority_id, count(*) FROM tasks "
+        "WHERE deleted_at IS NULL GROUP BY status_id, priority_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("task_counters")
@@ -0,0 +1,50 @@
+"""Server-maintained updated_at on tasks for delta sync.
+
+Existing rows are stamped with the migration time. On PostgreSQL 11+ the
+column is added with a non-volatile default, so the table is not rewritten;
+the index is built CONCURRENTLY. It is not partial: the change feed reports
+soft-deleted tasks too.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == "sqlite":
+        # SQLite only accepts constant defaults in ADD COLUMN.
+        op.add_column(
+            "tasks",
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default="1970-01-01 00:00:00"),
+        )
+        op.execute("UPDATE tasks SET updated_at = CURRENT_TIMESTAMP")
+    else:
+        op.add_column(
+            "tasks",
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_updated_at",
+            "tasks",
+            ["updated_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_tasks_updated_at", table_name="tasks", postgresql_concurrently=True, if_exists=True)
+    # Native DROP COLUMN (SQLite 3.35+) keeps the search triggers on tasks intact.
+    op.drop_column("tasks", "updated_at")
@@ -0,0 +1,30 @@
+"""is_final flag on task_statuses, marking the statuses that end a task.
+
+The stats endpoint excludes tasks in a final status from the overdue count.
+Existing databases have the seeded "Done" status flagged.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "task_statuses",
+        sa.Column("is_final", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.execute("UPDATE task_statuses SET is_final = true WHERE title = 'Done'")
+
+
+def downgrade() -> None:
+    op.drop_column("task_statuses", "is_final")
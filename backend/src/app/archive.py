@@ -0,0 +1,99 @@
+"""Move old soft-deleted tasks out of the live table.
+
+Every worker runs TaskArchiver in the background. Each run moves tasks
+deleted more than `retention_days` ago to tasks_archive in batches of
+`batch_size`, one transaction per batch with a pause in between, then
+refreshes the table size metrics. Batches lock with SKIP LOCKED, so
+workers running at the same time split the work instead of blocking.
+
+Usage: python -m app.archive
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import ArchiveSettings, settings
+from app.database import AsyncSessionLocal
+from app.metrics import TASKS_ARCHIVED, TASKS_TABLE_BYTES, TASKS_TABLE_ROWS
+from app.repositories import TaskCounterRepository, TaskRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_table_metrics(session: AsyncSession) -> None:
+    total, size = await TaskRepository(session).table_stats()
+    live = sum((await TaskCounterRepository(session).get_counts()).values())
+    TASKS_TABLE_ROWS.labels("live").set(live)
+    TASKS_TABLE_ROWS.labels("deleted").set(max(total - live, 0))
+    if size is not None:
+        TASKS_TABLE_BYTES.set(size)
+
+
+class TaskArchiver:
+    """Batched, throttled archiving of tasks deleted before the retention period."""
+
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession], archive_settings: ArchiveSettings):
+        self.session_maker = session_maker
+        self.settings = archive_settings
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> int:
+        """Archive up to max_batches_per_run batches. Returns the number of tasks moved."""
+        deleted_before = datetime.now(timezone.utc) - timedelta(days=self.settings.retention_days)
+        moved = 0
+        for batch in range(self.settings.max_batches_per_run):
+            if batch:
+                await asyncio.sleep(self.settings.pause_seconds)
+            async with self.session_maker() as session:
+                ids = await TaskRepository(session).archive_deleted(deleted_before, self.settings.batch_size)
+                await session.commit()
+            TASKS_ARCHIVED.inc(len(ids))
+            moved += len(ids)
+            if len(ids) < self.settings.batch_size:
+                break
+        async with self.session_maker() as session:
+            await refresh_table_metrics(session)
+        if moved:
+            logger.info("Archived %s deleted tasks", moved)
+        return moved
+
+    def start(self) -> None:
+        if self.settings.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            # Sleep first: pods starting during a scale-out should not add load.
+            await asyncio.sleep(self.settings.interval_seconds)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task archive run failed")
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    archiver = TaskArchiver(AsyncSessionLocal, settings.archive)
+    total = 0
+    # A single run is bounded by max_batches_per_run; keep going until done.
+    while moved := await archiver.run_once():
+        total += moved
+    print(f"archived={total}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
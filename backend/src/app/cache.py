@@ -0,0 +1,167 @@
+"""Result cache for task reads.
+
+Entries are JSON bytes, so the same TaskCache works over the in-process
+MemoryCache and over any networked store adapted by RemoteCache (shared by
+all replicas). Keys include the tasks table version, which readers take
+from the same session as the data. The cache is whole-table: any task
+write bumps that version and so retires every cached page and task on
+every process at once. Nothing is ever deleted; old entries simply stop
+being read and age out by TTL or LRU. A read that raced a write can only
+store its result under the version it read. Missing tasks are cached too,
+for a shorter time.
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Protocol
+
+import orjson
+
+from app.config import CacheSettings, settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+
+class CacheClient(Protocol):
+    """Subset of the redis.asyncio.Redis API used by RemoteCache."""
+
+    async def get(self, name: str) -> bytes | None: ...
+
+    async def set(self, name: str, value: bytes, px: int | None = None) -> Any: ...
+
+
+class NullCache:
+    """Backend that stores nothing; used when caching is disabled."""
+
+    async def get(self, key: str) -> bytes | None:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+
+class MemoryCache:
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RemoteCache:
+    """Backend over a networked key-value store shared by all processes.
+
+    Store errors are logged and treated as misses, so an unavailable cache
+    only costs database queries.
+    """
+
+    def __init__(self, client: CacheClient, prefix: str = "task-manager:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self.client.get(self.prefix + key)
+        except Exception:
+            logger.warning("Cache get failed", exc_info=True)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            await self.client.set(self.prefix + key, value, px=max(int(ttl * 1000), 1))
+        except Exception:
+            logger.warning("Cache set failed", exc_info=True)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat()
+    return value
+
+
+class TaskCache:
+    """Cached task pages and single tasks on top of a CacheBackend."""
+
+    def __init__(self, backend: CacheBackend, ttl: float = 30.0, negative_ttl: float = 5.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    def page_key(self, version: int, params: dict[str, Any]) -> str:
+        """Key for a list page read under the given tasks table version."""
+        normalized = {name: _normalize(value) for name, value in params.items()}
+        digest = hashlib.sha1(orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        return f"tasks:list:{version}:{digest}"
+
+    def task_key(self, version: int, task_id: int) -> str:
+        """Key for a single task read under the given tasks table version."""
+        return f"tasks:item:{version}:{task_id}"
+
+    async def get_page(self, key: str) -> dict[str, Any] | None:
+        """Cached {"etag", "next_cursor", "tasks"} page, or None."""
+        value = await self.backend.get(key)
+        return orjson.loads(value) if value is not None else None
+
+    async def set_page(self, key: str, page: dict[str, Any]) -> None:
+        await self.backend.set(key, orjson.dumps(page, option=orjson.OPT_UTC_Z), self.ttl)
+
+    async def get_task(self, key: str) -> dict[str, Any] | None:
+        """Cached {"etag", "task"} entry, or None. A None task means it does not exist."""
+        value = await self.backend.get(key)
+        return orjson.loads(value) if value is not None else None
+
+    async def set_task(self, key: str, etag: str | None, task: dict[str, Any] | None) -> None:
+        ttl = self.ttl if task is not None else self.negative_ttl
+        await self.backend.set(key, orjson.dumps({"etag": etag, "task": task}, option=orjson.OPT_UTC_Z), ttl)
+
+
+def build_backend(cache_settings: CacheSettings) -> CacheBackend:
+    if cache_settings.backend == "memory":
+        return MemoryCache(cache_settings.max_entries)
+    if cache_settings.backend == "redis":
+        # Optional dependency, only needed when the shared cache is enabled.
+        from redis.asyncio import Redis
+
+        return RemoteCache(Redis.from_url(cache_settings.url))
+    return NullCache()
+
+
+task_cache = TaskCache(
+    build_backend(settings.cache),
+    ttl=settings.cache.ttl_seconds,
+    negative_ttl=settings.cache.negative_ttl_seconds,
+)
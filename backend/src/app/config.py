@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 from pydantic import BaseModel, Field
@@ -29,6 +29,13 @@ def load_yaml(path: Path) -> dict[str, Any]:
     return data if isinstance(data, dict) else {}
 
 
+class ReplicaSettings(BaseModel):
+    """Read-only replica; credentials and database name are shared with the primary."""
+
+    host: str
+    port: int = 5432
+
+
 class DatabaseSettings(BaseModel):
     host: str = "localhost"
     port: int = 5432
@@ -36,14 +43,100 @@ class DatabaseSettings(BaseModel):
     password: str = "postgres"
     name: str = "tasks_db"
 
+    # Connection pool, per process. Keep replicas * (pool_size + max_overflow)
+    # below Postgres max_connections (100 by default): 6 pods * 10 = 60.
+    pool_size: int = Field(default=5, ge=1)
+    max_overflow: int = Field(default=5, ge=0)
+    pool_timeout: float = Field(default=10.0, gt=0)
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    # asyncpg prepared statement cache per connection; set to 0 behind PgBouncer
+    # in transaction pooling mode.
+    prepared_statement_cache_size: int = Field(default=100, ge=0)
+
+    # Streaming replicas serving GET requests; empty means everything goes to the primary.
+    replicas: list[ReplicaSettings] = Field(default_factory=list)
+    # A replica that failed to connect is skipped for this long.
+    replica_connect_timeout: float = Field(default=2.0, gt=0)
+    replica_retry_seconds: float = Field(default=30.0, ge=0)
+    # After a successful write a client reads from the primary for this long, so it
+    # sees its own changes despite replication lag. 0 disables stickiness.
+    read_your_writes_seconds: int = Field(default=5, ge=0)
+
     @property
     def url(self) -> str:
-        return f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
+        return self.url_for(self.host, self.port)
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [self.url_for(replica.host, replica.port) for replica in self.replicas]
+
+    def url_for(self, host: str, port: int) -> str:
+        return f"postgresql+asyncpg://{self.user}:{self.password}@{host}:{port}/{self.name}"
+
+    def engine_options(self) -> dict[str, Any]:
+        """Keyword arguments for create_async_engine."""
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+            "connect_args": {"prepared_statement_cache_size": self.prepared_statement_cache_size},
+        }
+
+    def replica_engine_options(self) -> dict[str, Any]:
+        """Engine options for replicas: fail fast on connect so reads fall back quickly."""
+        options = self.engine_options()
+        options["connect_args"] = {**options["connect_args"], "timeout": self.replica_connect_timeout}
+        return options
+
+
+class CacheSettings(BaseModel):
+    # Entries are keyed by the tasks table version, so every backend is safe
+    # with several replicas. "memory" is per process; "redis" shares entries
+    # between processes and needs the redis package (see requirements.txt).
+    backend: Literal["none", "memory", "redis"] = "memory"
+    url: str = "redis://localhost:6379/0"
+    ttl_seconds: float = Field(default=30.0, gt=0)
+    negative_ttl_seconds: float = Field(default=5.0, gt=0)
+    max_entries: int = Field(default=10_000, ge=1)
+
+
+class ArchiveSettings(BaseModel):
+    # Soft-deleted tasks older than retention_days are moved to tasks_archive
+    # by a background job in every worker; SKIP LOCKED lets workers share it.
+    enabled: bool = True
+    retention_days: int = Field(default=30, ge=1)
+    batch_size: int = Field(default=1000, ge=1)
+    # Pause between batches so the job never saturates the primary.
+    pause_seconds: float = Field(default=0.5, ge=0)
+    max_batches_per_run: int = Field(default=100, ge=1)
+    interval_seconds: float = Field(default=3600.0, gt=0)
+
+
+class SlowQuerySettings(BaseModel):
+    # Statements slower than threshold_ms are logged with their parameters,
+    # route and plan. Sampling and the per-minute cap bound the logging cost.
+    enabled: bool = True
+    threshold_ms: float = Field(default=200.0, ge=0)
+    sample_rate: float = Field(default=1.0, ge=0, le=1)
+    max_per_minute: int = Field(default=10, ge=0)
+    # EXPLAIN runs on a separate connection; SELECTs are re-executed with
+    # ANALYZE on PostgreSQL, bounded by explain_timeout_ms.
+    explain: bool = True
+    explain_timeout_ms: int = Field(default=5000, ge=1)
+    max_parameter_length: int = Field(default=200, ge=1)
 
 
 class Settings(BaseModel):
     debug: bool = Field(default=False)
     database: DatabaseSettings = Field(default_factory=DatabaseSettings)
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    archive: ArchiveSettings = Field(default_factory=ArchiveSettings)
+    slow_queries: SlowQuerySettings = Field(default_factory=SlowQuerySettings)
+    # "auto" seeds reference data only when the stored seed version is outdated.
+    startup_seed: Literal["auto", "always", "never"] = "auto"
 
     class Config:
         arbitrary_types_allowed = True
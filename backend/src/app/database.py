@@ -1,34 +1,138 @@
+import asyncio
+import itertools
+import time
 from typing import AsyncGenerator
 
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.metrics import DB_POOL_CHECKOUT_WAIT, instrument_pool, instrument_queries
+from app.slow_queries import SlowQueryLog
+
+# Set on responses to successful writes; while present, reads go to the primary.
+READ_PRIMARY_COOKIE = "read_primary"
 
 
 class Base(DeclarativeBase):
     """Base class for all ORM models."""
 
 
-async_engine = create_async_engine(settings.database.url, echo=settings.debug, future=True)
-AsyncSessionLocal = async_sessionmaker(
-    async_engine,
-    expire_on_commit=False,
-    class_=AsyncSession,
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+class ReadRouter:
+    """Round-robin over replica session factories with fallback to the primary.
+
+    A replica that fails to connect is skipped for retry_seconds.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replicas: list[async_sessionmaker[AsyncSession]],
+        retry_seconds: float = 30.0,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self._next = itertools.count()
+        self._down_until: dict[int, float] = {}
+
+    def candidates(self) -> list[async_sessionmaker[AsyncSession]]:
+        """Healthy replicas starting from the next one in turn, then the primary."""
+        if not self.replicas:
+            return [self.primary]
+        start = next(self._next) % len(self.replicas)
+        now = time.monotonic()
+        ordered = self.replicas[start:] + self.replicas[:start]
+        healthy = [maker for maker in ordered if self._down_until.get(id(maker), 0.0) <= now]
+        return healthy + [self.primary]
+
+    def mark_down(self, maker: async_sessionmaker[AsyncSession]) -> None:
+        self._down_until[id(maker)] = time.monotonic() + self.retry_seconds
+
+    async def open_session(self) -> AsyncSession:
+        """Open a session on the first candidate that accepts a connection."""
+        candidates = self.candidates()
+        for maker in candidates[:-1]:
+            session = maker()
+            try:
+                await session.connection()
+            except (DBAPIError, OSError, PoolTimeoutError, asyncio.TimeoutError):
+                await session.close()
+                self.mark_down(maker)
+                continue
+            return session
+        return candidates[-1]()
+
+
+def _make_sessionmaker(engine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+async_engine = create_async_engine(
+    settings.database.url,
+    echo=settings.debug,
+    future=True,
+    poolclass=InstrumentedQueuePool,
+    **settings.database.engine_options(),
+)
+instrument_pool(async_engine)
+instrument_queries(async_engine)
+slow_query_log = SlowQueryLog(settings.slow_queries)
+slow_query_log.instrument(async_engine)
+AsyncSessionLocal = _make_sessionmaker(async_engine)
+
+replica_engines = [
+    create_async_engine(url, echo=settings.debug, future=True, **settings.database.replica_engine_options())
+    for url in settings.database.replica_urls
+]
+for engine in replica_engines:
+    instrument_queries(engine)
+    slow_query_log.instrument(engine)
+read_router = ReadRouter(
+    AsyncSessionLocal,
+    [_make_sessionmaker(engine) for engine in replica_engines],
+    retry_seconds=settings.database.replica_retry_seconds,
 )
 
 
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Session factory for responses that outlive the request dependencies (streaming)."""
+    return AsyncSessionLocal
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Yield an async database session for FastAPI dependencies."""
     async with AsyncSessionLocal() as session:
         yield session
 
 
-async def create_tables() -> None:
-    """Create all tables in the database."""
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Yield a session for read-only work, on a replica when one is available.
+
+    Clients that wrote recently (READ_PRIMARY_COOKIE) read from the primary.
+    """
+    if READ_PRIMARY_COOKIE in request.cookies:
+        session = AsyncSessionLocal()
+    else:
+        session = await read_router.open_session()
+    async with session:
+        yield session
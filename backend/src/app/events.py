@@ -0,0 +1,250 @@
+"""Task change feed.
+
+Write paths call notify_task_events() inside their transaction. On
+PostgreSQL that is a pg_notify on TASK_EVENTS_CHANNEL, delivered to every
+worker on commit and picked up by TaskEventListener; elsewhere the events
+are published to the local broker after commit. The broker fans events out
+to subscribers (SSE/WebSocket clients) without ever blocking the publisher:
+each subscriber keeps only the latest change per task, and one that falls
+too far behind is told to resync instead.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Iterable
+from typing import Any, Literal
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+logger = logging.getLogger(__name__)
+
+TaskEventType = Literal["created", "updated", "deleted"]
+
+TASK_EVENTS_CHANNEL = "task_events"
+RESYNC = "resync"
+# NOTIFY payloads must stay under 8000 bytes.
+MAX_NOTIFY_IDS = 500
+MAX_PENDING_PER_SUBSCRIBER = 1000
+# Session.info key for messages waiting on commit when there is no NOTIFY.
+_PENDING_KEY = "pending_task_events"
+
+# Later events on the same task override earlier ones, except that a task
+# created and then updated is still new to the subscriber.
+_COALESCE = {("created", "updated"): "created"}
+
+
+class Subscription:
+    """One consumer's queue of pending changes, coalesced per task."""
+
+    def __init__(self, broker: "EventBroker", max_pending: int):
+        self._broker = broker
+        self._max_pending = max_pending
+        self._pending: dict[int, TaskEventType] = {}
+        self._overflowed = False
+        self._ready = asyncio.Event()
+
+    def push(self, event_type: TaskEventType, task_ids: Iterable[int]) -> None:
+        if self._overflowed:
+            return
+        for task_id in task_ids:
+            previous = self._pending.get(task_id)
+            self._pending[task_id] = _COALESCE.get((previous, event_type), event_type)
+        if len(self._pending) > self._max_pending:
+            # Too slow to keep up: drop the backlog and ask for a full refetch.
+            self.resync()
+        self._ready.set()
+
+    def resync(self) -> None:
+        """Replace pending changes with a request to refetch everything."""
+        self._pending.clear()
+        self._overflowed = True
+        self._ready.set()
+
+    def drain(self) -> dict[str, list[int]] | None:
+        """Take pending changes as {"created": [...], ...}; None means resync."""
+        self._ready.clear()
+        if self._overflowed:
+            self._overflowed = False
+            return None
+        batch: dict[str, list[int]] = {"created": [], "updated": [], "deleted": []}
+        for task_id, event_type in self._pending.items():
+            batch[event_type].append(task_id)
+        self._pending.clear()
+        return batch
+
+    async def wait(self, timeout: float | None = None) -> bool:
+        """Wait until changes are pending. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+
+class EventBroker:
+    """In-process fan-out of task events to subscriptions."""
+
+    def __init__(self, max_pending: int = MAX_PENDING_PER_SUBSCRIBER):
+        self.max_pending = max_pending
+        self._subscriptions: set[Subscription] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self.max_pending)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event_type: TaskEventType, task_ids: Iterable[int]) -> None:
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        for subscription in self._subscriptions:
+            subscription.push(event_type, task_ids)
+
+    def resync(self) -> None:
+        for subscription in self._subscriptions:
+            subscription.resync()
+
+    def publish_message(self, message: dict[str, Any]) -> None:
+        if message["type"] == RESYNC:
+            self.resync()
+        else:
+            self.publish(message["type"], message["ids"])
+
+    def publish_payload(self, payload: str) -> None:
+        """Publish a NOTIFY payload produced by notify_task_events."""
+        try:
+            self.publish_message(json.loads(payload))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed task event payload: %r", payload)
+
+
+task_events = EventBroker()
+
+
+async def notify_task_events(session: AsyncSession, event_type: TaskEventType, task_ids: Iterable[int]) -> None:
+    """Announce task changes once the session's transaction commits."""
+    task_ids = list(task_ids)
+    for start in range(0, len(task_ids), MAX_NOTIFY_IDS):
+        await _announce(session, {"type": event_type, "ids": task_ids[start : start + MAX_NOTIFY_IDS]})
+
+
+async def notify_task_resync(session: AsyncSession) -> None:
+    """Tell subscribers to refetch everything, for writes whose ids are not known."""
+    await _announce(session, {"type": RESYNC})
+
+
+async def _announce(session: AsyncSession, message: dict[str, Any]) -> None:
+    if session.bind is not None and session.bind.dialect.name == "postgresql":
+        await session.execute(select(func.pg_notify(TASK_EVENTS_CHANNEL, json.dumps(message))))
+        return
+
+    sync_session = session.sync_session
+    pending = sync_session.info.get(_PENDING_KEY)
+    if pending is None:
+        pending = sync_session.info[_PENDING_KEY] = []
+        event.listen(sync_session, "after_commit", _publish_pending)
+        event.listen(sync_session, "after_soft_rollback", _drop_pending)
+    pending.append(message)
+
+
+def _publish_pending(sync_session) -> None:
+    pending = sync_session.info[_PENDING_KEY]
+    messages, pending[:] = list(pending), []
+    for message in messages:
+        task_events.publish_message(message)
+
+
+def _drop_pending(sync_session, _previous_transaction) -> None:
+    # A rolled back savepoint leaves the outer transaction, and its events, in place.
+    if not sync_session.in_transaction():
+        sync_session.info[_PENDING_KEY].clear()
+
+
+class TaskEventListener:
+    """LISTEN on TASK_EVENTS_CHANNEL and publish notifications to the broker.
+
+    Holds one dedicated connection per worker, opened outside the engine's
+    pool so it never takes a slot from requests, and reconnects with backoff;
+    subscribers are told to resync after a reconnect since notifications
+    sent meanwhile are lost.
+    """
+
+    def __init__(self, engine: AsyncEngine, broker: EventBroker, max_backoff: float = 30.0):
+        self.engine = engine
+        self.broker = broker
+        self.max_backoff = max_backoff
+        self._task: asyncio.Task | None = None
+        self._listen_engine: AsyncEngine | None = None
+
+    def start(self) -> None:
+        if self.engine.dialect.name == "postgresql" and self._task is None:
+            self._listen_engine = create_async_engine(self.engine.url, poolclass=NullPool)
+            self._task = asyncio.create_task(self._run(self._listen_engine))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._listen_engine is not None:
+            await self._listen_engine.dispose()
+            self._listen_engine = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self.broker.publish_payload(payload)
+
+    async def _run(self, engine: AsyncEngine) -> None:
+        backoff = 1.0
+        connected_before = False
+        while True:
+            try:
+                async with engine.connect() as connection:
+                    raw = await connection.get_raw_connection()
+                    driver = raw.driver_connection
+                    lost = asyncio.Event()
+                    driver.add_termination_listener(lambda _conn: lost.set())
+                    await driver.add_listener(TASK_EVENTS_CHANNEL, self._on_notify)
+                    if connected_before:
+                        self.broker.resync()
+                    connected_before = True
+                    backoff = 1.0
+                    await lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Task event listener lost its connection", exc_info=True)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+
+async def sse_stream(subscription: Subscription, heartbeat: float = 15.0) -> AsyncIterator[str]:
+    """Server-sent events for a subscription; closes it when the client goes away."""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            if not await subscription.wait(heartbeat):
+                # Comment line keeps proxies from closing an idle stream.
+                yield ": keep-alive\n\n"
+                continue
+            batch = subscription.drain()
+            if batch is None:
+                yield f"event: {RESYNC}\ndata: {{}}\n\n"
+            elif any(batch.values()):
+                yield f"event: tasks\ndata: {json.dumps(batch)}\n\n"
+    finally:
+        subscription.close()
@@ -0,0 +1,49 @@
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, Literal, Mapping
+
+import orjson
+
+from app.models import Task as TaskModel
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_COLUMNS = [column.name for column in TaskModel.__table__.columns]
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def encode_ndjson(rows: Iterable[Mapping[str, Any]]) -> bytes:
+    """One JSON object per line, encoded like API responses."""
+    return b"".join(orjson.dumps(dict(row), option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+def encode_csv(rows: Iterable[Mapping[str, Any]], *, header: bool = False) -> bytes:
+    """CSV rows in EXPORT_COLUMNS order; datetimes as ISO 8601, NULL as empty field."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(
+            [value.isoformat() if isinstance(value, datetime) else value for value in (row[c] for c in EXPORT_COLUMNS)]
+        )
+    return buffer.getvalue().encode()
+
+
+async def encode_stream(
+    batches: AsyncIterator[list[Mapping[str, Any]]],
+    export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Encode row batches into response chunks, one chunk per batch."""
+    if export_format == "csv":
+        # The header goes out before the first row is fetched.
+        yield encode_csv([], header=True)
+        async for batch in batches:
+            yield encode_csv(batch)
+    else:
+        async for batch in batches:
+            yield encode_ndjson(batch)
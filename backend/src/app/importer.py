@@ -0,0 +1,298 @@
+"""Bulk import of tasks from CSV or NDJSON.
+
+On PostgreSQL rows are loaded with asyncpg's binary COPY into a temporary
+staging table, validated against the reference tables and merged into
+`tasks` with one INSERT ... SELECT. Other databases fall back to batched
+multi-row INSERTs.
+
+Usage: python -m app.importer tasks.csv [--format csv|ndjson]
+"""
+
+import argparse
+import asyncio
+import csv
+import heapq
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Iterator, Literal
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.reference import ReferenceData, reference_registry
+from app.repositories import TableVersionRepository, TaskCounterRepository, TaskRepository
+
+ImportFormat = Literal["csv", "ndjson"]
+
+BATCH_SIZE = 50_000
+MAX_REPORTED_REJECTIONS = 1000
+STAGING_TABLE = "tasks_import_staging"
+STAGING_COLUMNS = ["row_no", "title", "description", "status_id", "priority_id", "start_time", "end_time"]
+TITLE_MAX_LENGTH = 255
+# Reference ids are PostgreSQL integer columns; larger values would fail the COPY.
+INT_MIN, INT_MAX = -(2**31), 2**31 - 1
+
+
+class RowError(ValueError):
+    """A single input row cannot be imported."""
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    imported: int = 0
+    rejected: int = 0
+    rejections: list[tuple[int, str]] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    # Max-heap on row number, so the lowest MAX_REPORTED_REJECTIONS rows are kept
+    # whichever pass (parsing or the reference check) rejected them.
+    _lowest: list[tuple[int, str]] = field(default_factory=list, repr=False)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.imported / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def reject(self, row_no: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self._lowest) < MAX_REPORTED_REJECTIONS:
+            heapq.heappush(self._lowest, (-row_no, reason))
+        elif -self._lowest[0][0] > row_no:
+            heapq.heapreplace(self._lowest, (-row_no, reason))
+
+    def finish(self, elapsed_seconds: float) -> None:
+        self.rejections = sorted((-row_no, reason) for row_no, reason in self._lowest)
+        self.elapsed_seconds = elapsed_seconds
+
+
+def iter_raw_rows(stream: IO[str], import_format: ImportFormat) -> Iterator[tuple[int, Any]]:
+    """Yield (row number, raw row) pairs; row numbers are 1-based and skip the CSV header."""
+    if import_format == "csv":
+        yield from enumerate(csv.DictReader(stream), start=1)
+        return
+
+    row_no = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row_no += 1
+        try:
+            yield row_no, json.loads(line)
+        except json.JSONDecodeError:
+            yield row_no, None
+
+
+def _optional(raw: dict[str, Any], key: str) -> Any:
+    value = raw.get(key)
+    return None if value is None or value == "" else value
+
+
+def _parse_int(raw: dict[str, Any], key: str, default: int | None) -> int | None:
+    value = _optional(raw, key)
+    if value is None:
+        return default
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise RowError(f"Invalid {key}")
+    try:
+        parsed = int(value)
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise RowError(f"Invalid {key}") from exc
+    if not INT_MIN <= parsed <= INT_MAX:
+        raise RowError(f"Invalid {key}")
+    return parsed
+
+
+def _parse_datetime(raw: dict[str, Any], key: str) -> datetime | None:
+    value = _optional(raw, key)
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError) as exc:
+        raise RowError(f"Invalid {key}") from exc
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def coerce_row(row_no: int, raw: Any, reference: ReferenceData) -> tuple:
+    """Convert a raw row into a staging record ordered as STAGING_COLUMNS."""
+    if not isinstance(raw, dict):
+        raise RowError("Row is not an object")
+
+    title = _optional(raw, "title")
+    if not isinstance(title, str) or not title.strip():
+        raise RowError("Missing title")
+    if len(title) > TITLE_MAX_LENGTH:
+        raise RowError("Title too long")
+    # PostgreSQL text cannot hold NUL; one would fail the whole COPY.
+    if "\x00" in title:
+        raise RowError("Invalid title")
+
+    description = _optional(raw, "description")
+    if description is not None and (not isinstance(description, str) or "\x00" in description):
+        raise RowError("Invalid description")
+
+    return (
+        row_no,
+        title,
+        description,
+        _parse_int(raw, "status_id", reference.default_status_id),
+        _parse_int(raw, "priority_id", reference.default_priority_id),
+        _parse_datetime(raw, "start_time"),
+        _parse_datetime(raw, "end_time"),
+    )
+
+
+def iter_batches(
+    stream: IO[str],
+    import_format: ImportFormat,
+    reference: ReferenceData,
+    report: ImportReport,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[list[tuple]]:
+    """Parse input into batches of staging records, recording unparsable rows."""
+    batch: list[tuple] = []
+    for row_no, raw in iter_raw_rows(stream, import_format):
+        report.total += 1
+        try:
+            batch.append(coerce_row(row_no, raw, reference))
+        except RowError as exc:
+            report.reject(row_no, str(exc))
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _import_postgresql(session: AsyncSession, batches: Iterator[list[tuple]], report: ImportReport) -> None:
+    await session.execute(
+        text(
+            f"CREATE TEMP TABLE {STAGING_TABLE} ("
+            "row_no integer, title text, description text, status_id integer, priority_id integer, "
+            "start_time timestamptz, end_time timestamptz"
+            ") ON COMMIT DROP"
+        )
+    )
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver = raw_connection.driver_connection
+
+    for batch in batches:
+        await driver.copy_records_to_table(STAGING_TABLE, records=batch, columns=STAGING_COLUMNS)
+        # Yield to the event loop between batches; parsing is synchronous.
+        await asyncio.sleep(0)
+
+    invalid = await session.execute(
+        text(
+            f"SELECT s.row_no, CASE WHEN st.id IS NULL THEN 'Invalid status_id' ELSE 'Invalid priority_id' END "
+            f"FROM {STAGING_TABLE} s "
+            "LEFT JOIN task_statuses st ON st.id = s.status_id "
+            "LEFT JOIN task_priorities pr ON pr.id = s.priority_id "
+            "WHERE st.id IS NULL OR pr.id IS NULL "
+            "ORDER BY s.row_no"
+        )
+    )
+    for row_no, reason in invalid:
+        report.reject(row_no, reason)
+
+    # now() would stamp every row with the transaction start, possibly long
+    # before commit; clock_timestamp() keeps delta sync tokens close behind.
+    merged = await session.execute(
+        text(
+            "INSERT INTO tasks (title, description, status_id, priority_id, start_time, end_time, updated_at) "
+            "SELECT s.title, s.description, s.status_id, s.priority_id, s.start_time, s.end_time, clock_timestamp() "
+            f"FROM {STAGING_TABLE} s "
+            "JOIN task_statuses st ON st.id = s.status_id "
+            "JOIN task_priorities pr ON pr.id = s.priority_id "
+            "ORDER BY s.row_no"
+        )
+    )
+    report.imported = merged.rowcount
+    if report.imported:
+        counts = await session.execute(
+            text(
+                "SELECT s.status_id, s.priority_id, count(*) "
+                f"FROM {STAGING_TABLE} s "
+                "JOIN task_statuses st ON st.id = s.status_id "
+                "JOIN task_priorities pr ON pr.id = s.priority_id "
+                "GROUP BY s.status_id, s.priority_id"
+            )
+        )
+        await TaskCounterRepository(session).apply(
+            Counter({(status_id, priority_id): count for status_id, priority_id, count in counts})
+        )
+        await TableVersionRepository(session).bump("tasks")
+
+
+async def _import_generic(
+    session: AsyncSession,
+    batches: Iterator[list[tuple]],
+    reference: ReferenceData,
+    report: ImportReport,
+) -> None:
+    repo = TaskRepository(session)
+    for batch in batches:
+        rows = []
+        for record in batch:
+            values = dict(zip(STAGING_COLUMNS, record))
+            row_no = values.pop("row_no")
+            if not reference.status_exists(values["status_id"]):
+                report.reject(row_no, "Invalid status_id")
+            elif not reference.priority_exists(values["priority_id"]):
+                report.reject(row_no, "Invalid priority_id")
+            else:
+                rows.append(values)
+        await repo.create_many(rows)
+        report.imported += len(rows)
+
+
+async def import_tasks(
+    session: AsyncSession,
+    stream: IO[str],
+    import_format: ImportFormat,
+    reference: ReferenceData,
+    *,
+    batch_size: int = BATCH_SIZE,
+) -> ImportReport:
+    """Import tasks from a text stream and commit. Invalid rows are skipped and reported."""
+    report = ImportReport()
+    started = time.perf_counter()
+    batches = iter_batches(stream, import_format, reference, report, batch_size)
+
+    if session.bind is not None and session.bind.dialect.name == "postgresql":
+        await _import_postgresql(session, batches, report)
+    else:
+        await _import_generic(session, batches, reference, report)
+    await session.commit()
+
+    report.finish(time.perf_counter() - started)
+    return report
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import tasks from CSV or NDJSON.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], dest="import_format")
+    args = parser.parse_args()
+    import_format = args.import_format or ("ndjson" if args.path.suffix in {".ndjson", ".jsonl"} else "csv")
+
+    async with AsyncSessionLocal() as session:
+        reference = await reference_registry.load(session)
+        with open(args.path, encoding="utf-8", newline="") as stream:
+            report = await import_tasks(session, stream, import_format, reference)
+
+    print(
+        f"imported={report.imported} rejected={report.rejected} total={report.total} "
+        f"elapsed={report.elapsed_seconds:.2f}s rate={report.rows_per_second:.0f} rows/s"
+    )
+    for row_no, reason in report.rejections:
+        print(f"row {row_no}: {reason}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,21 +1,41 @@
+import logging
 from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
 
+from app.archive import TaskArchiver
 from app.config import settings
-from app.database import create_tables
+from app.database import AsyncSessionLocal, async_engine, read_router, replica_engines
+from app.events import TaskEventListener, task_events
+from app.metrics import record_startup
+from app.middleware import QueryStatsMiddleware, ReadYourWritesMiddleware
 from app.models import Task, TaskPriority, TaskStatus  # noqa: F401 - ensure models are loaded
+from app.reference import reference_registry
+from app.responses import ORJSONResponse
 from app.routers import priorities, statuses, tasks
 from app.seed import seed_all
 
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await create_tables()
-    await seed_all()
+    # Schema is managed by Alembic (`alembic upgrade head`) before the app starts.
+    await seed_all(settings.startup_seed)
+    async with AsyncSessionLocal() as session:
+        await reference_registry.load(session)
+    listener = TaskEventListener(async_engine, task_events)
+    listener.start()
+    archiver = TaskArchiver(AsyncSessionLocal, settings.archive)
+    archiver.start()
+    logger.info("Ready in %.2fs", record_startup())
     yield
+    await archiver.stop()
+    await listener.stop()
+    for engine in replica_engines:
+        await engine.dispose()
 
 
 app = FastAPI(
@@ -23,8 +43,13 @@ app = FastAPI(
     description="REST API for managing tasks.",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+app.add_middleware(QueryStatsMiddleware)
+if read_router.replicas:
+    app.add_middleware(ReadYourWritesMiddleware, seconds=settings.database.read_your_writes_seconds)
+
 app.include_router(statuses.router, prefix="/api")
 app.include_router(priorities.router, prefix="/api")
 app.include_router(tasks.router, prefix="/api")
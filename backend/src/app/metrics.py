@@ -0,0 +1,115 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured number of persistent connections in the pool.")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out of the pool.")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond pool_size.")
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool, including opening a new one.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    "db_statements_per_request",
+    "SQL statements executed while handling a request.",
+    ["handler", "method"],
+    buckets=(0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50, 100),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL statements while handling a request.",
+    ["handler", "method"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_ROWS_PER_REQUEST = Histogram(
+    "db_rows_per_request",
+    "Rows returned or affected by SQL statements while handling a request.",
+    ["handler", "method"],
+    buckets=(0, 1, 10, 100, 1000, 10_000, 100_000, 1_000_000),
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries_total",
+    "Statements slower than the slow query threshold, logged or not.",
+    ["handler"],
+)
+
+TASKS_ARCHIVED = Counter("tasks_archived_total", "Soft-deleted tasks moved to tasks_archive.")
+TASKS_RESTORED = Counter("tasks_restored_total", "Deleted or archived tasks restored.")
+TASKS_TABLE_ROWS = Gauge("tasks_table_rows", "Rows in the tasks table by state, as of the last archive run.", ["state"])
+TASKS_TABLE_BYTES = Gauge("tasks_table_bytes", "On-disk size of the tasks table with indexes (PostgreSQL only).")
+
+APP_STARTUP_SECONDS = Gauge("app_startup_seconds", "Time from process start until the app was ready to serve.")
+
+# Fallback start time where process metrics are unavailable (non-Linux).
+_IMPORTED_AT = time.time()
+
+
+def record_startup() -> float:
+    """Set APP_STARTUP_SECONDS from the process start time and return it."""
+    started = REGISTRY.get_sample_value("process_start_time_seconds") or _IMPORTED_AT
+    elapsed = time.time() - started
+    APP_STARTUP_SECONDS.set(elapsed)
+    return elapsed
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """Export pool gauges for the engine.
+
+    Values are read at scrape time from engine.pool, which stays correct
+    after dispose() swaps in a new pool.
+    """
+    sync_engine = engine.sync_engine
+    DB_POOL_SIZE.set_function(lambda: sync_engine.pool.size())
+    DB_POOL_CHECKED_OUT.set_function(lambda: sync_engine.pool.checkedout())
+    # QueuePool counts overflow from -pool_size; only connections above the pool are interesting.
+    DB_POOL_OVERFLOW.set_function(lambda: max(sync_engine.pool.overflow(), 0))
+
+
+@dataclass
+class QueryStats:
+    """Database work done on behalf of one request."""
+
+    statements: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+
+
+# Set by QueryStatsMiddleware for the duration of a request.
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if current_query_stats.get() is not None:
+        context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = current_query_stats.get()
+    started = getattr(context, "query_started", None)
+    if stats is None or started is None:
+        return
+    stats.statements += 1
+    stats.seconds += time.perf_counter() - started
+    if cursor.description is None:
+        stats.rows += max(cursor.rowcount, 0)
+    else:
+        # The asyncio driver adapters prefetch result rows (except for server-side cursors).
+        stats.rows += len(getattr(cursor, "_rows", None) or ())
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """Add statements run on the engine to the current request's QueryStats."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def observe_query_stats(handler: str, method: str, stats: QueryStats) -> None:
+    DB_STATEMENTS_PER_REQUEST.labels(handler, method).observe(stats.statements)
+    DB_TIME_PER_REQUEST.labels(handler, method).observe(stats.seconds)
+    DB_ROWS_PER_REQUEST.labels(handler, method).observe(stats.rows)
@@ -0,0 +1,72 @@
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database import READ_PRIMARY_COOKIE
+from app.metrics import QueryStats, current_query_stats, observe_query_stats
+from app.slow_queries import current_request_scope
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    """Pin a client to the primary for a short while after it writes.
+
+    Successful non-GET responses get a short-lived READ_PRIMARY_COOKIE;
+    get_read_session sends requests carrying it to the primary, so clients
+    see their own changes despite replication lag.
+    """
+
+    def __init__(self, app: ASGIApp, seconds: int):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or not self.seconds:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = SimpleCookie()
+                cookie[READ_PRIMARY_COOKIE] = "1"
+                cookie[READ_PRIMARY_COOKIE]["max-age"] = self.seconds
+                cookie[READ_PRIMARY_COOKIE]["path"] = "/"
+                cookie[READ_PRIMARY_COOKIE]["httponly"] = True
+                cookie[READ_PRIMARY_COOKIE]["samesite"] = "lax"
+                headers = MutableHeaders(scope=message)
+                headers.append("set-cookie", cookie.output(header="").strip())
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class QueryStatsMiddleware:
+    """Attribute SQL statements, time and rows to the route that ran them.
+
+    The counts are collected by the engine hooks from instrument_queries and
+    observed per route template and method once the response is sent, so
+    streamed bodies are included. Unmatched paths are not recorded. The
+    request scope is exposed to the slow query log for the same purpose.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        scope_token = current_request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request_scope.reset(scope_token)
+            current_query_stats.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                observe_query_stats(route.path, scope["method"], stats)
@@ -1,15 +1,61 @@
 from datetime import datetime
 
 from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Boolean,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
+    event,
+    false,
     func,
+    text,
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.database import Base
+from app.search import POSTGRESQL_DDL, SQLITE_DDL, SQLITE_DROP_DDL
+
+# Every TaskRepository read filters on this predicate, so the task indexes are
+# partial: soft-deleted rows never bloat them.
+LIVE_TASKS = text("deleted_at IS NULL")
+DELETED_TASKS = text("deleted_at IS NOT NULL")
+
+
+class utcnow(FunctionElement):
+    """Database clock at the moment the statement runs (not the transaction start).
+
+    Change timestamps come from one clock this way, whichever process writes.
+    """
+
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw) -> str:
+    return "clock_timestamp()"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw) -> str:
+    # Microseconds in the format SQLAlchemy stores, so stamps compare as text.
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+def live_task_index(name: str, *columns: str) -> Index:
+    """Partial index over non-deleted tasks, id last to serve keyset pagination."""
+    return Index(name, *columns, "id", postgresql_where=LIVE_TASKS, sqlite_where=LIVE_TASKS)
 
 
 class TaskStatus(Base):
@@ -17,6 +63,8 @@ class TaskStatus(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    # Tasks in a final status (e.g. Done) are finished and never overdue.
+    is_final: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
 
     tasks: Mapped[list["Task"]] = relationship(back_populates="status")
 
@@ -32,6 +80,18 @@ class TaskPriority(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        live_task_index("ix_tasks_live_status_id", "status_id"),
+        live_task_index("ix_tasks_live_priority_id", "priority_id"),
+        live_task_index("ix_tasks_live_start_time", "start_time"),
+        live_task_index("ix_tasks_live_end_time", "end_time"),
+        live_task_index("ix_tasks_live_created_at", "created_at"),
+        live_task_index("ix_tasks_live_title", "title"),
+        # Covers soft-deleted rows too: the change feed reports deletions.
+        Index("ix_tasks_updated_at", "updated_at", "id"),
+        # Only soft-deleted rows, for the archive job.
+        Index("ix_tasks_deleted_at", "deleted_at", postgresql_where=DELETED_TASKS, sqlite_where=DELETED_TASKS),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -49,7 +109,77 @@ class Task(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    # Stamped with the database clock (utcnow) on every INSERT and UPDATE
+    # issued through SQLAlchemy, soft deletes included; the server default
+    # only covers rows inserted with raw SQL.
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), default=utcnow(), onupdate=utcnow()
+    )
     deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     status: Mapped[TaskStatus] = relationship(back_populates="tasks")
     priority: Mapped[TaskPriority] = relationship(back_populates="tasks")
+
+
+# Full-text search objects live outside the ORM model (see app.search).
+for statement in POSTGRESQL_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in SQLITE_DROP_DDL:
+    event.listen(Task.__table__, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
+
+
+class TaskArchive(Base):
+    """Soft-deleted tasks moved out of `tasks` by the archive job (app.archive).
+
+    Same columns as Task, without foreign keys so archiving never contends
+    with the reference tables; restoring goes back through the Task ones.
+    """
+
+    __tablename__ = "tasks_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str | None] = mapped_column(String, nullable=True)
+    status_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    priority_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_time: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    end_time: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class TableVersion(Base):
+    """Change counter per table, bumped in the same transaction as every write.
+
+    A table's version is spread over shard rows (see TableVersionRepository).
+    """
+
+    __tablename__ = "table_versions"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class AppState(Base):
+    """Small key-value facts about the database, such as the applied seed version."""
+
+    __tablename__ = "app_state"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[str] = mapped_column(String(255), nullable=False)
+
+
+class TaskCounter(Base):
+    """Number of live tasks per (status, priority), kept in step by every task write."""
+
+    __tablename__ = "task_counters"
+
+    status_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    priority_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    live_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,27 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+
+class CursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(payload: dict[str, Any]) -> str:
+    """Encode cursor payload into an opaque url-safe token."""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict[str, Any]:
+    """Decode a token produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise CursorError("Invalid cursor") from exc
+
+    if not isinstance(payload, dict):
+        raise CursorError("Invalid cursor")
+    return payload
@@ -0,0 +1,44 @@
+"""Repair drift between task_counters and the tasks table.
+
+Counters are maintained by every TaskRepository write; this recount catches
+writes that bypassed the repository (manual SQL, restored backups).
+
+Usage: python -m app.reconcile
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.repositories import TaskCounterRepository
+from app.repositories.task_counter import CounterKey
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_counters(session: AsyncSession) -> dict[CounterKey, tuple[int, int]]:
+    """Recount live tasks, fix drifted counters and commit. Returns the corrections."""
+    drift = await TaskCounterRepository(session).reconcile()
+    await session.commit()
+    for (status_id, priority_id), (stored, actual) in sorted(drift.items()):
+        logger.warning(
+            "Task counter drift for status=%s priority=%s: stored %s, actual %s",
+            status_id,
+            priority_id,
+            stored,
+            actual,
+        )
+    return drift
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    async with AsyncSessionLocal() as session:
+        drift = await reconcile_counters(session)
+    print(f"corrected={len(drift)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
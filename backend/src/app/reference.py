@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_session
+from app.models import TaskPriority as TaskPriorityModel
+from app.models import TaskStatus as TaskStatusModel
+from app.schemas import TaskPriority, TaskStatus
+
+# Statuses and priorities are written outside the API (seeders, migrations, SQL),
+# so every process reloads its snapshot this often and picks up changes made
+# anywhere. Browsers keep a copy no longer and then revalidate with the ETag.
+REFRESH_SECONDS = 30
+REFERENCE_CACHE_CONTROL = f"public, max-age={REFRESH_SECONDS}"
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """Immutable snapshot of statuses and priorities."""
+
+    statuses: tuple[TaskStatus, ...]
+    priorities: tuple[TaskPriority, ...]
+    version: str
+
+    @property
+    def etag(self) -> str:
+        return f'"ref-{self.version}"'
+
+    @property
+    def default_status_id(self) -> int | None:
+        """First status by id."""
+        return self.statuses[0].id if self.statuses else None
+
+    @property
+    def default_priority_id(self) -> int | None:
+        """Second priority by id (Normal), or the first one if only one exists."""
+        if not self.priorities:
+            return None
+        return self.priorities[1].id if len(self.priorities) > 1 else self.priorities[0].id
+
+    @property
+    def final_status_ids(self) -> list[int]:
+        """Statuses flagged is_final (e.g. Done); tasks in them are never overdue."""
+        return [s.id for s in self.statuses if s.is_final]
+
+    def get_status(self, id: int) -> TaskStatus | None:
+        return next((s for s in self.statuses if s.id == id), None)
+
+    def get_priority(self, id: int) -> TaskPriority | None:
+        return next((p for p in self.priorities if p.id == id), None)
+
+    def status_exists(self, id: int) -> bool:
+        return self.get_status(id) is not None
+
+    def priority_exists(self, id: int) -> bool:
+        return self.get_priority(id) is not None
+
+
+def build_reference_data(statuses: list[TaskStatus], priorities: list[TaskPriority]) -> ReferenceData:
+    """Build a snapshot whose version is derived from its content."""
+    digest = hashlib.sha1()
+    for status in statuses:
+        digest.update(f"s:{status.id}:{status.title}:{status.is_final:d}\n".encode())
+    for priority in priorities:
+        digest.update(f"p:{priority.id}:{priority.title}\n".encode())
+    return ReferenceData(
+        statuses=tuple(statuses),
+        priorities=tuple(priorities),
+        version=digest.hexdigest()[:16],
+    )
+
+
+class ReferenceRegistry:
+    """Process-wide cache of reference data, reloaded once it is max_age seconds old."""
+
+    def __init__(self, max_age: float = REFRESH_SECONDS) -> None:
+        self.max_age = max_age
+        self._data: ReferenceData | None = None
+        self._loaded_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    @property
+    def data(self) -> ReferenceData | None:
+        return self._data
+
+    async def load(self, session: AsyncSession) -> ReferenceData:
+        """(Re)load reference data from the database."""
+        statuses = await session.execute(select(TaskStatusModel).order_by(TaskStatusModel.id))
+        priorities = await session.execute(select(TaskPriorityModel).order_by(TaskPriorityModel.id))
+        self._data = build_reference_data(
+            [TaskStatus.model_validate(s) for s in statuses.scalars()],
+            [TaskPriority.model_validate(p) for p in priorities.scalars()],
+        )
+        self._loaded_at = time.monotonic()
+        return self._data
+
+    def _fresh(self) -> bool:
+        return self._data is not None and time.monotonic() - self._loaded_at < self.max_age
+
+    async def get(self, session: AsyncSession) -> ReferenceData:
+        """Return cached reference data, (re)loading it when missing or too old."""
+        if self._fresh():
+            return self._data
+        async with self._lock:
+            if not self._fresh():
+                await self.load(session)
+            return self._data
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next request reloads it."""
+        self._data = None
+
+
+reference_registry = ReferenceRegistry()
+
+
+async def get_reference_data(session: AsyncSession = Depends(get_session)) -> ReferenceData:
+    """FastAPI dependency returning the current reference data snapshot."""
+    return await reference_registry.get(session)
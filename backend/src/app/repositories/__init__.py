@@ -1,4 +1,12 @@
-from app.repositories.task import TaskRepository
-
-__all__ = ["TaskRepository"]
+from app.repositories.app_state import AppStateRepository
+from app.repositories.table_version import TableVersionRepository
+from app.repositories.task import RestoreConflictError, TaskRepository
+from app.repositories.task_counter import TaskCounterRepository
 
+__all__ = [
+    "AppStateRepository",
+    "RestoreConflictError",
+    "TableVersionRepository",
+    "TaskCounterRepository",
+    "TaskRepository",
+]
@@ -0,0 +1,21 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import AppState as AppStateModel
+from app.repositories.base import BaseRepository
+
+
+class AppStateRepository(BaseRepository[AppStateModel]):
+    """Key-value facts about the database itself."""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(AppStateModel, session)
+
+    async def get(self, key: str) -> str | None:
+        return await self.session.scalar(select(self.model.value).where(self.model.key == key))
+
+    async def set(self, key: str, value: str) -> None:
+        """Store a value with a single upsert."""
+        stmt = self.upsert_insert().values(key=key, value=value)
+        stmt = stmt.on_conflict_do_update(index_elements=[self.model.key], set_={"value": value})
+        await self.session.execute(stmt)
@@ -1,6 +1,8 @@
 from typing import Any, Generic, Sequence, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, Integer, any_, bindparam, delete, exists, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import Base
@@ -15,10 +17,48 @@ class BaseRepository(Generic[ModelT]):
         self.model = model
         self.session = session
 
+    @property
+    def dialect_name(self) -> str | None:
+        """Name of the database dialect the session is bound to."""
+        bind = self.session.bind
+        return bind.dialect.name if bind is not None else None
+
+    def _id_in(self, ids: Sequence[int]) -> ColumnElement[bool]:
+        """`id IN ids` as a single array parameter (`id = ANY(:ids)`) on PostgreSQL.
+
+        One array parameter keeps the SQL text identical for any number of ids,
+        so the prepared statement cache is reused.
+        """
+        if self.dialect_name == "postgresql":
+            return self.model.id == any_(bindparam("ids", list(ids), type_=ARRAY(Integer)))
+        return self.model.id.in_(ids)
+
+    def upsert_insert(self) -> postgresql.Insert | sqlite.Insert:
+        """Dialect INSERT construct supporting ON CONFLICT clauses."""
+        if self.dialect_name == "postgresql":
+            return postgresql.insert(self.model)
+        if self.dialect_name == "sqlite":
+            return sqlite.insert(self.model)
+        raise NotImplementedError(f"ON CONFLICT is not supported for dialect {self.dialect_name}")
+
+    async def insert_missing(self, rows: list[dict[str, Any]]) -> int:
+        """Insert rows with one INSERT ... ON CONFLICT DO NOTHING. Returns how many were new."""
+        if not rows:
+            return 0
+        result = await self.session.execute(self.upsert_insert().values(rows).on_conflict_do_nothing())
+        return result.rowcount
+
+    async def _on_write(self) -> None:
+        """Called after every write that changed rows, inside the same transaction."""
+
+    def _live_clauses(self) -> list[ColumnElement[bool]]:
+        """Conditions a row must meet to be visible. Override for soft delete."""
+        return []
+
     async def get_single(self, id: int) -> ModelT | None:
         """Get single record by id."""
         result = await self.session.execute(
-            select(self.model).where(self.model.id == id)
+            select(self.model).where(self.model.id == id, *self._live_clauses())
         )
         return result.scalar_one_or_none()
 
@@ -59,40 +99,45 @@ class BaseRepository(Generic[ModelT]):
         return result.scalars().all()
 
     async def create(self, **data: Any) -> ModelT:
-        """Create a new record."""
-        instance = self.model(**data)
-        self.session.add(instance)
-        await self.session.flush()
-        await self.session.refresh(instance)
+        """Create a new record with a single INSERT ... RETURNING."""
+        result = await self.session.scalars(insert(self.model).values(**data).returning(self.model))
+        instance = result.one()
+        await self._on_write()
         return instance
 
     async def update(self, id: int, **data: Any) -> ModelT | None:
-        """Update record by id."""
-        instance = await self.get_single(id)
-        if not instance:
-            return None
-
-        for field, value in data.items():
-            setattr(instance, field, value)
-
-        await self.session.flush()
-        await self.session.refresh(instance)
+        """Update record by id with a single UPDATE ... RETURNING."""
+        if not data:
+            return await self.get_single(id)
+
+        result = await self.session.scalars(
+            update(self.model)
+            .where(self.model.id == id, *self._live_clauses())
+            .values(**data)
+            .returning(self.model),
+            execution_options={"synchronize_session": False, "populate_existing": True},
+        )
+        instance = result.one_or_none()
+        if instance is not None:
+            await self._on_write()
         return instance
 
     async def delete(self, id: int) -> bool:
         """Delete record by id. Returns True if deleted."""
-        instance = await self.get_single(id)
-        if not instance:
-            return False
-
-        await self.session.delete(instance)
-        await self.session.flush()
-        return True
+        result = await self.session.scalars(
+            delete(self.model).where(self.model.id == id).returning(self.model.id)
+        )
+        deleted = result.one_or_none() is not None
+        if deleted:
+            await self._on_write()
+        return deleted
 
     async def exists(self, id: int) -> bool:
         """Check if record exists."""
-        instance = await self.get_single(id)
-        return instance is not None
+        result = await self.session.scalar(
+            select(exists().where(self.model.id == id, *self._live_clauses()))
+        )
+        return bool(result)
 
     async def get_existing_ids(self) -> set[int]:
         """Get set of all existing ids."""
@@ -0,0 +1,44 @@
+import random
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import TableVersion as TableVersionModel
+from app.repositories.base import BaseRepository
+
+# Each table's version is spread over this many rows, so concurrent writers
+# rarely wait on the same row lock. The version is the sum of the shards.
+VERSION_SHARDS = 16
+# Session.info key for the shard a session bumps. One shard per session means a
+# transaction locks a single version row, so writers cannot deadlock on them.
+_SHARD_KEY = "table_version_shard"
+
+
+def shard_name(table_name: str, shard: int) -> str:
+    """Row key of one shard; shard 0 is the plain table name."""
+    return table_name if shard == 0 else f"{table_name}#{shard}"
+
+
+class TableVersionRepository(BaseRepository[TableVersionModel]):
+    """Per-table change counters used as cheap cache validators."""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(TableVersionModel, session)
+
+    async def get_version(self, table_name: str) -> int:
+        """Current version of a table; 0 if it was never written."""
+        shards = [shard_name(table_name, shard) for shard in range(VERSION_SHARDS)]
+        result = await self.session.scalar(
+            select(func.sum(self.model.version)).where(self.model.table_name.in_(shards))
+        )
+        return result or 0
+
+    async def bump(self, table_name: str) -> None:
+        """Increment the table version with a single upsert on this session's shard."""
+        shard = self.session.info.setdefault(_SHARD_KEY, random.randrange(VERSION_SHARDS))
+        stmt = self.upsert_insert().values(table_name=shard_name(table_name, shard), version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.table_name],
+            set_={"version": self.model.version + 1},
+        )
+        await self.session.execute(stmt)
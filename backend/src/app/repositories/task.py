@@ -1,11 +1,62 @@
-from datetime import datetime, timezone
-from typing import Any, Sequence
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Iterable, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    RowMapping,
+    Select,
+    and_,
+    column,
+    delete,
+    false,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Task as TaskModel
+from app.models import TaskArchive as TaskArchiveModel
+from app.models import TaskPriority, TaskStatus, utcnow
+from app.pagination import CursorError, decode_cursor, encode_cursor
 from app.repositories.base import BaseRepository
+from app.repositories.table_version import TableVersionRepository
+from app.repositories.task_counter import CounterKey, TaskCounterRepository
+from app.search import FTS_TABLE, SEARCH_CONFIG, SEARCH_VECTOR_COLUMN, fts5_query, search_terms, tsquery_text
+
+
+class RestoreConflictError(ValueError):
+    """Raised when an archived task refers to a status or priority that no longer exists."""
+
+
+# Sort keys accepted by get_page; a leading "-" means descending order.
+SORT_FIELDS = {
+    "id": TaskModel.id,
+    "title": TaskModel.title,
+    "created_at": TaskModel.created_at,
+    "start_time": TaskModel.start_time,
+    "end_time": TaskModel.end_time,
+}
+DATETIME_SORT_FIELDS = {"created_at", "start_time", "end_time"}
+NULLABLE_SORT_FIELDS = {"start_time", "end_time"}
+# Best match first; only valid together with a search query.
+RELEVANCE_SORT = "relevance"
+RANK_LABEL = "search_rank"
+# Columns that decide which counter a task is counted in.
+COUNTER_FIELDS = {"status_id", "priority_id"}
+# updated_at is stamped by the database before commit, so a change can become
+# visible with a timestamp in the past. Change tokens never pass the commit
+# horizon: the database clock, and on PostgreSQL the start of a write
+# transaction still open, less this margin. Such late commits are returned
+# again rather than skipped.
+CHANGES_SETTLE = timedelta(seconds=10)
+CHANGES_TOKEN_KIND = "changes"
 
 
 class TaskRepository(BaseRepository[TaskModel]):
@@ -14,15 +65,83 @@ class TaskRepository(BaseRepository[TaskModel]):
     def __init__(self, session: AsyncSession):
         super().__init__(TaskModel, session)
 
-    async def get_single(self, id: int) -> TaskModel | None:
-        """Get single non-deleted task by id."""
+    async def _on_write(self) -> None:
+        """Bump the tasks table version so cached reads are revalidated."""
+        await TableVersionRepository(self.session).bump(self.model.__tablename__)
+
+    def _live_clauses(self) -> list[ColumnElement[bool]]:
+        """Soft-deleted tasks are invisible to reads and updates."""
+        return [self.model.deleted_at.is_(None)]
+
+    async def _count(self, added: Iterable[CounterKey] = (), removed: Iterable[CounterKey] = ()) -> None:
+        """Move live tasks in and out of the per-(status, priority) counters."""
+        deltas = Counter(added)
+        deltas.subtract(removed)
+        await TaskCounterRepository(self.session).apply(deltas)
+
+    async def _counter_keys(self, clauses: list[ColumnElement[bool]]) -> dict[int, CounterKey]:
+        """Current (status, priority) of the selected tasks, locked until commit."""
         result = await self.session.execute(
-            select(self.model).where(
-                self.model.id == id,
-                self.model.deleted_at.is_(None),
-            )
+            select(self.model.id, self.model.status_id, self.model.priority_id)
+            .where(*clauses)
+            .with_for_update()
         )
-        return result.scalar_one_or_none()
+        return {id: (status_id, priority_id) for id, status_id, priority_id in result}
+
+    async def create(self, **data: Any) -> TaskModel:
+        task = await super().create(**data)
+        await self._count(added=[(task.status_id, task.priority_id)])
+        return task
+
+    async def update(self, id: int, **data: Any) -> TaskModel | None:
+        old_keys = {}
+        if COUNTER_FIELDS & data.keys():
+            old_keys = await self._counter_keys([self.model.id == id, *self._live_clauses()])
+        task = await super().update(id, **data)
+        if task is not None and old_keys:
+            await self._count(added=[(task.status_id, task.priority_id)], removed=old_keys.values())
+        return task
+
+    async def delete(self, id: int) -> bool:
+        """Hard delete task by id. Returns True if deleted."""
+        result = await self.session.execute(
+            delete(self.model)
+            .where(self.model.id == id)
+            .returning(self.model.status_id, self.model.priority_id, self.model.deleted_at)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return False
+        if row.deleted_at is None:
+            await self._count(removed=[(row.status_id, row.priority_id)])
+        await self._on_write()
+        return True
+
+    def _filter_clauses(
+            self,
+            *,
+            status_id: int | None = None,
+            priority_id: int | None = None,
+            start_time: datetime | None = None,
+            end_time: datetime | None = None,
+    ) -> list[ColumnElement[bool]]:
+        """Conditions selecting non-deleted tasks matching the filters."""
+        clauses = self._live_clauses()
+
+        if status_id is not None:
+            clauses.append(self.model.status_id == status_id)
+        if priority_id is not None:
+            clauses.append(self.model.priority_id == priority_id)
+        if start_time is not None:
+            clauses.append(self.model.start_time >= start_time)
+        if end_time is not None:
+            clauses.append(self.model.end_time <= end_time)
+
+        return clauses
+
+    def _filtered(self, query: Select, **filters: Any) -> Select:
+        """Restrict query to non-deleted tasks matching the filters."""
+        return query.where(*self._filter_clauses(**filters))
 
     async def get_multi(
             self,
@@ -36,16 +155,13 @@ class TaskRepository(BaseRepository[TaskModel]):
             end_time: datetime | None = None,
     ) -> Sequence[TaskModel]:
         """Get multiple non-deleted tasks with filters."""
-        query = select(self.model).where(self.model.deleted_at.is_(None))
-
-        if status_id is not None:
-            query = query.where(self.model.status_id == status_id)
-        if priority_id is not None:
-            query = query.where(self.model.priority_id == priority_id)
-        if start_time is not None:
-            query = query.where(self.model.start_time >= start_time)
-        if end_time is not None:
-            query = query.where(self.model.end_time <= end_time)
+        query = self._filtered(
+            select(self.model),
+            status_id=status_id,
+            priority_id=priority_id,
+            start_time=start_time,
+            end_time=end_time,
+        )
 
         if order_by is not None:
             query = query.order_by(order_by)
@@ -56,12 +172,429 @@ class TaskRepository(BaseRepository[TaskModel]):
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def count_matching(self, limit: int, **filters: Any) -> int:
+        """Live tasks matching the filters, counted up to limit + 1 so the cost stays bounded."""
+        matching = self._filtered(select(self.model.id), **filters).limit(limit + 1).subquery()
+        return await self.session.scalar(select(func.count()).select_from(matching))
+
+    async def count_overdue(self, now: datetime, *, exclude_status_ids: Sequence[int] = ()) -> int:
+        """Live tasks whose end_time has passed, served by the live end_time index."""
+        query = select(func.count()).where(*self._live_clauses(), self.model.end_time < now)
+        if exclude_status_ids:
+            query = query.where(self.model.status_id.not_in(exclude_status_ids))
+        return await self.session.scalar(query)
+
+    async def stream_batches(self, *, batch_size: int = 1000, **filters: Any) -> AsyncIterator[list[RowMapping]]:
+        """Stream non-deleted tasks as plain rows, batch by batch, ordered by id.
+
+        Uses a server-side cursor, so memory stays bounded by batch_size
+        regardless of how many rows match.
+        """
+        query = (
+            self._filtered(select(*self.model.__table__.columns), **filters)
+            .order_by(self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(query)
+        async for batch in result.mappings().partitions():
+            yield batch
+
+    async def get_page(
+            self,
+            *,
+            limit: int = 100,
+            cursor: str | None = None,
+            sort: str = "id",
+            q: str | None = None,
+            status_id: int | None = None,
+            priority_id: int | None = None,
+            start_time: datetime | None = None,
+            end_time: datetime | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Get a page of non-deleted tasks using keyset pagination on (sort key, id).
+
+        q restricts the page to tasks whose title or description contain every
+        word of it (as a prefix); sort="relevance" orders them by rank.
+        Returns plain dicts rather than ORM instances, so listing skips identity
+        map and attribute instrumentation, and an opaque cursor for the next
+        page (None on the last page).
+        Raises CursorError for an unknown sort key or a malformed cursor.
+        """
+        descending = sort.startswith("-")
+        field = sort.removeprefix("-")
+        if sort == RELEVANCE_SORT:
+            if q is None:
+                raise CursorError("Sorting by relevance requires a search query")
+        elif field not in SORT_FIELDS:
+            raise CursorError(f"Unsupported sort: {sort}")
+
+        query = self._filtered(
+            select(*self.model.__table__.columns),
+            status_id=status_id,
+            priority_id=priority_id,
+            start_time=start_time,
+            end_time=end_time,
+        )
+        rank = None
+        if q is not None:
+            query, rank = self._search(query, q)
+
+        if sort == RELEVANCE_SORT:
+            query = query.add_columns(rank.label(RANK_LABEL))
+            if cursor is not None:
+                value, last_id = self._decode_position(cursor, sort, field, q=q)
+                query = query.where(or_(rank < value, and_(rank == value, self.model.id > last_id)))
+            query = query.order_by(rank.desc(), self.model.id.asc())
+        else:
+            if cursor is not None:
+                value, last_id = self._decode_position(cursor, sort, field)
+                query = query.where(self._after(field, value, last_id, descending))
+            query = query.order_by(*self._ordering(SORT_FIELDS[field], descending))
+
+        result = await self.session.execute(query.limit(limit + 1))
+        rows = [row._asdict() for row in result]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            if sort == RELEVANCE_SORT:
+                payload = {"s": sort, "q": q, "v": last[RANK_LABEL], "id": last["id"]}
+            else:
+                value = last[field]
+                if isinstance(value, datetime):
+                    value = value.isoformat()
+                payload = {"s": sort, "v": value, "id": last["id"]}
+            next_cursor = encode_cursor(payload)
+
+        if sort == RELEVANCE_SORT:
+            for row in rows:
+                del row[RANK_LABEL]
+        return rows, next_cursor
+
+    async def get_changes(
+            self,
+            *,
+            since: str | None = None,
+            limit: int = 1000,
+            settle: timedelta = CHANGES_SETTLE,
+            expired_before: datetime | None = None,
+    ) -> tuple[list[dict[str, Any]], str, bool]:
+        """Tasks created, updated or soft deleted after a change token, oldest change first.
+
+        Without a token only non-deleted tasks are returned (initial sync).
+        Returns plain dicts, the token to pass next time and whether more
+        changes are already waiting. Tokens never pass the commit horizon
+        (see _commit_horizon) less `settle`: a page ending after it is
+        returned with has_more false, and recent changes may be returned
+        twice, so clients apply them by id. Read from the primary: a lagging
+        replica would hand out tokens past changes it has not replayed yet.
+        Tokens older than `expired_before` are rejected: deletions from
+        before then may have been archived and can no longer be reported.
+        Raises CursorError for a malformed or expired token.
+        """
+        updated_at, id_col = self.model.updated_at, self.model.id
+        query = select(*self.model.__table__.columns)
+        if since is None:
+            query = query.where(*self._live_clauses())
+        else:
+            value, last_id = self._decode_change_token(since)
+            if expired_before is not None and value < expired_before:
+                raise CursorError("Change token expired, sync again without a token")
+            query = query.where(or_(updated_at > value, and_(updated_at == value, id_col > last_id)))
+
+        # Taken before the read: every change stamped before the horizon has
+        # committed by now, so the read below sees it.
+        horizon = await self._commit_horizon() - settle
+        result = await self.session.execute(query.order_by(updated_at, id_col).limit(limit + 1))
+        rows = [row._asdict() for row in result]
+        has_more = len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
+        last = _as_utc(rows[-1]["updated_at"]) if rows else None
+        if has_more and last < horizon:
+            value, last_id = last, rows[-1]["id"]
+        else:
+            # Later changes may still be joined by earlier-stamped commits;
+            # the client resumes from the horizon on its next poll.
+            value, last_id, has_more = horizon, 0, False
+        token = encode_cursor({"s": CHANGES_TOKEN_KIND, "v": value.isoformat(), "id": last_id})
+        return rows, token, has_more
+
+    async def _commit_horizon(self) -> datetime:
+        """Database time before which every task change has committed.
+
+        On PostgreSQL this is held back to the start of the oldest other
+        transaction that has written and not yet committed.
+        """
+        if self.dialect_name == "postgresql":
+            statement = text(
+                "SELECT least(clock_timestamp(), (SELECT min(xact_start) FROM pg_stat_activity "
+                "WHERE backend_xid IS NOT NULL AND pid <> pg_backend_pid()))"
+            )
+        else:
+            statement = select(utcnow())
+        return _as_utc(await self.session.scalar(statement))
+
+    @staticmethod
+    def _decode_change_token(token: str) -> tuple[datetime, int]:
+        payload = decode_cursor(token)
+        if payload.get("s") != CHANGES_TOKEN_KIND or not isinstance(payload.get("id"), int):
+            raise CursorError("Invalid change token")
+        try:
+            value = datetime.fromisoformat(payload.get("v"))
+        except (TypeError, ValueError) as exc:
+            raise CursorError("Invalid change token") from exc
+        return _as_utc(value), payload["id"]
+
+    def _search(self, query: Select, q: str) -> tuple[Select, ColumnElement[float]]:
+        """Restrict query to tasks matching q; return it with a rank expression (higher is better)."""
+        terms = search_terms(q)
+        if not terms:
+            return query.where(false()), literal_column("0.0")
+
+        if self.dialect_name == "postgresql":
+            vector = literal_column(f"{self.model.__tablename__}.{SEARCH_VECTOR_COLUMN}")
+            tsquery = func.to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), tsquery_text(terms))
+            return query.where(vector.op("@@")(tsquery)), func.ts_rank_cd(vector, tsquery)
+
+        fts = table(FTS_TABLE, column("rowid"), column("rank"))
+        query = (
+            query.join(fts, fts.c.rowid == self.model.id)
+            .where(literal_column(FTS_TABLE).match(fts5_query(terms)))
+        )
+        # FTS5 rank is bm25, where lower means a better match.
+        return query, -fts.c.rank
+
+    @staticmethod
+    def _decode_position(cursor: str, sort: str, field: str, *, q: str | None = None) -> tuple[Any, int]:
+        payload = decode_cursor(cursor)
+        last_id = payload.get("id")
+        if payload.get("s") != sort or not isinstance(last_id, int) or isinstance(last_id, bool):
+            raise CursorError("Cursor does not match sort order")
+        value = payload.get("v")
+        if sort == RELEVANCE_SORT:
+            if payload.get("q") != q or not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise CursorError("Cursor does not match search query")
+            return value, last_id
+
+        # The value is bound into the keyset comparison, so it must have the column's type.
+        if value is None:
+            if field not in NULLABLE_SORT_FIELDS:
+                raise CursorError("Invalid cursor")
+        elif field in DATETIME_SORT_FIELDS:
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError) as exc:
+                raise CursorError("Invalid cursor") from exc
+        elif field == "id":
+            if value != last_id or isinstance(value, bool):
+                raise CursorError("Invalid cursor")
+        elif not isinstance(value, str):
+            raise CursorError("Invalid cursor")
+        return value, last_id
+
+    def _ordering(self, column: Any, descending: bool) -> list[Any]:
+        """Total order on (column, id) with NULLs after all values in ascending order."""
+        id_col = self.model.id
+        if column is id_col:
+            return [id_col.desc() if descending else id_col.asc()]
+        if descending:
+            return [column.desc().nulls_first(), id_col.desc()]
+        return [column.asc().nulls_last(), id_col.asc()]
+
+    def _after(self, field: str, value: Any, last_id: int, descending: bool) -> Any:
+        """Predicate selecting rows strictly after (value, last_id) in _ordering."""
+        column = SORT_FIELDS[field]
+        id_col = self.model.id
+        if column is id_col:
+            return id_col < last_id if descending else id_col > last_id
+
+        if descending:
+            if value is None:
+                return or_(column.is_not(None), and_(column.is_(None), id_col < last_id))
+            return or_(column < value, and_(column == value, id_col < last_id))
+
+        if value is None:
+            return and_(column.is_(None), id_col > last_id)
+        after = or_(column > value, and_(column == value, id_col > last_id))
+        return or_(after, column.is_(None)) if field in NULLABLE_SORT_FIELDS else after
+
+    async def create_many(self, rows: list[dict[str, Any]]) -> list[TaskModel]:
+        """Insert tasks with multi-row INSERT ... RETURNING, preserving input order.
+
+        SQLAlchemy splits very large inputs into several multi-row statements
+        (insertmanyvalues pages) to stay under driver parameter limits.
+        """
+        if not rows:
+            return []
+        result = await self.session.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True),
+            rows,
+        )
+        tasks = list(result.all())
+        await self._count(added=[(task.status_id, task.priority_id) for task in tasks])
+        await self._on_write()
+        return tasks
+
+    async def update_many(
+            self,
+            values: dict[str, Any],
+            *,
+            ids: Sequence[int] | None = None,
+            **filters: Any,
+    ) -> list[TaskModel]:
+        """Apply the same changes to non-deleted tasks selected by ids and/or filters.
+
+        Runs a single UPDATE ... RETURNING and returns the updated tasks ordered by id.
+        """
+        clauses = self._filter_clauses(**filters)
+        if ids is not None:
+            clauses.append(self._id_in(ids))
+
+        old_keys = {}
+        if COUNTER_FIELDS & values.keys():
+            old_keys = await self._counter_keys(clauses)
+
+        if values:
+            stmt = update(self.model).where(*clauses).values(**values).returning(self.model)
+            result = await self.session.scalars(
+                stmt,
+                execution_options={"synchronize_session": False, "populate_existing": True},
+            )
+        else:
+            result = await self.session.scalars(select(self.model).where(*clauses))
+        tasks = sorted(result.all(), key=lambda task: task.id)
+        if old_keys and tasks:
+            await self._count(
+                added=[(task.status_id, task.priority_id) for task in tasks],
+                removed=[old_keys[task.id] for task in tasks if task.id in old_keys],
+            )
+        if values and tasks:
+            await self._on_write()
+        return tasks
+
     async def soft_delete(self, id: int) -> bool:
-        """Soft delete task by id. Returns True if deleted."""
-        task = await self.get_single(id)
-        if not task:
+        """Soft delete task by id with a single UPDATE ... RETURNING. Returns True if deleted."""
+        result = await self.session.execute(
+            update(self.model)
+            .where(self.model.id == id, *self._live_clauses())
+            .values(deleted_at=datetime.now(timezone.utc))
+            .returning(self.model.status_id, self.model.priority_id),
+            execution_options={"synchronize_session": False},
+        )
+        row = result.one_or_none()
+        if row is None:
             return False
-
-        task.deleted_at = datetime.now(timezone.utc)
-        await self.session.flush()
+        await self._count(removed=[tuple(row)])
+        await self._on_write()
         return True
+
+    async def soft_delete_many(self, *, ids: Sequence[int] | None = None, **filters: Any) -> list[int]:
+        """Soft delete non-deleted tasks selected by ids and/or filters.
+
+        Runs a single UPDATE ... RETURNING id and returns the deleted ids in ascending order.
+        """
+        clauses = self._filter_clauses(**filters)
+        if ids is not None:
+            clauses.append(self._id_in(ids))
+
+        result = await self.session.execute(
+            update(self.model)
+            .where(*clauses)
+            .values(deleted_at=datetime.now(timezone.utc))
+            .returning(self.model.id, self.model.status_id, self.model.priority_id),
+            execution_options={"synchronize_session": False},
+        )
+        rows = result.all()
+        if rows:
+            await self._count(removed=[(status_id, priority_id) for _, status_id, priority_id in rows])
+            await self._on_write()
+        return sorted(id for id, _, _ in rows)
+
+    async def archive_deleted(self, deleted_before: datetime, limit: int = 1000) -> list[int]:
+        """Move up to `limit` tasks soft deleted before `deleted_before` to tasks_archive.
+
+        Candidate rows are locked with SKIP LOCKED on PostgreSQL, so several
+        archivers can run at once. Archived tasks were already invisible, so
+        counters and the table version are left alone. Returns the moved ids.
+        """
+        ids = list(await self.session.scalars(
+            select(self.model.id)
+            .where(self.model.deleted_at < deleted_before)
+            .order_by(self.model.deleted_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ))
+        if not ids:
+            return []
+        columns = self.model.__table__.columns
+        await self.session.execute(
+            insert(TaskArchiveModel).from_select([c.name for c in columns], select(*columns).where(self._id_in(ids)))
+        )
+        await self.session.execute(delete(self.model).where(self._id_in(ids)))
+        return ids
+
+    async def restore(self, id: int) -> TaskModel | None:
+        """Undelete a task, moving it back from tasks_archive if it was archived.
+
+        Returns the restored task, or None if no deleted or archived task has this id.
+        Raises RestoreConflictError if the archived task's status or priority was
+        deleted since; the archive row is then only removed in this session, so
+        rolling back keeps it.
+        """
+        result = await self.session.scalars(
+            update(self.model)
+            .where(self.model.id == id, self.model.deleted_at.is_not(None))
+            .values(deleted_at=None)
+            .returning(self.model),
+            execution_options={"synchronize_session": False, "populate_existing": True},
+        )
+        task = result.one_or_none()
+        if task is None:
+            archived = (await self.session.execute(
+                delete(TaskArchiveModel)
+                .where(TaskArchiveModel.id == id)
+                .returning(*(TaskArchiveModel.__table__.c[c.name] for c in self.model.__table__.columns))
+            )).mappings().one_or_none()
+            if archived is None:
+                return None
+            # tasks_archive has no foreign keys, so the references may be gone.
+            status_ok, priority_ok = (await self.session.execute(select(
+                select(TaskStatus.id).where(TaskStatus.id == archived["status_id"]).exists(),
+                select(TaskPriority.id).where(TaskPriority.id == archived["priority_id"]).exists(),
+            ))).one()
+            if not status_ok:
+                raise RestoreConflictError("Task status no longer exists")
+            if not priority_ok:
+                raise RestoreConflictError("Task priority no longer exists")
+            task = (await self.session.scalars(
+                insert(self.model)
+                .values({**archived, "deleted_at": None, "updated_at": utcnow()})
+                .returning(self.model)
+            )).one()
+        await self._count(added=[(task.status_id, task.priority_id)])
+        await self._on_write()
+        return task
+
+    async def table_stats(self) -> tuple[int, int | None]:
+        """Row count (deleted rows included) and on-disk size in bytes of the tasks table.
+
+        PostgreSQL figures come from the catalog and are estimates as of the
+        last ANALYZE; elsewhere rows are counted and the size is unknown.
+        """
+        if self.dialect_name == "postgresql":
+            row = (await self.session.execute(
+                text(
+                    "SELECT reltuples::bigint, pg_total_relation_size(oid) "
+                    "FROM pg_class WHERE oid = CAST(:table AS regclass)"
+                ),
+                {"table": self.model.__tablename__},
+            )).one()
+            return max(row[0], 0), row[1]
+        return await self.session.scalar(select(func.count()).select_from(self.model)), None
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite returns naive datetimes; everything is stored in UTC."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
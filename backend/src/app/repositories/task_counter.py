@@ -0,0 +1,71 @@
+from collections import Counter
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Task as TaskModel
+from app.models import TaskCounter as TaskCounterModel
+from app.repositories.base import BaseRepository
+
+# (status_id, priority_id)
+CounterKey = tuple[int, int]
+
+
+class TaskCounterRepository(BaseRepository[TaskCounterModel]):
+    """Live task counts per (status, priority), maintained by TaskRepository writes."""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(TaskCounterModel, session)
+
+    async def apply(self, deltas: Counter[CounterKey]) -> None:
+        """Add deltas to the counters with one multi-row upsert."""
+        rows = [
+            {"status_id": status_id, "priority_id": priority_id, "live_count": delta}
+            for (status_id, priority_id), delta in sorted(deltas.items())
+            if delta
+        ]
+        if not rows:
+            return
+        stmt = self.upsert_insert().values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.status_id, self.model.priority_id],
+            set_={"live_count": self.model.live_count + stmt.excluded.live_count},
+        )
+        await self.session.execute(stmt)
+
+    async def get_counts(self) -> dict[CounterKey, int]:
+        """Non-zero counters."""
+        result = await self.session.execute(
+            select(self.model.status_id, self.model.priority_id, self.model.live_count).where(
+                self.model.live_count != 0
+            )
+        )
+        return {(status_id, priority_id): count for status_id, priority_id, count in result}
+
+    async def reconcile(self) -> dict[CounterKey, tuple[int, int]]:
+        """Recount live tasks and repair counters that drifted.
+
+        Returns {key: (stored, actual)} for every corrected counter. On
+        PostgreSQL the counters are locked first, so task writes in flight
+        either are already counted or apply their deltas after the repair.
+        """
+        if self.dialect_name == "postgresql":
+            await self.session.execute(text(f"LOCK TABLE {self.model.__tablename__} IN EXCLUSIVE MODE"))
+
+        actual_result = await self.session.execute(
+            select(TaskModel.status_id, TaskModel.priority_id, func.count())
+            .where(TaskModel.deleted_at.is_(None))
+            .group_by(TaskModel.status_id, TaskModel.priority_id)
+        )
+        actual = {(status_id, priority_id): count for status_id, priority_id, count in actual_result}
+        stored = await self.get_counts()
+
+        drift = {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in stored.keys() | actual.keys()
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
+        if drift:
+            await self.apply(Counter({key: real - old for key, (old, real) in drift.items()}))
+            await self.session.execute(delete(self.model).where(self.model.live_count == 0))
+        return drift
@@ -0,0 +1,26 @@
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson.
+
+    UTC datetimes are written with a "Z" suffix, matching pydantic's output,
+    so bodies look the same whichever path produced them.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def adapter_response(adapter: TypeAdapter, value: Any, status_code: int = 200) -> Response:
+    """Serialize an already validated value with a precompiled TypeAdapter.
+
+    Returning the result skips FastAPI's response_model re-validation and
+    jsonable_encoder pass.
+    """
+    return Response(content=adapter.dump_json(value), status_code=status_code, media_type="application/json")
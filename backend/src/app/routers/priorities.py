@@ -1,29 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
-from app.database import get_session
-from app.models import TaskPriority as TaskPriorityModel
-from app.repositories.base import BaseRepository
+from app.http_cache import etag_matches, not_modified, set_cache_headers
+from app.reference import REFERENCE_CACHE_CONTROL, ReferenceData, get_reference_data
 from app.schemas import TaskPriority
 
 router = APIRouter(prefix="/tasks/priorities", tags=["task_priorities"])
 
 
 @router.get("", response_model=list[TaskPriority])
-async def list_priorities(session: AsyncSession = Depends(get_session)) -> list[TaskPriorityModel]:
+async def list_priorities(
+    request: Request,
+    response: Response,
+    reference: ReferenceData = Depends(get_reference_data),
+) -> list[TaskPriority] | Response:
     """Get all task priorities."""
-    repo = BaseRepository(TaskPriorityModel, session)
-    return list(await repo.get_all())
+    if etag_matches(request, reference.etag):
+        return not_modified(reference.etag, REFERENCE_CACHE_CONTROL)
+    set_cache_headers(response, reference.etag, REFERENCE_CACHE_CONTROL)
+    return list(reference.priorities)
 
 
 @router.get("/{priority_id}", response_model=TaskPriority)
-async def get_priority(priority_id: int, session: AsyncSession = Depends(get_session)) -> TaskPriorityModel:
+async def get_priority(
+    priority_id: int,
+    request: Request,
+    response: Response,
+    reference: ReferenceData = Depends(get_reference_data),
+) -> TaskPriority | Response:
     """Get a single task priority by id."""
-    repo = BaseRepository(TaskPriorityModel, session)
-    priority_obj = await repo.get_single(priority_id)
+    priority_obj = reference.get_priority(priority_id)
     if not priority_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Priority not found",
         )
+    if etag_matches(request, reference.etag):
+        return not_modified(reference.etag, REFERENCE_CACHE_CONTROL)
+    set_cache_headers(response, reference.etag, REFERENCE_CACHE_CONTROL)
     return priority_obj
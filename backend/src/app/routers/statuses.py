@@ -1,29 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
-from app.database import get_session
-from app.models import TaskStatus as TaskStatusModel
-from app.repositories.base import BaseRepository
+from app.http_cache import etag_matches, not_modified, set_cache_headers
+from app.reference import REFERENCE_CACHE_CONTROL, ReferenceData, get_reference_data
 from app.schemas import TaskStatus
 
 router = APIRouter(prefix="/tasks/statuses", tags=["task_statuses"])
 
 
 @router.get("", response_model=list[TaskStatus])
-async def list_statuses(session: AsyncSession = Depends(get_session)) -> list[TaskStatusModel]:
+async def list_statuses(
+    request: Request,
+    response: Response,
+    reference: ReferenceData = Depends(get_reference_data),
+) -> list[TaskStatus] | Response:
     """Get all task statuses."""
-    repo = BaseRepository(TaskStatusModel, session)
-    return list(await repo.get_all())
+    if etag_matches(request, reference.etag):
+        return not_modified(reference.etag, REFERENCE_CACHE_CONTROL)
+    set_cache_headers(response, reference.etag, REFERENCE_CACHE_CONTROL)
+    return list(reference.statuses)
 
 
 @router.get("/{status_id}", response_model=TaskStatus)
-async def get_status(status_id: int, session: AsyncSession = Depends(get_session)) -> TaskStatusModel:
+async def get_status(
+    status_id: int,
+    request: Request,
+    response: Response,
+    reference: ReferenceData = Depends(get_reference_data),
+) -> TaskStatus | Response:
     """Get a single task status by id."""
-    repo = BaseRepository(TaskStatusModel, session)
-    status_obj = await repo.get_single(status_id)
+    status_obj = reference.get_status(status_id)
     if not status_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Status not found",
         )
+    if etag_matches(request, reference.etag):
+        return not_modified(reference.etag, REFERENCE_CACHE_CONTROL)
+    set_cache_headers(response, reference.etag, REFERENCE_CACHE_CONTROL)
     return status_obj
@@ -1,105 +1,529 @@
-from datetime import datetime
+import io
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.database import get_session
+from app.cache import task_cache
+from app.config import settings
+from app.database import get_read_session, get_session, get_sessionmaker
+from app.events import notify_task_events, notify_task_resync, sse_stream, task_events
+from app.export import MEDIA_TYPES, ExportFormat, encode_stream
+from app.http_cache import etag_matches, make_etag, not_modified, set_cache_headers
+from app.importer import ImportFormat, import_tasks
+from app.metrics import TASKS_RESTORED
 from app.models import Task as TaskModel
-from app.models import TaskPriority as TaskPriorityModel
-from app.models import TaskStatus as TaskStatusModel
-from app.repositories import TaskRepository
-from app.repositories.base import BaseRepository
-from app.schemas import TaskCreate, TaskResponse, TaskUpdate
+from app.pagination import CursorError
+from app.reference import ReferenceData, get_reference_data
+from app.repositories import RestoreConflictError, TableVersionRepository, TaskCounterRepository, TaskRepository
+from app.repositories.task import RELEVANCE_SORT, SORT_FIELDS
+from app.responses import ORJSONResponse, adapter_response
+from app.schemas import (
+    MAX_BATCH_SIZE,
+    TaskBatchCreateResponse,
+    TaskBatchDeleteResponse,
+    TaskBatchItemResult,
+    TaskBatchSelector,
+    TaskBatchUpdate,
+    TaskBatchUpdateResponse,
+    TaskChangesResponse,
+    TaskCount,
+    TaskCreate,
+    TaskImportRejection,
+    TaskImportResponse,
+    TaskResponse,
+    TaskStatsResponse,
+    TaskUpdate,
+)
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+MAX_PAGE_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+IMPORT_SPOOL_SIZE = 16 * 1024 * 1024
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Clients may store task reads but must revalidate them (cheap, see get_tasks_version).
+TASKS_CACHE_CONTROL = "no-cache"
+SORT_PATTERN = rf"^(-?({'|'.join(SORT_FIELDS)})|{RELEVANCE_SORT})$"
+MAX_QUERY_LENGTH = 200
+EVENTS_HEARTBEAT_SECONDS = 15.0
+
+TASK_CREATE_ADAPTER = TypeAdapter(TaskCreate)
+TASK_BATCH_CREATE_ADAPTER = TypeAdapter(TaskBatchCreateResponse)
+TASK_BATCH_UPDATE_ADAPTER = TypeAdapter(TaskBatchUpdateResponse)
+
+
+async def get_tasks_version(session: AsyncSession = Depends(get_read_session)) -> int:
+    """Change version of the tasks table, used to validate cached task reads.
+
+    Read through the same session as the data so a lagging replica never pairs
+    old rows with a newer version.
+    """
+    return await TableVersionRepository(session).get_version(TaskModel.__tablename__)
+
 
 @router.get("", response_model=list[TaskResponse])
 async def list_tasks(
+        request: Request,
+        session: AsyncSession = Depends(get_read_session),
+        version: int = Depends(get_tasks_version),
+        status_id: int | None = Query(None),
+        priority_id: int | None = Query(None),
+        start_time: datetime | None = Query(None),
+        end_time: datetime | None = Query(None),
+        limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = Query(None),
+        sort: str | None = Query(None, pattern=SORT_PATTERN),
+        q: str | None = Query(None, min_length=1, max_length=MAX_QUERY_LENGTH),
+) -> Response:
+    """List tasks page by page.
+
+    The cursor for the next page is returned in the X-Next-Cursor header;
+    it is absent on the last page. A matching If-None-Match returns 304
+    without running the list query; other requests are served from the
+    result cache when possible.
+
+    q searches title and description; results are then sorted by relevance
+    unless another sort is given.
+    """
+    if sort is None:
+        sort = RELEVANCE_SORT if q is not None else "id"
+    etag = make_etag("tasks", version, status_id, priority_id, start_time, end_time, limit, cursor, sort, q)
+    if etag_matches(request, etag):
+        return not_modified(etag, TASKS_CACHE_CONTROL)
+
+    params = {
+        "limit": limit,
+        "cursor": cursor,
+        "sort": sort,
+        "q": q,
+        "status_id": status_id,
+        "priority_id": priority_id,
+        "start_time": start_time,
+        "end_time": end_time,
+    }
+    cache_key = task_cache.page_key(version, params)
+    page = await task_cache.get_page(cache_key)
+    if page is None:
+        repo = TaskRepository(session)
+        try:
+            rows, next_cursor = await repo.get_page(**params)
+        except CursorError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(exc),
+            ) from exc
+        # Rows are already shaped like TaskResponse; encode them directly instead of
+        # re-validating through response_model.
+        page = {"etag": etag, "next_cursor": next_cursor, "tasks": rows}
+        await task_cache.set_page(cache_key, page)
+
+    response = ORJSONResponse(page["tasks"])
+    if page["next_cursor"] is not None:
+        response.headers[NEXT_CURSOR_HEADER] = page["next_cursor"]
+    # A cached page keeps the ETag it was read under, so it is never paired
+    # with a newer version.
+    set_cache_headers(response, page["etag"], TASKS_CACHE_CONTROL)
+    return response
+
+
+@router.get("/stats", response_model=TaskStatsResponse)
+async def get_task_stats(
+        session: AsyncSession = Depends(get_read_session),
+        reference: ReferenceData = Depends(get_reference_data),
+) -> TaskStatsResponse:
+    """Live task counts per status and priority, plus overdue tasks.
+
+    Counts come from the task_counters table maintained by every task write,
+    so the cost does not grow with the number of tasks.
+    """
+    counts = await TaskCounterRepository(session).get_counts()
+    by_status: dict[int, int] = defaultdict(int)
+    by_priority: dict[int, int] = defaultdict(int)
+    for (status_id, priority_id), count in counts.items():
+        by_status[status_id] += count
+        by_priority[priority_id] += count
+
+    overdue = await TaskRepository(session).count_overdue(
+        datetime.now(timezone.utc), exclude_status_ids=reference.final_status_ids
+    )
+
+    return TaskStatsResponse(
+        total=sum(counts.values()),
+        by_status=[TaskCount(id=s.id, title=s.title, count=by_status[s.id]) for s in reference.statuses],
+        by_priority=[TaskCount(id=p.id, title=p.title, count=by_priority[p.id]) for p in reference.priorities],
+        overdue=overdue,
+    )
+
+
+@router.get("/changes", response_model=TaskChangesResponse)
+async def get_task_changes(
         session: AsyncSession = Depends(get_session),
+        since: str | None = Query(None),
+        limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> Response:
+    """Tasks created, updated or deleted since a change token, for delta sync.
+
+    Start without a token to get every task, then pass next_token on each
+    sync; while has_more is true, call again straight away. Deleted tasks
+    come back with deleted_at set, and a change may be returned more than
+    once, so apply changes by id. Tokens older than the archive retention
+    period are rejected with 400; sync again without a token. Served from
+    the primary, since a lagging replica could skip changes.
+    """
+    repo = TaskRepository(session)
+    try:
+        rows, next_token, has_more = await repo.get_changes(
+            since=since,
+            limit=limit,
+            expired_before=datetime.now(timezone.utc) - timedelta(days=settings.archive.retention_days),
+        )
+    except CursorError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+    return ORJSONResponse({"changes": rows, "next_token": next_token, "has_more": has_more})
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_task_events() -> StreamingResponse:
+    """Server-sent events for task changes.
+
+    Each "tasks" event lists the ids created, updated and deleted since the
+    previous one; a "resync" event means changes were dropped and the client
+    should refetch its list.
+    """
+    return StreamingResponse(
+        sse_stream(task_events.subscribe(), heartbeat=EVENTS_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/events/ws")
+async def task_events_websocket(websocket: WebSocket) -> None:
+    """The same change feed as /events, as JSON WebSocket messages."""
+    await websocket.accept()
+    subscription = task_events.subscribe()
+    try:
+        while True:
+            if not await subscription.wait(EVENTS_HEARTBEAT_SECONDS):
+                await websocket.send_json({"type": "ping"})
+                continue
+            batch = subscription.drain()
+            if batch is None:
+                await websocket.send_json({"type": "resync"})
+            elif any(batch.values()):
+                await websocket.send_json({"type": "tasks", **batch})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}}},
+)
+async def export_tasks(
+        session_maker: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker),
+        export_format: ExportFormat = Query("ndjson", alias="format"),
         status_id: int | None = Query(None),
         priority_id: int | None = Query(None),
         start_time: datetime | None = Query(None),
         end_time: datetime | None = Query(None),
-) -> list[TaskModel]:
+) -> StreamingResponse:
+    """Stream all matching tasks as NDJSON or CSV with constant memory."""
+    filters = {
+        "status_id": status_id,
+        "priority_id": priority_id,
+        "start_time": start_time,
+        "end_time": end_time,
+    }
+
+    async def body() -> AsyncIterator[bytes]:
+        # The request-scoped session is closed before the body is sent,
+        # so the stream owns its own session.
+        async with session_maker() as session:
+            batches = TaskRepository(session).stream_batches(batch_size=EXPORT_BATCH_SIZE, **filters)
+            async for chunk in encode_stream(batches, export_format):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format}"'},
+    )
+
+
+@router.post("/batch", response_model=TaskBatchCreateResponse)
+async def create_tasks_batch(
+        items: list[Any] = Body(..., min_length=1, max_length=MAX_BATCH_SIZE),
+        session: AsyncSession = Depends(get_session),
+        reference: ReferenceData = Depends(get_reference_data),
+) -> Response:
+    """Create many tasks in one transaction.
+
+    Items are validated one by one; invalid items are reported in their result
+    and the valid ones are still created.
+    """
+    if reference.default_status_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No statuses available",
+        )
+    if reference.default_priority_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No priorities available",
+        )
+
+    results: list[TaskBatchItemResult] = []
+    valid_rows: list[dict[str, Any]] = []
+    valid_results: list[TaskBatchItemResult] = []
+    for index, item in enumerate(items):
+        result = TaskBatchItemResult(index=index)
+        results.append(result)
+        try:
+            body = TASK_CREATE_ADAPTER.validate_python(item)
+        except ValidationError as exc:
+            result.errors = exc.errors(include_url=False, include_context=False)
+            continue
+        valid_rows.append({
+            "title": body.title,
+            "description": body.description,
+            "status_id": reference.default_status_id,
+            "priority_id": reference.default_priority_id,
+        })
+        valid_results.append(result)
+
+    tasks = await TaskRepository(session).create_many(valid_rows)
+    await notify_task_events(session, "created", [task.id for task in tasks])
+    await session.commit()
+
+    for result, task in zip(valid_results, tasks):
+        result.task = TaskResponse.model_validate(task)
+
+    return adapter_response(
+        TASK_BATCH_CREATE_ADAPTER,
+        TaskBatchCreateResponse(created=len(tasks), failed=len(items) - len(tasks), results=results),
+    )
+
+
+async def _ensure_filter_within_batch_cap(repo: TaskRepository, filters: dict) -> None:
+    """Reject a batch filter that matches more than MAX_BATCH_SIZE tasks."""
+    if filters and await repo.count_matching(MAX_BATCH_SIZE, **filters) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Filter matches more than {MAX_BATCH_SIZE} tasks; narrow it or select by ids",
+        )
+
+
+@router.patch("/batch", response_model=TaskBatchUpdateResponse)
+async def update_tasks_batch(
+        body: TaskBatchUpdate,
+        session: AsyncSession = Depends(get_session),
+        reference: ReferenceData = Depends(get_reference_data),
+) -> Response:
+    """Apply the same changes to tasks selected by ids or by list filters.
+
+    A filter may match at most MAX_BATCH_SIZE tasks, the same limit as ids.
+    """
+    update_data = body.changes.model_dump(exclude_unset=True)
+
+    if "status_id" in update_data and not reference.status_exists(update_data["status_id"]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid status_id",
+        )
+    if "priority_id" in update_data and not reference.priority_exists(update_data["priority_id"]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid priority_id",
+        )
+
     repo = TaskRepository(session)
-    return list(await repo.get_multi(
-        status_id=status_id,
-        priority_id=priority_id,
-        start_time=start_time,
-        end_time=end_time,
-    ))
+    filters = body.filter.model_dump() if body.filter is not None else {}
+    await _ensure_filter_within_batch_cap(repo, filters)
+    tasks = await repo.update_many(update_data, ids=body.ids, **filters)
+    if update_data:
+        await notify_task_events(session, "updated", [task.id for task in tasks])
+    await session.commit()
 
+    missing_ids: list[int] = []
+    if body.ids is not None:
+        found = {task.id for task in tasks}
+        missing_ids = sorted(set(body.ids) - found)
 
-@router.get("/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: int, session: AsyncSession = Depends(get_session)) -> TaskModel:
-    """Get a single task by id."""
+    return adapter_response(
+        TASK_BATCH_UPDATE_ADAPTER,
+        TaskBatchUpdateResponse(
+            updated=len(tasks),
+            missing_ids=missing_ids,
+            tasks=[TaskResponse.model_validate(task) for task in tasks],
+        ),
+    )
+
+
+@router.post("/batch/delete", response_model=TaskBatchDeleteResponse)
+async def delete_tasks_batch(
+        body: TaskBatchSelector,
+        session: AsyncSession = Depends(get_session),
+) -> TaskBatchDeleteResponse:
+    """Soft delete tasks selected by ids or by list filters.
+
+    The filter must set at least one field and may match at most
+    MAX_BATCH_SIZE tasks, the same limit as ids.
+    """
     repo = TaskRepository(session)
-    task = await repo.get_single(task_id)
-    if not task:
+    filters = body.filter.model_dump() if body.filter is not None else {}
+    await _ensure_filter_within_batch_cap(repo, filters)
+    deleted_ids = await repo.soft_delete_many(ids=body.ids, **filters)
+    await notify_task_events(session, "deleted", deleted_ids)
+    await session.commit()
+
+    missing_ids: list[int] = []
+    if body.ids is not None:
+        missing_ids = sorted(set(body.ids) - set(deleted_ids))
+
+    return TaskBatchDeleteResponse(deleted_ids=deleted_ids, missing_ids=missing_ids)
+
+
+@router.post("/import", response_model=TaskImportResponse)
+async def import_tasks_endpoint(
+        request: Request,
+        import_format: ImportFormat = Query("csv", alias="format"),
+        session: AsyncSession = Depends(get_session),
+        reference: ReferenceData = Depends(get_reference_data),
+) -> TaskImportResponse:
+    """Bulk import tasks from a raw CSV or NDJSON request body.
+
+    Rows that fail validation are skipped and reported; the rest are imported
+    in one transaction.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+
+        stream = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+        try:
+            report = await import_tasks(session, stream, import_format, reference)
+        except UnicodeDecodeError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body must be UTF-8 encoded",
+            ) from exc
+        finally:
+            stream.detach()
+
+    if report.imported:
+        # New ids are not known on the COPY path; tell subscribers to refetch.
+        await notify_task_resync(session)
+        await session.commit()
+
+    return TaskImportResponse(
+        total=report.total,
+        imported=report.imported,
+        rejected=report.rejected,
+        rejections=[TaskImportRejection(row=row, reason=reason) for row, reason in report.rejections],
+        elapsed_seconds=report.elapsed_seconds,
+        rows_per_second=report.rows_per_second,
+    )
+
+
+@router.get("/{task_id}", response_model=TaskResponse)
+async def get_task(
+        task_id: int,
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_read_session),
+        version: int = Depends(get_tasks_version),
+) -> dict[str, Any] | Response:
+    """Get a single task by id. Missing tasks are cached briefly as well."""
+    etag = make_etag("task", version, task_id)
+    if etag_matches(request, etag):
+        return not_modified(etag, TASKS_CACHE_CONTROL)
+
+    cache_key = task_cache.task_key(version, task_id)
+    entry = await task_cache.get_task(cache_key)
+    if entry is None:
+        task = await TaskRepository(session).get_single(task_id)
+        entry = {"etag": etag, "task": TaskResponse.model_validate(task).model_dump(mode="json") if task else None}
+        await task_cache.set_task(cache_key, entry["etag"], entry["task"])
+
+    if entry["task"] is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
-    return task
+    set_cache_headers(response, entry["etag"], TASKS_CACHE_CONTROL)
+    return entry["task"]
 
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-async def create_task(body: TaskCreate, session: AsyncSession = Depends(get_session)) -> TaskModel:
+async def create_task(
+        body: TaskCreate,
+        session: AsyncSession = Depends(get_session),
+        reference: ReferenceData = Depends(get_reference_data),
+) -> TaskModel:
     """Create a new task."""
-    status_repo = BaseRepository(TaskStatusModel, session)
-    priority_repo = BaseRepository(TaskPriorityModel, session)
     task_repo = TaskRepository(session)
 
-    # Get default status (first one)
-    statuses = await status_repo.get_all()
-    if not statuses:
+    if reference.default_status_id is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No statuses available",
         )
-    default_status = statuses[0]
-
-    # Get default priority (second one = Normal, or first if only one)
-    priorities = await priority_repo.get_all()
-    if not priorities:
+    if reference.default_priority_id is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No priorities available",
         )
-    default_priority = priorities[1] if len(priorities) > 1 else priorities[0]
 
     task = await task_repo.create(
         title=body.title,
         description=body.description,
-        status_id=default_status.id,
-        priority_id=default_priority.id,
+        status_id=reference.default_status_id,
+        priority_id=reference.default_priority_id,
     )
+    await notify_task_events(session, "created", [task.id])
     await session.commit()
     return task
 
 
 @router.patch("/{task_id}", response_model=TaskResponse)
 async def update_task(
-        task_id: int, body: TaskUpdate, session: AsyncSession = Depends(get_session)
+        task_id: int,
+        body: TaskUpdate,
+        session: AsyncSession = Depends(get_session),
+        reference: ReferenceData = Depends(get_reference_data),
 ) -> TaskModel:
     """Update an existing task."""
     task_repo = TaskRepository(session)
-    status_repo = BaseRepository(TaskStatusModel, session)
-    priority_repo = BaseRepository(TaskPriorityModel, session)
-
-    task = await task_repo.get_single(task_id)
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found",
-        )
-
     update_data = body.model_dump(exclude_unset=True)
 
     # Validate status_id if provided
     if "status_id" in update_data:
-        if not await status_repo.exists(update_data["status_id"]):
+        if not reference.status_exists(update_data["status_id"]):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid status_id",
@@ -107,13 +531,19 @@ async def update_task(
 
     # Validate priority_id if provided
     if "priority_id" in update_data:
-        if not await priority_repo.exists(update_data["priority_id"]):
+        if not reference.priority_exists(update_data["priority_id"]):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid priority_id",
             )
 
     task = await task_repo.update(task_id, **update_data)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found",
+        )
+    await notify_task_events(session, "updated", [task_id])
     await session.commit()
     return task
 
@@ -128,4 +558,34 @@ async def delete_task(task_id: int, session: AsyncSession = Depends(get_session)
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
+    await notify_task_events(session, "deleted", [task_id])
+    await session.commit()
+
+
+@router.post("/{task_id}/restore", response_model=TaskResponse)
+async def restore_task(task_id: int, session: AsyncSession = Depends(get_session)) -> TaskModel:
+    """Undelete a task, including one already moved to the archive.
+
+    An archived task whose status or priority has since been deleted cannot be
+    restored and returns 409.
+    """
+    repo = TaskRepository(session)
+    live = await repo.get_single(task_id)
+    if live is not None:
+        return live
+    try:
+        task = await repo.restore(task_id)
+    except RestoreConflictError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc),
+        ) from exc
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found",
+        )
+    await notify_task_events(session, "created", [task_id])
     await session.commit()
+    TASKS_RESTORED.inc()
+    return task
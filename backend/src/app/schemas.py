@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+MAX_BATCH_SIZE = 10_000
 
 
 class BaseSchema(BaseModel):
@@ -13,6 +16,7 @@ class BaseSchema(BaseModel):
 class TaskStatus(BaseSchema):
     id: int
     title: str
+    is_final: bool = False
 
 
 class TaskPriority(BaseSchema):
@@ -21,7 +25,7 @@ class TaskPriority(BaseSchema):
 
 
 class TaskBase(BaseModel):
-    title: str
+    title: str = Field(max_length=255)
     description: str | None = None
 
 
@@ -30,7 +34,7 @@ class TaskCreate(TaskBase):
 
 
 class TaskUpdate(BaseModel):
-    title: str | None = None
+    title: str | None = Field(default=None, max_length=255)
     description: str | None = None
     start_time: datetime | None = None
     end_time: datetime | None = None
@@ -47,4 +51,94 @@ class TaskResponse(BaseSchema):
     start_time: datetime | None
     end_time: datetime | None
     created_at: datetime
+    updated_at: datetime
     deleted_at: datetime | None
+
+
+class TaskChangesResponse(BaseModel):
+    """Tasks changed since a token; deleted tasks have deleted_at set."""
+
+    changes: list[TaskResponse]
+    next_token: str
+    has_more: bool
+
+
+class TaskBatchItemResult(BaseModel):
+    """Outcome for one item of a batch request, in request order."""
+
+    index: int
+    task: TaskResponse | None = None
+    errors: list[dict[str, Any]] | None = None
+
+
+class TaskBatchCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[TaskBatchItemResult]
+
+
+class TaskFilter(BaseModel):
+    """Same filters as GET /api/tasks."""
+
+    status_id: int | None = None
+    priority_id: int | None = None
+    start_time: datetime | None = None
+    end_time: datetime | None = None
+
+
+class TaskBatchSelector(BaseModel):
+    """Selects tasks for a batch operation by explicit ids or by filter, never both."""
+
+    ids: list[int] | None = Field(default=None, min_length=1, max_length=MAX_BATCH_SIZE)
+    filter: TaskFilter | None = None
+
+    @model_validator(mode="after")
+    def check_exactly_one(self) -> "TaskBatchSelector":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Exactly one of 'ids' or 'filter' must be given")
+        # An empty filter would select every live task.
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("'filter' must set at least one field")
+        return self
+
+
+class TaskBatchUpdate(TaskBatchSelector):
+    changes: TaskUpdate
+
+
+class TaskBatchUpdateResponse(BaseModel):
+    updated: int
+    missing_ids: list[int] = Field(default_factory=list)
+    tasks: list[TaskResponse]
+
+
+class TaskBatchDeleteResponse(BaseModel):
+    deleted_ids: list[int]
+    missing_ids: list[int] = Field(default_factory=list)
+
+
+class TaskImportRejection(BaseModel):
+    row: int
+    reason: str
+
+
+class TaskImportResponse(BaseModel):
+    total: int
+    imported: int
+    rejected: int
+    rejections: list[TaskImportRejection]
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+class TaskCount(BaseModel):
+    id: int
+    title: str
+    count: int
+
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    by_status: list[TaskCount]
+    by_priority: list[TaskCount]
+    overdue: int
@@ -0,0 +1,63 @@
+"""Full-text search over task title and description.
+
+PostgreSQL keeps a generated tsvector column with a partial GIN index;
+SQLite keeps an FTS5 external-content table synced by triggers. Neither
+object is declared on the ORM model, so the DDL below is attached to the
+tasks table in app.models and skipped by Alembic autogenerate.
+"""
+
+import re
+
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_INDEX = "ix_tasks_live_search"
+FTS_TABLE = "tasks_fts"
+MAX_SEARCH_TERMS = 8
+
+# Title matches outrank description matches.
+POSTGRESQL_DDL = [
+    f"ALTER TABLE tasks ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+    ") STORED",
+    f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON tasks USING gin ({SEARCH_VECTOR_COLUMN}) "
+    "WHERE deleted_at IS NULL",
+]
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, description, content='tasks', content_rowid='id', tokenize='unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+]
+SQLITE_DROP_DDL = [f"DROP TABLE IF EXISTS {FTS_TABLE}"]
+
+# Schema objects created by the DDL above; Alembic must not try to drop them.
+UNMANAGED_COLUMNS = {SEARCH_VECTOR_COLUMN}
+UNMANAGED_INDEXES = {SEARCH_INDEX}
+UNMANAGED_TABLES = {FTS_TABLE, *(f"{FTS_TABLE}_{suffix}" for suffix in ("data", "idx", "content", "docsize", "config"))}
+
+
+def search_terms(q: str) -> list[str]:
+    """Split user input into lowercase word terms, dropping query syntax."""
+    return re.findall(r"\w+", q.lower())[:MAX_SEARCH_TERMS]
+
+
+def tsquery_text(terms: list[str]) -> str:
+    """to_tsquery input matching every term as a prefix."""
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def fts5_query(terms: list[str]) -> str:
+    """FTS5 MATCH input matching every term as a prefix."""
+    return " ".join(f'"{term}"*' for term in terms)
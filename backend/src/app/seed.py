@@ -1,14 +1,41 @@
+"""Reference data seeding at startup.
+
+The seed version (a digest of the seeder files) is stored in app_state once
+seeding succeeds. At startup a single query reads it together with the
+Alembic revision of the database; when the seed version is current nothing
+else runs, so scale-outs reach readiness without writing to the database.
+"""
+import hashlib
 import json
+import logging
+from functools import cache
 from pathlib import Path
+from typing import Literal
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import column, select, table
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.config import BASE_DIR
 from app.database import AsyncSessionLocal
+from app.models import AppState as AppStateModel
 from app.models import TaskPriority as TaskPriorityModel
 from app.models import TaskStatus as TaskStatusModel
+from app.reference import reference_registry
+from app.repositories import AppStateRepository
 from app.repositories.base import BaseRepository
 
+logger = logging.getLogger(__name__)
+
 CONFIG_DIR = Path(__file__).resolve().parent.parent.parent / "seeders"
+SEED_FILES = {TaskStatusModel: "statuses.json", TaskPriorityModel: "priorities.json"}
+SEED_VERSION_KEY = "seed_version"
+
+SeedMode = Literal["auto", "always", "never"]
+
+alembic_version = table("alembic_version", column("version_num"))
 
 
 def load_json(filename: str) -> list[dict]:
@@ -17,29 +44,64 @@ def load_json(filename: str) -> list[dict]:
         return json.load(f)
 
 
-async def seed_statuses(session: AsyncSession) -> None:
-    """Seed statuses from JSON file if they don't exist."""
-    repo = BaseRepository(TaskStatusModel, session)
-    existing_ids = await repo.get_existing_ids()
+@cache
+def seed_version() -> str:
+    """Digest of the seeder files; changes whenever seed data changes."""
+    digest = hashlib.sha256()
+    for filename in sorted(SEED_FILES.values()):
+        digest.update(filename.encode())
+        digest.update((CONFIG_DIR / filename).read_bytes())
+    return digest.hexdigest()[:16]
 
-    for data in load_json("statuses.json"):
-        if data["id"] not in existing_ids:
-            await repo.create(**data)
 
+@cache
+def schema_head() -> str | None:
+    """Alembic head revision this code expects."""
+    config = Config(str(BASE_DIR.parent / "alembic.ini"))
+    config.set_main_option("script_location", str(BASE_DIR.parent / "migrations"))
+    return ScriptDirectory.from_config(config).get_current_head()
 
-async def seed_priorities(session: AsyncSession) -> None:
-    repo = BaseRepository(TaskPriorityModel, session)
-    existing_ids = await repo.get_existing_ids()
 
-    for data in load_json("priorities.json"):
-        if data["id"] not in existing_ids:
-            await repo.create(**data)
+async def stored_versions(session: AsyncSession) -> tuple[str | None, str | None]:
+    """(schema revision, seed version) recorded in the database, in one query."""
+    row = (await session.execute(select(
+        select(alembic_version.c.version_num).limit(1).scalar_subquery(),
+        select(AppStateModel.value).where(AppStateModel.key == SEED_VERSION_KEY).scalar_subquery(),
+    ))).one()
+    return row[0], row[1]
 
 
-async def seed_all() -> None:
-    """Seed all reference data."""
-    async with AsyncSessionLocal() as session:
-        await seed_statuses(session)
-        await seed_priorities(session)
-        await session.commit()
+async def seed_reference_data(session: AsyncSession) -> None:
+    """Insert missing statuses and priorities; existing rows are left as they are."""
+    for model, filename in SEED_FILES.items():
+        await BaseRepository(model, session).insert_missing(load_json(filename))
+    await AppStateRepository(session).set(SEED_VERSION_KEY, seed_version())
+
 
+async def seed_all(
+        mode: SeedMode = "auto",
+        session_maker: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> bool:
+    """Seed reference data unless the database already has this seed version.
+
+    Returns True if seeding ran.
+    """
+    if mode == "never":
+        return False
+    async with session_maker() as session:
+        if mode == "auto":
+            try:
+                schema, seeded = await stored_versions(session)
+            except DBAPIError:
+                # Schema created without Alembic (tests, create_all): just seed.
+                await session.rollback()
+                schema, seeded = schema_head(), None
+            if schema != schema_head():
+                logger.warning("Database schema is at %s, code expects %s; run `alembic upgrade head`",
+                               schema, schema_head())
+            if seeded == seed_version():
+                return False
+        await seed_reference_data(session)
+        await session.commit()
+    reference_registry.invalidate()
+    return True
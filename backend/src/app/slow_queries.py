@@ -0,0 +1,207 @@
+"""Slow query log.
+
+Statements slower than the configured threshold are logged with their
+bound parameters, the route that ran them, the duration and a plan. The
+plan comes from EXPLAIN on a separate connection of the same engine, run
+after the statement finished: on PostgreSQL SELECTs get
+EXPLAIN (ANALYZE, BUFFERS) and writes a plain EXPLAIN, so nothing is
+written twice; on SQLite EXPLAIN QUERY PLAN. Slow statements are sampled,
+capped per minute and explained one at a time, so a burst of them cannot
+turn the log itself into a bottleneck.
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import Scope
+
+from app.config import SlowQuerySettings
+from app.metrics import DB_SLOW_QUERIES
+
+logger = logging.getLogger(__name__)
+
+# Set by QueryStatsMiddleware for the duration of a request.
+current_request_scope: ContextVar[Scope | None] = ContextVar("current_request_scope", default=None)
+# Set while running EXPLAIN, so the EXPLAIN itself is never logged.
+_explaining: ContextVar[bool] = ContextVar("slow_query_explaining", default=False)
+
+RATE_WINDOW_SECONDS = 60.0
+_LOCKING_CLAUSE = re.compile(r"\bFOR\s+(UPDATE|NO\s+KEY\s+UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE)
+_WRITE_KEYWORD = re.compile(r"\b(INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+
+def request_route() -> str | None:
+    """Method and route template of the current request, if it matched one."""
+    scope = current_request_scope.get()
+    if scope is None or scope.get("route") is None:
+        return None
+    return f"{scope['method']} {scope['route'].path}"
+
+
+def explain_sql(dialect: str, statement: str) -> str | None:
+    """EXPLAIN statement for a logged statement, or None if it cannot be explained."""
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    if keyword not in {"SELECT", "WITH", "INSERT", "UPDATE", "DELETE"}:
+        return None
+    if dialect == "sqlite":
+        return f"EXPLAIN QUERY PLAN {statement}"
+    if dialect != "postgresql":
+        return None
+    # ANALYZE executes the statement: only for reads that take no row locks.
+    writes = keyword in {"INSERT", "UPDATE", "DELETE"} or (keyword == "WITH" and _WRITE_KEYWORD.search(statement))
+    if writes or _LOCKING_CLAUSE.search(statement):
+        return f"EXPLAIN {statement}"
+    return f"EXPLAIN (ANALYZE, BUFFERS) {statement}"
+
+
+def format_plan(dialect: str, rows: list[tuple]) -> str:
+    if dialect == "sqlite":
+        # EXPLAIN QUERY PLAN rows are (id, parent, notused, detail).
+        depth = {0: -1}
+        lines = []
+        for id, parent, _, detail in rows:
+            depth[id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[id] + detail)
+        return "\n".join(lines)
+    return "\n".join(row[0] for row in rows)
+
+
+def format_parameters(parameters: Any, executemany: bool, max_length: int) -> str:
+    def shorten(value: Any) -> str:
+        text = repr(value)
+        return text if len(text) <= max_length else f"{text[:max_length]}..."
+
+    def one(params: Any) -> str:
+        if isinstance(params, dict):
+            return "{" + ", ".join(f"{key!r}: {shorten(value)}" for key, value in params.items()) + "}"
+        return "(" + ", ".join(shorten(value) for value in params or ()) + ")"
+
+    if executemany:
+        return f"{len(parameters)} sets, first {one(parameters[0])}" if parameters else "0 sets"
+    return one(parameters)
+
+
+class SlowQueryLog:
+    """Log statements slower than settings.threshold_ms on instrumented engines."""
+
+    def __init__(self, settings: SlowQuerySettings):
+        self.settings = settings
+        self._engines: dict[Engine, AsyncEngine] = {}
+        self._window_started = float("-inf")
+        self._logged_in_window = 0
+        self._suppressed = 0
+        self._explain_running = False
+        self._tasks: set[asyncio.Task] = set()
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        if not self.settings.enabled:
+            return
+        self._engines[engine.sync_engine] = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    async def drain(self) -> None:
+        """Wait for pending EXPLAINs and their log lines."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        context.slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, "slow_query_started", None)
+        if started is None or _explaining.get():
+            return
+        milliseconds = (time.perf_counter() - started) * 1000
+        if milliseconds < self.settings.threshold_ms:
+            return
+        route = request_route()
+        DB_SLOW_QUERIES.labels(route or "-").inc()
+        if not self._admit():
+            return
+
+        entry = {
+            "duration_ms": milliseconds,
+            "route": route or "-",
+            "statement": statement,
+            "parameters": format_parameters(parameters, executemany, self.settings.max_parameter_length),
+            "suppressed": self._take_suppressed(),
+        }
+        explain = explain_sql(conn.dialect.name, statement) if self.settings.explain else None
+        engine = self._engines.get(conn.engine)
+        if explain is None or engine is None or self._explain_running:
+            self._emit(entry, None)
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._emit(entry, None)
+            return
+        explain_parameters = parameters[0] if executemany else parameters
+        self._explain_running = True
+        # A fresh context, so the EXPLAIN is not counted in the request's QueryStats.
+        task = loop.create_task(
+            self._explain_and_emit(engine, explain, explain_parameters, entry),
+            context=contextvars.Context(),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._explain_done)
+
+    def _explain_done(self, task: asyncio.Task) -> None:
+        # Also runs for a task cancelled before it started.
+        self._tasks.discard(task)
+        self._explain_running = False
+
+    def _admit(self) -> bool:
+        """Sample, then apply the per-minute cap."""
+        if random.random() >= self.settings.sample_rate:
+            return False
+        now = time.monotonic()
+        if now - self._window_started >= RATE_WINDOW_SECONDS:
+            self._window_started = now
+            self._logged_in_window = 0
+        if self._logged_in_window >= self.settings.max_per_minute:
+            self._suppressed += 1
+            return False
+        self._logged_in_window += 1
+        return True
+
+    def _take_suppressed(self) -> int:
+        suppressed, self._suppressed = self._suppressed, 0
+        return suppressed
+
+    async def _explain_and_emit(self, engine: AsyncEngine, explain: str, parameters: Any, entry: dict) -> None:
+        _explaining.set(True)
+        try:
+            async with engine.connect() as conn:
+                if engine.dialect.name == "postgresql":
+                    await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {self.settings.explain_timeout_ms}")
+                result = await conn.exec_driver_sql(explain, parameters)
+                plan = format_plan(engine.dialect.name, [tuple(row) for row in result.all()])
+                await conn.rollback()
+        except Exception as exc:
+            logger.debug("EXPLAIN of a slow query failed", exc_info=True)
+            plan = f"EXPLAIN failed: {exc}"
+        self._emit(entry, plan)
+
+    def _emit(self, entry: dict, plan: str | None) -> None:
+        suppressed = f" ({entry['suppressed']} more not logged)" if entry["suppressed"] else ""
+        logger.warning(
+            "Slow query: %.1f ms on %s%s\n%s\nparameters: %s%s",
+            entry["duration_ms"],
+            entry["route"],
+            suppressed,
+            entry["statement"],
+            entry["parameters"],
+            f"\nplan:\n{plan}" if plan is not None else "",
+            extra={"slow_query": {**entry, "plan": plan}},
+        )
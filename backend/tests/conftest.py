@@ -1,5 +1,6 @@
 """Pytest fixtures for testing."""
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
 from datetime import datetime, timezone
 
 import pytest
@@ -8,17 +9,36 @@ from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
-from app.database import Base, get_session
+from app.cache import MemoryCache, task_cache
+from app.database import Base, get_read_session, get_session, get_sessionmaker
 from app.main import app
 from app.models import Task as TaskModel
 from app.models import TaskPriority as TaskPriorityModel
 from app.models import TaskStatus as TaskStatusModel
+from app.reference import reference_registry
 
 
 # In-memory SQLite for tests (async via aiosqlite)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
+@pytest.fixture(autouse=True)
+def reset_reference_registry():
+    """Process-wide reference data must not leak between tests."""
+    reference_registry.invalidate()
+    yield
+    reference_registry.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def reset_task_cache():
+    """Give each test an empty result cache."""
+    backend = task_cache.backend
+    task_cache.backend = MemoryCache()
+    yield task_cache
+    task_cache.backend = backend
+
+
 @pytest.fixture
 async def async_engine():
     """Create async engine for tests."""
@@ -36,6 +56,35 @@ async def async_engine():
     await engine.dispose()
 
 
+@pytest.fixture
+def query_budget(async_engine) -> Callable[[int], AbstractContextManager[list[str]]]:
+    """Fail the test if a block runs more SQL statements than allowed.
+
+        with query_budget(2) as statements:
+            await client.get("/api/tasks")
+
+    Counts every statement sent to the test engine, by the API or a
+    repository alike. On failure the statements are listed in order.
+    """
+    @contextmanager
+    def budget(limit: int) -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(f"{statement}  -- {parameters}")
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+        if len(statements) > limit:
+            listing = "\n".join(f"  {number}. {statement}" for number, statement in enumerate(statements, 1))
+            pytest.fail(f"Ran {len(statements)} SQL statements, budget is {limit}:\n{listing}", pytrace=False)
+
+    return budget
+
+
 @pytest.fixture
 async def db_session(async_engine) -> AsyncGenerator[AsyncSession, None]:
     """Create a test database session."""
@@ -55,7 +104,7 @@ async def db_session_with_data(db_session: AsyncSession) -> AsyncGenerator[Async
     statuses = [
         TaskStatusModel(id=1, title="To Do"),
         TaskStatusModel(id=2, title="In Progress"),
-        TaskStatusModel(id=3, title="Done"),
+        TaskStatusModel(id=3, title="Done", is_final=True),
     ]
     db_session.add_all(statuses)
 
@@ -124,6 +173,8 @@ async def client(async_engine) -> AsyncGenerator[AsyncClient, None]:
             yield session
 
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_sessionmaker] = lambda: async_session_maker
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -146,7 +197,7 @@ async def client_with_data(async_engine) -> AsyncGenerator[AsyncClient, None]:
         statuses = [
             TaskStatusModel(id=1, title="To Do"),
             TaskStatusModel(id=2, title="In Progress"),
-            TaskStatusModel(id=3, title="Done"),
+            TaskStatusModel(id=3, title="Done", is_final=True),
         ]
         session.add_all(statuses)
 
@@ -163,6 +214,8 @@ async def client_with_data(async_engine) -> AsyncGenerator[AsyncClient, None]:
             yield session
 
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_sessionmaker] = lambda: async_session_maker
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -185,7 +238,7 @@ async def client_with_tasks(async_engine) -> AsyncGenerator[AsyncClient, None]:
         statuses = [
             TaskStatusModel(id=1, title="To Do"),
             TaskStatusModel(id=2, title="In Progress"),
-            TaskStatusModel(id=3, title="Done"),
+            TaskStatusModel(id=3, title="Done", is_final=True),
         ]
         session.add_all(statuses)
 
@@ -235,6 +288,8 @@ async def client_with_tasks(async_engine) -> AsyncGenerator[AsyncClient, None]:
             yield session
 
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_sessionmaker] = lambda: async_session_maker
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -62,3 +62,33 @@ class TestGetStatus:
         response = await client_with_data.get("/api/tasks/statuses/invalid")
         assert response.status_code == 422
 
+
+
+class TestStatusesHttpCaching:
+    """Tests for cache headers on status endpoints."""
+
+    async def test_list_sends_cache_headers(self, client_with_data):
+        """List response carries ETag and a short-lived Cache-Control."""
+        response = await client_with_data.get("/api/tasks/statuses")
+        assert response.headers["etag"].startswith('"ref-')
+        assert "max-age" in response.headers["cache-control"]
+
+    async def test_list_not_modified(self, client_with_data):
+        """Matching If-None-Match returns 304 without body."""
+        etag = (await client_with_data.get("/api/tasks/statuses")).headers["etag"]
+        response = await client_with_data.get("/api/tasks/statuses", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    async def test_get_not_modified(self, client_with_data):
+        """Single status honours If-None-Match too."""
+        etag = (await client_with_data.get("/api/tasks/statuses/1")).headers["etag"]
+        response = await client_with_data.get("/api/tasks/statuses/1", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    async def test_stale_etag_returns_body(self, client_with_data):
+        """Non-matching ETag returns full response."""
+        response = await client_with_data.get("/api/tasks/statuses", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert len(response.json()) == 3
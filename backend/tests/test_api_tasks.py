@@ -1,7 +1,18 @@
 """Tests for tasks API endpoints."""
-from datetime import datetime, timezone
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
 
 import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.events import task_events
+from app.models import Task as TaskModel
+from app.models import TaskArchive as TaskArchiveModel
+from app.pagination import encode_cursor
+from app.repositories import TableVersionRepository, TaskRepository
 
 
 class TestListTasks:
@@ -64,6 +75,114 @@ class TestListTasks:
         assert response.json() == []
 
 
+    async def test_limit(self, client_with_tasks):
+        """Returns at most `limit` tasks and a cursor for the rest."""
+        response = await client_with_tasks.get("/api/tasks?limit=1")
+        assert response.status_code == 200
+        assert [t["id"] for t in response.json()] == [1]
+        cursor = response.headers["x-next-cursor"]
+
+        response = await client_with_tasks.get("/api/tasks", params={"limit": 1, "cursor": cursor})
+        assert [t["id"] for t in response.json()] == [2]
+        assert "x-next-cursor" not in response.headers
+
+    async def test_sort_descending(self, client_with_tasks):
+        """Sort key with leading minus reverses order."""
+        response = await client_with_tasks.get("/api/tasks?sort=-id")
+        assert [t["id"] for t in response.json()] == [2, 1]
+
+    async def test_invalid_sort(self, client_with_tasks):
+        """Unknown sort key returns 422."""
+        response = await client_with_tasks.get("/api/tasks?sort=description")
+        assert response.status_code == 422
+
+    async def test_invalid_cursor(self, client_with_tasks):
+        """Malformed cursor returns 400."""
+        response = await client_with_tasks.get("/api/tasks?cursor=garbage")
+        assert response.status_code == 400
+
+    async def test_tampered_cursor(self, client_with_tasks):
+        """A cursor value of the wrong type for the sort column returns 400."""
+        cursor = encode_cursor({"s": "created_at", "v": 12345, "id": 1})
+        response = await client_with_tasks.get("/api/tasks", params={"sort": "created_at", "cursor": cursor})
+        assert response.status_code == 400
+
+    async def test_limit_out_of_range(self, client_with_tasks):
+        """Limit above maximum returns 422."""
+        response = await client_with_tasks.get("/api/tasks?limit=100000")
+        assert response.status_code == 422
+
+    async def test_list_items_match_single_task(self, client_with_tasks):
+        """List items are serialized exactly like GET /tasks/{id}."""
+        listed = (await client_with_tasks.get("/api/tasks")).json()
+        for item in listed:
+            single = await client_with_tasks.get(f"/api/tasks/{item['id']}")
+            assert item == single.json()
+
+
+class TestSearchTasks:
+    """Tests for GET /api/tasks?q=."""
+
+    async def test_search(self, client_with_tasks):
+        """q matches title and description words, deleted tasks excluded."""
+        response = await client_with_tasks.get("/api/tasks?q=description")
+        assert [t["id"] for t in response.json()] == [1]
+
+    async def test_search_with_filters(self, client_with_tasks):
+        """q combines with list filters."""
+        response = await client_with_tasks.get("/api/tasks?q=task&status_id=2")
+        assert [t["id"] for t in response.json()] == [2]
+
+    async def test_search_explicit_sort(self, client_with_tasks):
+        """An explicit sort overrides relevance."""
+        response = await client_with_tasks.get("/api/tasks?q=task&sort=-id")
+        assert [t["id"] for t in response.json()] == [2, 1]
+
+    async def test_relevance_without_query(self, client_with_tasks):
+        """Relevance sort needs q."""
+        response = await client_with_tasks.get("/api/tasks?sort=relevance")
+        assert response.status_code == 400
+
+    async def test_empty_query_rejected(self, client_with_tasks):
+        """Empty q is a validation error."""
+        response = await client_with_tasks.get("/api/tasks?q=")
+        assert response.status_code == 422
+
+
+class TestTaskStats:
+    """Tests for GET /api/tasks/stats."""
+
+    async def test_empty(self, client_with_data):
+        """Every status and priority is listed, with zero counts."""
+        response = await client_with_data.get("/api/tasks/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 0
+        assert data["overdue"] == 0
+        assert [(c["id"], c["count"]) for c in data["by_status"]] == [(1, 0), (2, 0), (3, 0)]
+
+    async def test_counts_follow_writes(self, client_with_data):
+        """Creates, status changes and deletes are reflected immediately."""
+        ids = [(await client_with_data.post("/api/tasks", json={"title": f"T{i}"})).json()["id"] for i in range(3)]
+        await client_with_data.patch(f"/api/tasks/{ids[0]}", json={"status_id": 2, "priority_id": 1})
+        await client_with_data.delete(f"/api/tasks/{ids[1]}")
+
+        data = (await client_with_data.get("/api/tasks/stats")).json()
+        assert data["total"] == 2
+        assert {c["id"]: c["count"] for c in data["by_status"]} == {1: 1, 2: 1, 3: 0}
+        assert {c["id"]: c["count"] for c in data["by_priority"]} == {1: 1, 2: 1, 3: 0}
+
+    async def test_overdue(self, client_with_data):
+        """Overdue counts live tasks past end_time that are not done."""
+        past = "2020-01-01T00:00:00Z"
+        ids = [(await client_with_data.post("/api/tasks", json={"title": f"T{i}"})).json()["id"] for i in range(3)]
+        await client_with_data.patch(f"/api/tasks/{ids[0]}", json={"end_time": past})
+        await client_with_data.patch(f"/api/tasks/{ids[1]}", json={"end_time": past, "status_id": 3})
+        await client_with_data.patch(f"/api/tasks/{ids[2]}", json={"end_time": "2999-01-01T00:00:00Z"})
+
+        assert (await client_with_data.get("/api/tasks/stats")).json()["overdue"] == 1
+
+
 class TestGetTask:
     """Tests for GET /api/tasks/{task_id}."""
 
@@ -318,3 +437,549 @@ class TestDeleteTask:
         list_response = await client_with_tasks.get("/api/tasks")
         assert len(list_response.json()) == initial_count - 1
 
+
+
+class TestCreateTasksBatch:
+    """Tests for POST /api/tasks/batch."""
+
+    async def test_create_batch(self, client_with_data):
+        """Creates all items in request order with defaults applied."""
+        response = await client_with_data.post(
+            "/api/tasks/batch",
+            json=[{"title": f"Bulk {i}", "description": f"D{i}"} for i in range(5)],
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 5
+        assert data["failed"] == 0
+        assert [r["index"] for r in data["results"]] == list(range(5))
+        assert [r["task"]["title"] for r in data["results"]] == [f"Bulk {i}" for i in range(5)]
+        assert all(r["task"]["status_id"] == 1 and r["task"]["priority_id"] == 2 for r in data["results"])
+
+        listed = await client_with_data.get("/api/tasks")
+        assert len(listed.json()) == 5
+
+    async def test_invalid_items_reported(self, client_with_data):
+        """Invalid items get errors, valid ones are still created."""
+        response = await client_with_data.post(
+            "/api/tasks/batch",
+            json=[{"title": "Good"}, {"description": "No title"}, "not an object", {"title": "x" * 300}],
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 1
+        assert data["failed"] == 3
+        assert data["results"][0]["task"]["title"] == "Good"
+        assert data["results"][0]["errors"] is None
+        for result in data["results"][1:]:
+            assert result["task"] is None
+            assert result["errors"]
+
+    async def test_empty_batch(self, client_with_data):
+        """Empty batch returns 422."""
+        response = await client_with_data.post("/api/tasks/batch", json=[])
+        assert response.status_code == 422
+
+    async def test_too_large_batch(self, client_with_data):
+        """Batch above the limit returns 422."""
+        response = await client_with_data.post("/api/tasks/batch", json=[{"title": "t"}] * 10_001)
+        assert response.status_code == 422
+
+    async def test_no_statuses_available(self, client):
+        """Returns 400 if no statuses in database."""
+        response = await client.post("/api/tasks/batch", json=[{"title": "Will Fail"}])
+        assert response.status_code == 400
+
+
+class TestUpdateTasksBatch:
+    """Tests for PATCH /api/tasks/batch."""
+
+    async def test_update_by_ids(self, client_with_tasks):
+        """Updates listed tasks and reports missing and deleted ids."""
+        response = await client_with_tasks.patch(
+            "/api/tasks/batch",
+            json={"ids": [1, 2, 3, 999], "changes": {"status_id": 3}},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["updated"] == 2
+        assert data["missing_ids"] == [3, 999]
+        assert [t["id"] for t in data["tasks"]] == [1, 2]
+        assert all(t["status_id"] == 3 for t in data["tasks"])
+
+        task = (await client_with_tasks.get("/api/tasks/2")).json()
+        assert task["status_id"] == 3
+
+    async def test_update_by_filter(self, client_with_tasks):
+        """Updates tasks matching list filters only."""
+        response = await client_with_tasks.patch(
+            "/api/tasks/batch",
+            json={"filter": {"status_id": 1}, "changes": {"priority_id": 3, "title": "Bulk"}},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["updated"] == 1
+        assert data["tasks"][0]["id"] == 1
+        assert data["tasks"][0]["priority_id"] == 3
+        assert data["tasks"][0]["title"] == "Bulk"
+
+        untouched = (await client_with_tasks.get("/api/tasks/2")).json()
+        assert untouched["priority_id"] == 2
+
+    async def test_invalid_status_id(self, client_with_tasks):
+        """Invalid status_id rejects the whole batch."""
+        response = await client_with_tasks.patch(
+            "/api/tasks/batch",
+            json={"ids": [1], "changes": {"status_id": 999}},
+        )
+        assert response.status_code == 400
+        assert "Invalid status_id" in response.json()["detail"]
+
+    async def test_invalid_priority_id(self, client_with_tasks):
+        """Invalid priority_id rejects the whole batch."""
+        response = await client_with_tasks.patch(
+            "/api/tasks/batch",
+            json={"ids": [1], "changes": {"priority_id": 999}},
+        )
+        assert response.status_code == 400
+
+    async def test_requires_exactly_one_selector(self, client_with_tasks):
+        """Both or neither of ids/filter returns 422."""
+        both = await client_with_tasks.patch(
+            "/api/tasks/batch",
+            json={"ids": [1], "filter": {"status_id": 1}, "changes": {"title": "x"}},
+        )
+        neither = await client_with_tasks.patch("/api/tasks/batch", json={"changes": {"title": "x"}})
+        assert both.status_code == 422
+        assert neither.status_code == 422
+
+    @pytest.mark.parametrize("task_filter", [{}, {"status_id": None, "end_time": None}])
+    async def test_rejects_empty_filter(self, client_with_tasks, task_filter):
+        """A filter without any field would match every task."""
+        response = await client_with_tasks.patch(
+            "/api/tasks/batch",
+            json={"filter": task_filter, "changes": {"title": "x"}},
+        )
+        assert response.status_code == 422
+        assert (await client_with_tasks.get("/api/tasks/1")).json()["title"] == "Task 1"
+
+    async def test_filter_matching_too_many(self, client_with_tasks, monkeypatch):
+        """A filter matching more than MAX_BATCH_SIZE tasks is rejected before updating."""
+        monkeypatch.setattr("app.routers.tasks.MAX_BATCH_SIZE", 1)
+        response = await client_with_tasks.patch(
+            "/api/tasks/batch",
+            json={"filter": {"start_time": "2000-01-01T00:00:00Z"}, "changes": {"title": "x"}},
+        )
+        assert response.status_code == 400
+        assert "more than 1 tasks" in response.json()["detail"]
+        assert (await client_with_tasks.get("/api/tasks/1")).json()["title"] == "Task 1"
+
+    async def test_empty_changes(self, client_with_tasks):
+        """Empty changes leave tasks unchanged."""
+        response = await client_with_tasks.patch("/api/tasks/batch", json={"ids": [1], "changes": {}})
+        assert response.status_code == 200
+        assert response.json()["tasks"][0]["title"] == "Task 1"
+
+
+class TestDeleteTasksBatch:
+    """Tests for POST /api/tasks/batch/delete."""
+
+    async def test_delete_by_ids(self, client_with_tasks):
+        """Soft deletes listed tasks and reports which ids were not deleted."""
+        response = await client_with_tasks.post("/api/tasks/batch/delete", json={"ids": [1, 3, 999]})
+        assert response.status_code == 200
+        assert response.json() == {"deleted_ids": [1], "missing_ids": [3, 999]}
+
+        assert (await client_with_tasks.get("/api/tasks/1")).status_code == 404
+        assert [t["id"] for t in (await client_with_tasks.get("/api/tasks")).json()] == [2]
+
+    async def test_delete_by_filter(self, client_with_tasks):
+        """Soft deletes tasks matching list filters."""
+        response = await client_with_tasks.post("/api/tasks/batch/delete", json={"filter": {"priority_id": 2}})
+        assert response.status_code == 200
+        assert response.json()["deleted_ids"] == [2]
+
+    async def test_delete_twice(self, client_with_tasks):
+        """Second delete of the same ids deletes nothing."""
+        await client_with_tasks.post("/api/tasks/batch/delete", json={"ids": [1, 2]})
+        response = await client_with_tasks.post("/api/tasks/batch/delete", json={"ids": [1, 2]})
+        assert response.json() == {"deleted_ids": [], "missing_ids": [1, 2]}
+
+    async def test_requires_selector(self, client_with_tasks):
+        """Body without ids or filter returns 422."""
+        response = await client_with_tasks.post("/api/tasks/batch/delete", json={})
+        assert response.status_code == 422
+
+    @pytest.mark.parametrize("task_filter", [{}, {"priority_id": None}])
+    async def test_rejects_empty_filter(self, client_with_tasks, task_filter):
+        """A filter without any field would delete every task."""
+        response = await client_with_tasks.post("/api/tasks/batch/delete", json={"filter": task_filter})
+        assert response.status_code == 422
+        assert len((await client_with_tasks.get("/api/tasks")).json()) == 2
+
+    async def test_filter_matching_too_many(self, client_with_tasks, monkeypatch):
+        """A filter matching more than MAX_BATCH_SIZE tasks deletes nothing."""
+        monkeypatch.setattr("app.routers.tasks.MAX_BATCH_SIZE", 1)
+        response = await client_with_tasks.post(
+            "/api/tasks/batch/delete",
+            json={"filter": {"start_time": "2000-01-01T00:00:00Z"}},
+        )
+        assert response.status_code == 400
+        assert len((await client_with_tasks.get("/api/tasks")).json()) == 2
+
+
+class TestExportTasks:
+    """Tests for GET /api/tasks/export."""
+
+    async def test_export_ndjson(self, client_with_tasks):
+        """Streams one JSON object per non-deleted task."""
+        response = await client_with_tasks.get("/api/tasks/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == [1, 2]
+        assert rows[0]["title"] == "Task 1"
+        assert rows[1]["description"] is None
+
+    async def test_export_csv(self, client_with_tasks):
+        """Streams CSV with a header row."""
+        response = await client_with_tasks.get("/api/tasks/export?format=csv")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="tasks.csv"' in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["id"] for row in rows] == ["1", "2"]
+        assert rows[1]["description"] == ""
+
+    async def test_export_filters(self, client_with_tasks):
+        """Honours list filters."""
+        response = await client_with_tasks.get("/api/tasks/export?status_id=2")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == [2]
+
+    async def test_export_empty_csv_has_header(self, client_with_data):
+        """Empty export still has the CSV header."""
+        response = await client_with_data.get("/api/tasks/export?format=csv")
+        header = "id,title,description,status_id,priority_id,start_time,end_time,created_at,updated_at,deleted_at"
+        assert response.text.strip() == header
+
+    async def test_export_invalid_format(self, client_with_tasks):
+        """Unknown format returns 422."""
+        response = await client_with_tasks.get("/api/tasks/export?format=xml")
+        assert response.status_code == 422
+
+
+class TestImportTasks:
+    """Tests for POST /api/tasks/import."""
+
+    async def test_import_csv(self, client_with_data):
+        """Imports valid CSV rows and reports rejected ones."""
+        body = "title,status_id\nImported,3\nBad,42\n"
+        response = await client_with_data.post(
+            "/api/tasks/import?format=csv", content=body, headers={"Content-Type": "text/csv"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert data["imported"] == 1
+        assert data["rejected"] == 1
+        assert data["rejections"] == [{"row": 2, "reason": "Invalid status_id"}]
+
+        tasks = (await client_with_data.get("/api/tasks")).json()
+        assert [(t["title"], t["status_id"]) for t in tasks] == [("Imported", 3)]
+
+    async def test_export_round_trip(self, client_with_tasks):
+        """CSV export can be imported back."""
+        exported = (await client_with_tasks.get("/api/tasks/export?format=csv")).text
+        response = await client_with_tasks.post("/api/tasks/import?format=csv", content=exported)
+        assert response.json()["imported"] == 2
+        assert len((await client_with_tasks.get("/api/tasks")).json()) == 4
+
+    async def test_import_invalid_encoding(self, client_with_data):
+        """Non UTF-8 body returns 400."""
+        response = await client_with_data.post("/api/tasks/import?format=csv", content=b"title\n\xff\xfe\n")
+        assert response.status_code == 400
+
+
+class TestTaskChanges:
+    """Tests for GET /api/tasks/changes."""
+
+    async def test_delta_sync(self, client_with_tasks):
+        """A token returns only what changed after it, deletions included."""
+        initial = (await client_with_tasks.get("/api/tasks/changes")).json()
+        assert sorted(t["id"] for t in initial["changes"]) == [1, 2]
+        assert initial["has_more"] is False
+
+        await client_with_tasks.patch("/api/tasks/1", json={"title": "Changed"})
+        await client_with_tasks.delete("/api/tasks/2")
+        data = (await client_with_tasks.get(f"/api/tasks/changes?since={initial['next_token']}")).json()
+        changes = {t["id"]: t for t in data["changes"]}
+        assert changes[1]["title"] == "Changed"
+        assert changes[2]["deleted_at"] is not None
+        assert changes[1]["updated_at"] >= changes[1]["created_at"]
+
+    async def test_paging(self, client_with_tasks, async_engine):
+        """has_more signals that the next token continues a large change set."""
+        async with async_engine.begin() as conn:
+            await conn.execute(update(TaskModel).values(updated_at=datetime.now(timezone.utc) - timedelta(minutes=1)))
+        data = (await client_with_tasks.get("/api/tasks/changes?limit=1")).json()
+        assert len(data["changes"]) == 1
+        assert data["has_more"] is True
+
+    async def test_recent_page_waits_for_next_poll(self, client_with_tasks):
+        """A page of changes too recent to have settled does not claim more are waiting."""
+        data = (await client_with_tasks.get("/api/tasks/changes?limit=1")).json()
+        assert len(data["changes"]) == 1
+        assert data["has_more"] is False
+
+    async def test_invalid_token(self, client_with_tasks):
+        """Malformed tokens return 400."""
+        response = await client_with_tasks.get("/api/tasks/changes?since=nope")
+        assert response.status_code == 400
+
+    async def test_expired_token(self, client_with_tasks):
+        """Tokens older than the archive retention period return 400."""
+        old = datetime.now(timezone.utc) - timedelta(days=365)
+        token = encode_cursor({"s": "changes", "v": old.isoformat(), "id": 0})
+        response = await client_with_tasks.get(f"/api/tasks/changes?since={token}")
+        assert response.status_code == 400
+        assert "expired" in response.json()["detail"]
+
+
+class TestRestoreTask:
+    """Tests for POST /api/tasks/{id}/restore."""
+
+    async def test_restore_deleted(self, client_with_tasks):
+        """A soft-deleted task becomes visible again."""
+        response = await client_with_tasks.post("/api/tasks/3/restore")
+        assert response.status_code == 200
+        assert response.json()["deleted_at"] is None
+        assert (await client_with_tasks.get("/api/tasks/3")).status_code == 200
+
+    async def test_restore_archived(self, client_with_tasks, async_engine):
+        """Archived tasks are moved back to the live table."""
+        async with async_sessionmaker(async_engine)() as session:
+            await TaskRepository(session).archive_deleted(datetime.now(timezone.utc) + timedelta(seconds=1))
+            await session.commit()
+
+        response = await client_with_tasks.post("/api/tasks/3/restore")
+        assert response.status_code == 200
+        assert response.json()["title"] == "Deleted Task"
+
+    async def test_restore_archived_with_deleted_status(self, client_with_tasks, async_engine):
+        """An archived task whose status is gone returns 409 and stays archived."""
+        async with async_sessionmaker(async_engine)() as session:
+            await TaskRepository(session).archive_deleted(datetime.now(timezone.utc) + timedelta(seconds=1))
+            await session.execute(update(TaskArchiveModel).values(status_id=99))
+            await session.commit()
+
+        response = await client_with_tasks.post("/api/tasks/3/restore")
+        assert response.status_code == 409
+        assert response.json()["detail"] == "Task status no longer exists"
+        async with async_sessionmaker(async_engine)() as session:
+            assert await session.get(TaskArchiveModel, 3) is not None
+
+    async def test_restore_live_is_noop(self, client_with_tasks):
+        """Restoring a live task returns it unchanged."""
+        response = await client_with_tasks.post("/api/tasks/1/restore")
+        assert response.status_code == 200
+        assert response.json()["id"] == 1
+
+    async def test_restore_unknown(self, client_with_tasks):
+        """Unknown ids return 404."""
+        response = await client_with_tasks.post("/api/tasks/999/restore")
+        assert response.status_code == 404
+
+
+class TestTaskEvents:
+    """Tests for change events published by task writes."""
+
+    @pytest.fixture
+    def subscription(self):
+        subscription = task_events.subscribe()
+        yield subscription
+        subscription.close()
+
+    async def test_single_writes(self, client_with_data, subscription):
+        """Create, update and delete publish one event each after commit."""
+        task_id = (await client_with_data.post("/api/tasks", json={"title": "New"})).json()["id"]
+        assert subscription.drain() == {"created": [task_id], "updated": [], "deleted": []}
+
+        await client_with_data.patch(f"/api/tasks/{task_id}", json={"title": "Renamed"})
+        assert subscription.drain() == {"created": [], "updated": [task_id], "deleted": []}
+
+        await client_with_data.delete(f"/api/tasks/{task_id}")
+        assert subscription.drain() == {"created": [], "updated": [], "deleted": [task_id]}
+
+    async def test_failed_write_publishes_nothing(self, client_with_tasks, subscription):
+        """Rejected writes do not produce events."""
+        await client_with_tasks.patch("/api/tasks/99", json={"title": "Nope"})
+        await client_with_tasks.patch("/api/tasks/1", json={"status_id": 42})
+        assert subscription.drain() == {"created": [], "updated": [], "deleted": []}
+
+    async def test_batch_writes(self, client_with_tasks, subscription):
+        """Batch endpoints publish all affected ids, coalesced per task."""
+        created = (await client_with_tasks.post("/api/tasks/batch", json=[{"title": "A"}, {"title": "B"}])).json()
+        new_ids = [result["task"]["id"] for result in created["results"]]
+        await client_with_tasks.patch("/api/tasks/batch", json={"ids": [1, new_ids[0]], "changes": {"status_id": 2}})
+        await client_with_tasks.post("/api/tasks/batch/delete", json={"ids": [2]})
+
+        assert subscription.drain() == {"created": new_ids, "updated": [1], "deleted": [2]}
+
+    async def test_import_requests_resync(self, client_with_data, subscription):
+        """Imports do not know their new ids and ask subscribers to refetch."""
+        await client_with_data.post("/api/tasks/import?format=csv", content="title\nImported\n")
+        assert subscription.drain() is None
+
+
+class TestTasksConditionalGet:
+    """Tests for ETag / If-None-Match on task reads."""
+
+    async def test_list_not_modified(self, client_with_tasks):
+        """Unchanged list with matching ETag returns 304."""
+        first = await client_with_tasks.get("/api/tasks")
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "no-cache"
+
+        response = await client_with_tasks.get("/api/tasks", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    async def test_list_etag_depends_on_params(self, client_with_tasks):
+        """Different filters produce different ETags."""
+        all_tasks = await client_with_tasks.get("/api/tasks")
+        filtered = await client_with_tasks.get("/api/tasks?status_id=1")
+        assert all_tasks.headers["etag"] != filtered.headers["etag"]
+
+    async def test_write_changes_etag(self, client_with_tasks):
+        """Any task write invalidates previous ETags."""
+        etag = (await client_with_tasks.get("/api/tasks")).headers["etag"]
+        await client_with_tasks.patch("/api/tasks/2", json={"title": "Changed"})
+
+        response = await client_with_tasks.get("/api/tasks", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    async def test_get_not_modified(self, client_with_tasks):
+        """Single task honours If-None-Match."""
+        etag = (await client_with_tasks.get("/api/tasks/1")).headers["etag"]
+        response = await client_with_tasks.get("/api/tasks/1", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    async def test_get_after_delete(self, client_with_tasks):
+        """Deleted task is not served from a stale ETag."""
+        etag = (await client_with_tasks.get("/api/tasks/1")).headers["etag"]
+        await client_with_tasks.delete("/api/tasks/1")
+        response = await client_with_tasks.get("/api/tasks/1", headers={"If-None-Match": etag})
+        assert response.status_code == 404
+
+
+class TestTasksResultCache:
+    """Tests for cached task reads and their invalidation."""
+
+    @pytest.fixture
+    async def rename_behind_api(self, async_engine):
+        """Change a task title without going through the API (no version bump)."""
+        async def rename(task_id: int, title: str) -> None:
+            async with async_engine.begin() as conn:
+                await conn.execute(update(TaskModel).where(TaskModel.id == task_id).values(title=title))
+        return rename
+
+    async def test_list_served_from_cache(self, client_with_tasks, rename_behind_api):
+        """Repeated list requests do not hit the database."""
+        await client_with_tasks.get("/api/tasks")
+        await rename_behind_api(1, "Changed behind the API")
+
+        response = await client_with_tasks.get("/api/tasks")
+        assert response.json()[0]["title"] == "Task 1"
+
+    async def test_list_cache_keyed_by_params(self, client_with_tasks, rename_behind_api):
+        """Different filters are cached separately."""
+        await client_with_tasks.get("/api/tasks")
+        await rename_behind_api(1, "Changed")
+
+        response = await client_with_tasks.get("/api/tasks?status_id=1")
+        assert response.json()[0]["title"] == "Changed"
+
+    async def test_write_invalidates_lists(self, client_with_tasks, rename_behind_api):
+        """Any task write drops cached pages."""
+        await client_with_tasks.get("/api/tasks")
+        await rename_behind_api(1, "Changed")
+        await client_with_tasks.patch("/api/tasks/2", json={"title": "Other"})
+
+        titles = [t["title"] for t in (await client_with_tasks.get("/api/tasks")).json()]
+        assert titles == ["Changed", "Other"]
+
+    async def test_write_retires_cached_tasks(self, client_with_tasks, rename_behind_api):
+        """A write moves every single-task entry to the new table version."""
+        await client_with_tasks.get("/api/tasks/1")
+        await rename_behind_api(1, "Changed")
+        await client_with_tasks.patch("/api/tasks/2", json={"title": "Other"})
+
+        assert (await client_with_tasks.get("/api/tasks/1")).json()["title"] == "Changed"
+
+    async def test_write_by_another_process(self, client_with_tasks, async_engine, rename_behind_api):
+        """Entries are retired by the version bump alone, as for a write handled elsewhere."""
+        await client_with_tasks.get("/api/tasks")
+        await client_with_tasks.get("/api/tasks/1")
+        await rename_behind_api(1, "Changed elsewhere")
+        async with async_sessionmaker(async_engine)() as session:
+            await TableVersionRepository(session).bump(TaskModel.__tablename__)
+            await session.commit()
+
+        assert (await client_with_tasks.get("/api/tasks/1")).json()["title"] == "Changed elsewhere"
+        assert (await client_with_tasks.get("/api/tasks")).json()[0]["title"] == "Changed elsewhere"
+
+    async def test_cached_task_matches_fresh(self, client_with_tasks):
+        """A cached task is returned exactly as the first response."""
+        first = await client_with_tasks.get("/api/tasks/1")
+        second = await client_with_tasks.get("/api/tasks/1")
+        assert second.json() == first.json()
+        assert second.headers["etag"] == first.headers["etag"]
+
+    async def test_not_found_cached(self, client_with_tasks, async_engine):
+        """404s are cached until the next task write."""
+        assert (await client_with_tasks.get("/api/tasks/4")).status_code == 404
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(TaskModel).values(id=4, title="Sneaky", status_id=1, priority_id=1))
+        assert (await client_with_tasks.get("/api/tasks/4")).status_code == 404
+
+        await client_with_tasks.patch("/api/tasks/4", json={"title": "Visible"})
+        assert (await client_with_tasks.get("/api/tasks/4")).json()["title"] == "Visible"
+
+    async def test_create_clears_negative_entry(self, client_with_tasks):
+        """Creating a task makes a previously missing id visible."""
+        assert (await client_with_tasks.get("/api/tasks/4")).status_code == 404
+        created = await client_with_tasks.post("/api/tasks", json={"title": "New"})
+        assert created.json()["id"] == 4
+        assert (await client_with_tasks.get("/api/tasks/4")).status_code == 200
+
+    async def test_delete_invalidates(self, client_with_tasks):
+        """Deleted tasks disappear from cached reads."""
+        await client_with_tasks.get("/api/tasks/1")
+        await client_with_tasks.get("/api/tasks")
+        await client_with_tasks.delete("/api/tasks/1")
+
+        assert (await client_with_tasks.get("/api/tasks/1")).status_code == 404
+        assert [t["id"] for t in (await client_with_tasks.get("/api/tasks")).json()] == [2]
+
+    async def test_batch_update_invalidates(self, client_with_tasks):
+        """Batch updates invalidate every updated task."""
+        await client_with_tasks.get("/api/tasks/1")
+        await client_with_tasks.patch("/api/tasks/batch", json={"ids": [1, 2], "changes": {"status_id": 3}})
+        assert (await client_with_tasks.get("/api/tasks/1")).json()["status_id"] == 3
+
+    async def test_batch_delete_invalidates(self, client_with_tasks):
+        """Batch deletes invalidate every deleted task."""
+        await client_with_tasks.get("/api/tasks/2")
+        await client_with_tasks.post("/api/tasks/batch/delete", json={"ids": [2]})
+        assert (await client_with_tasks.get("/api/tasks/2")).status_code == 404
+
+    async def test_import_invalidates(self, client_with_tasks):
+        """Imported tasks show up in cached lists and previously missing ids."""
+        await client_with_tasks.get("/api/tasks")
+        assert (await client_with_tasks.get("/api/tasks/4")).status_code == 404
+        await client_with_tasks.post("/api/tasks/import?format=ndjson", content=b'{"title": "Imported"}\n')
+
+        assert len((await client_with_tasks.get("/api/tasks")).json()) == 3
+        assert (await client_with_tasks.get("/api/tasks/4")).status_code == 200
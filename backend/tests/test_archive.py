@@ -0,0 +1,107 @@
+"""Tests for archiving and restoring soft-deleted tasks."""
+
+from datetime import datetime, timedelta, timezone
+
+from prometheus_client import REGISTRY
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.archive import TaskArchiver
+from app.config import ArchiveSettings
+from app.models import Task as TaskModel
+from app.models import TaskArchive as TaskArchiveModel
+from app.repositories import TaskCounterRepository, TaskRepository
+
+
+async def age_deletions(session: AsyncSession, days: int) -> None:
+    """Backdate every soft delete by the given number of days."""
+    await session.execute(
+        update(TaskModel)
+        .where(TaskModel.deleted_at.is_not(None))
+        .values(deleted_at=datetime.now(timezone.utc) - timedelta(days=days))
+    )
+
+
+class TestArchiveDeleted:
+    """Tests for TaskRepository.archive_deleted and restore."""
+
+    async def test_moves_only_old_deletions(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        await age_deletions(db_session_with_tasks, 40)
+        await repo.soft_delete(2)
+        cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+
+        assert await repo.archive_deleted(cutoff) == [3]
+        assert await repo.archive_deleted(cutoff) == []
+        archived = (await db_session_with_tasks.scalars(select(TaskArchiveModel))).all()
+        assert [(task.id, task.title) for task in archived] == [(3, "Deleted Task")]
+        remaining = await db_session_with_tasks.scalars(select(TaskModel.id).order_by(TaskModel.id))
+        assert remaining.all() == [1, 2]
+
+    async def test_batches(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        tasks = await repo.create_many([{"title": f"T{i}", "status_id": 1, "priority_id": 1} for i in range(5)])
+        await repo.soft_delete_many(ids=[task.id for task in tasks])
+        cutoff = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+        assert len(await repo.archive_deleted(cutoff, limit=2)) == 2
+        assert len(await repo.archive_deleted(cutoff, limit=2)) == 2
+        assert len(await repo.archive_deleted(cutoff, limit=2)) == 1
+
+    async def test_restore_archived(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        await repo.archive_deleted(datetime.now(timezone.utc) + timedelta(seconds=1))
+
+        task = await repo.restore(3)
+        assert task is not None
+        assert (task.id, task.title, task.deleted_at) == (3, "Deleted Task", None)
+        assert await db_session_with_tasks.get(TaskArchiveModel, 3) is None
+        assert await TaskCounterRepository(db_session_with_tasks).get_counts() == {(1, 1): 1}
+
+    async def test_restore_soft_deleted(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        task = await repo.restore(3)
+        assert task is not None and task.deleted_at is None
+        assert await repo.get_single(3) is not None
+
+    async def test_restore_unknown(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        assert await repo.restore(1) is None
+        assert await repo.restore(999) is None
+
+
+class TestTaskArchiver:
+    """Tests for the background archive job."""
+
+    async def test_run_once(self, async_engine, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        tasks = await repo.create_many([{"title": f"T{i}", "status_id": 1, "priority_id": 1} for i in range(6)])
+        await repo.soft_delete_many(ids=[task.id for task in tasks[:5]])
+        await age_deletions(db_session_with_data, 2)
+        await db_session_with_data.commit()
+        before = REGISTRY.get_sample_value("tasks_archived_total") or 0
+
+        archiver = TaskArchiver(
+            async_sessionmaker(async_engine, expire_on_commit=False),
+            ArchiveSettings(retention_days=1, batch_size=2, pause_seconds=0),
+        )
+        assert await archiver.run_once() == 5
+        assert await archiver.run_once() == 0
+
+        assert REGISTRY.get_sample_value("tasks_archived_total") - before == 5
+        assert REGISTRY.get_sample_value("tasks_table_rows", {"state": "live"}) == 1
+        assert REGISTRY.get_sample_value("tasks_table_rows", {"state": "deleted"}) == 0
+
+    async def test_max_batches_per_run(self, async_engine, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        tasks = await repo.create_many([{"title": f"T{i}", "status_id": 1, "priority_id": 1} for i in range(5)])
+        await repo.soft_delete_many(ids=[task.id for task in tasks])
+        await age_deletions(db_session_with_data, 2)
+        await db_session_with_data.commit()
+
+        archiver = TaskArchiver(
+            async_sessionmaker(async_engine, expire_on_commit=False),
+            ArchiveSettings(retention_days=1, batch_size=2, pause_seconds=0, max_batches_per_run=2),
+        )
+        assert await archiver.run_once() == 4
+        assert await archiver.run_once() == 1
@@ -0,0 +1,144 @@
+"""Tests for app.cache module."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.cache import MemoryCache, NullCache, RemoteCache, TaskCache, build_backend
+from app.config import CacheSettings
+
+
+class FakeRedis:
+    """Local stand-in for a networked key-value store."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("cache unavailable")
+
+    async def get(self, name):
+        self._check()
+        return self.data.get(name)
+
+    async def set(self, name, value, px=None):
+        self._check()
+        self.data[name] = value
+        self.ttls[name] = px
+        return True
+
+
+class TestMemoryCache:
+    """Tests for MemoryCache."""
+
+    async def test_set_and_get(self):
+        """Stored values are returned."""
+        cache = MemoryCache()
+        await cache.set("a", b"1", ttl=10)
+        assert await cache.get("a") == b"1"
+        assert await cache.get("b") is None
+
+    async def test_expired_entry(self):
+        """Entries are gone after their TTL."""
+        cache = MemoryCache()
+        await cache.set("a", b"1", ttl=0)
+        assert await cache.get("a") is None
+        assert len(cache) == 0
+
+    async def test_lru_eviction(self):
+        """Least recently used entry is evicted first."""
+        cache = MemoryCache(max_entries=2)
+        await cache.set("a", b"1", ttl=10)
+        await cache.set("b", b"2", ttl=10)
+        await cache.get("a")
+        await cache.set("c", b"3", ttl=10)
+        assert await cache.get("a") == b"1"
+        assert await cache.get("b") is None
+        assert await cache.get("c") == b"3"
+
+
+class TestRemoteCache:
+    """Tests for RemoteCache over a local stand-in client."""
+
+    async def test_round_trip_with_prefix_and_ttl(self):
+        """Keys are prefixed and TTL is sent in milliseconds."""
+        client = FakeRedis()
+        cache = RemoteCache(client, prefix="p:")
+        await cache.set("a", b"1", ttl=1.5)
+        assert client.ttls == {"p:a": 1500}
+        assert await cache.get("a") == b"1"
+
+    async def test_errors_are_misses(self):
+        """An unavailable store degrades to a cache that stores nothing."""
+        client = FakeRedis()
+        client.fail = True
+        cache = RemoteCache(client)
+        await cache.set("a", b"1", ttl=1)
+        assert await cache.get("a") is None
+
+
+@pytest.fixture(params=["memory", "remote"])
+def task_cache(request):
+    backend = MemoryCache() if request.param == "memory" else RemoteCache(FakeRedis())
+    return TaskCache(backend, ttl=10, negative_ttl=10)
+
+
+class TestTaskCache:
+    """Tests for TaskCache over both backends."""
+
+    async def test_page_round_trip(self, task_cache):
+        """Pages are stored and returned with their ETag and cursor."""
+        key = task_cache.page_key(1, {"limit": 10, "sort": "id"})
+        page = {"etag": '"e"', "next_cursor": "c", "tasks": [{"id": 1}]}
+        await task_cache.set_page(key, page)
+        assert await task_cache.get_page(key) == page
+
+    async def test_page_key_normalizes_params(self, task_cache):
+        """Equivalent parameters share a key regardless of order or timezone notation."""
+        utc = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+        shifted = utc.astimezone(timezone(timedelta(hours=3)))
+        first = task_cache.page_key(1, {"sort": "id", "start_time": utc})
+        second = task_cache.page_key(1, {"start_time": shifted, "sort": "id"})
+        assert first == second
+        assert first != task_cache.page_key(1, {"sort": "-id", "start_time": utc})
+
+    async def test_keys_include_version(self, task_cache):
+        """Entries read under an older table version are not found under a newer one."""
+        page = {"etag": "e", "next_cursor": None, "tasks": []}
+        await task_cache.set_page(task_cache.page_key(1, {"limit": 10}), page)
+        await task_cache.set_task(task_cache.task_key(1, 7), "e", {"id": 7})
+        assert await task_cache.get_page(task_cache.page_key(2, {"limit": 10})) is None
+        assert await task_cache.get_task(task_cache.task_key(2, 7)) is None
+        assert await task_cache.get_task(task_cache.task_key(1, 7)) == {"etag": "e", "task": {"id": 7}}
+
+    async def test_negative_entry(self, task_cache):
+        """Missing tasks are cached as a None task."""
+        key = task_cache.task_key(1, 5)
+        await task_cache.set_task(key, None, None)
+        assert await task_cache.get_task(key) == {"etag": None, "task": None}
+
+
+class TestNullCache:
+    """Tests for NullCache."""
+
+    async def test_stores_nothing(self):
+        """Disabled cache always misses."""
+        cache = TaskCache(NullCache())
+        key = cache.page_key(1, {})
+        await cache.set_page(key, {"tasks": []})
+        assert await cache.get_page(key) is None
+
+
+class TestBuildBackend:
+    """Tests for build_backend."""
+
+    @pytest.mark.parametrize(
+        ("backend", "expected"),
+        [("none", NullCache), ("memory", MemoryCache), ("redis", RemoteCache)],
+    )
+    def test_backend_from_settings(self, backend, expected):
+        """Each configured backend can be built; redis does not connect until used."""
+        assert isinstance(build_backend(CacheSettings(backend=backend)), expected)
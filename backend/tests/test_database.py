@@ -0,0 +1,110 @@
+"""Tests for read replica routing."""
+
+import pytest
+from fastapi import FastAPI, Response
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import READ_PRIMARY_COOKIE, ReadRouter
+from app.middleware import ReadYourWritesMiddleware
+
+
+def make_sessionmaker(url: str) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(create_async_engine(url), expire_on_commit=False)
+
+
+@pytest.fixture
+def makers(tmp_path):
+    primary = make_sessionmaker(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica_a = make_sessionmaker(f"sqlite+aiosqlite:///{tmp_path / 'a.db'}")
+    replica_b = make_sessionmaker(f"sqlite+aiosqlite:///{tmp_path / 'b.db'}")
+    broken = make_sessionmaker(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'x.db'}")
+    return primary, replica_a, replica_b, broken
+
+
+async def database_of(session: AsyncSession) -> str:
+    result = await session.execute(text("PRAGMA database_list"))
+    return result.all()[0][2].rsplit("/", 1)[-1]
+
+
+class TestReadRouter:
+    """Tests for ReadRouter."""
+
+    def test_no_replicas_uses_primary(self, makers):
+        """Without replicas every read goes to the primary."""
+        primary = makers[0]
+        assert ReadRouter(primary, []).candidates() == [primary]
+
+    def test_round_robin(self, makers):
+        """Replicas take turns and the primary is always the last resort."""
+        primary, replica_a, replica_b, _ = makers
+        router = ReadRouter(primary, [replica_a, replica_b])
+        assert router.candidates() == [replica_a, replica_b, primary]
+        assert router.candidates() == [replica_b, replica_a, primary]
+        assert router.candidates() == [replica_a, replica_b, primary]
+
+    async def test_open_session_on_replica(self, makers):
+        """A healthy replica serves the read."""
+        primary, replica_a, _, _ = makers
+        router = ReadRouter(primary, [replica_a])
+        async with await router.open_session() as session:
+            assert await database_of(session) == "a.db"
+
+    async def test_fallback_to_primary(self, makers):
+        """A replica that fails to connect is skipped in favour of the primary."""
+        primary, _, _, broken = makers
+        router = ReadRouter(primary, [broken])
+        async with await router.open_session() as session:
+            assert await database_of(session) == "primary.db"
+        # The failed replica is not offered again until the retry delay passes.
+        assert router.candidates() == [primary]
+
+    async def test_failed_replica_retried_after_delay(self, makers):
+        """With no retry delay a failed replica is offered again immediately."""
+        primary, _, _, broken = makers
+        router = ReadRouter(primary, [broken], retry_seconds=0)
+        async with await router.open_session():
+            pass
+        assert router.candidates() == [broken, primary]
+
+
+class TestReadYourWritesMiddleware:
+    """Tests for ReadYourWritesMiddleware."""
+
+    @pytest.fixture
+    async def client(self):
+        app = FastAPI()
+
+        @app.get("/item")
+        async def read_item() -> dict:
+            return {}
+
+        @app.post("/item")
+        async def write_item() -> dict:
+            return {}
+
+        @app.post("/fail")
+        async def fail() -> Response:
+            return Response(status_code=400)
+
+        app.add_middleware(ReadYourWritesMiddleware, seconds=5)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+
+    async def test_write_sets_cookie(self, client):
+        """Successful writes pin the client to the primary."""
+        response = await client.post("/item")
+        cookie = response.headers["set-cookie"]
+        assert cookie.startswith(f"{READ_PRIMARY_COOKIE}=1")
+        assert "Max-Age=5" in cookie
+
+    async def test_read_does_not_set_cookie(self, client):
+        """Reads leave routing alone."""
+        response = await client.get("/item")
+        assert "set-cookie" not in response.headers
+
+    async def test_failed_write_does_not_set_cookie(self, client):
+        """Rejected writes change nothing, so no stickiness is needed."""
+        response = await client.post("/fail")
+        assert "set-cookie" not in response.headers
@@ -0,0 +1,96 @@
+"""Tests for app.importer module."""
+
+import io
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.importer import ImportReport, RowError, coerce_row, import_tasks
+from app.reference import reference_registry
+from app.repositories import TaskRepository
+
+
+class TestCoerceRow:
+    """Tests for coerce_row."""
+
+    @pytest.fixture
+    async def reference(self, db_session_with_data: AsyncSession):
+        return await reference_registry.load(db_session_with_data)
+
+    async def test_defaults_applied(self, reference):
+        record = coerce_row(1, {"title": "T", "status_id": "", "priority_id": None}, reference)
+        assert record[:5] == (1, "T", None, 1, 2)
+
+    async def test_integral_float_id_accepted(self, reference):
+        record = coerce_row(1, {"title": "T", "status_id": 2.0}, reference)
+        assert record[3] == 2
+
+    async def test_datetime_parsed_as_utc(self, reference):
+        record = coerce_row(1, {"title": "T", "start_time": "2025-06-15T10:00:00"}, reference)
+        assert record[5].isoformat() == "2025-06-15T10:00:00+00:00"
+
+    @pytest.mark.parametrize(
+        "raw, reason",
+        [
+            ("not a dict", "Row is not an object"),
+            ({"title": "  "}, "Missing title"),
+            ({"title": "x" * 256}, "Title too long"),
+            ({"title": "T", "status_id": "abc"}, "Invalid status_id"),
+            ({"title": "T", "priority_id": True}, "Invalid priority_id"),
+            ({"title": "a\x00b"}, "Invalid title"),
+            ({"title": "T", "description": "a\x00b"}, "Invalid description"),
+            ({"title": "T", "status_id": 1.5}, "Invalid status_id"),
+            ({"title": "T", "status_id": 2**31}, "Invalid status_id"),
+            ({"title": "T", "priority_id": "-2147483649"}, "Invalid priority_id"),
+            ({"title": "T", "end_time": "yesterday"}, "Invalid end_time"),
+        ],
+    )
+    async def test_invalid_rows(self, reference, raw, reason):
+        with pytest.raises(RowError, match=reason):
+            coerce_row(1, raw, reference)
+
+
+class TestImportTasks:
+    """Tests for import_tasks on the generic (non-PostgreSQL) path."""
+
+    async def test_import_csv(self, db_session_with_data: AsyncSession):
+        reference = await reference_registry.load(db_session_with_data)
+        data = (
+            "title,description,status_id,priority_id,start_time\n"
+            "First,Desc,2,3,2025-01-01T00:00:00Z\n"
+            ",no title,,,\n"
+            "Second,,,,\n"
+            "Third,,99,,\n"
+        )
+        report = await import_tasks(db_session_with_data, io.StringIO(data), "csv", reference, batch_size=2)
+
+        assert report.total == 4
+        assert report.imported == 2
+        assert report.rejected == 2
+        assert report.rejections == [(2, "Missing title"), (4, "Invalid status_id")]
+
+        tasks = await TaskRepository(db_session_with_data).get_multi()
+        assert [(t.title, t.status_id, t.priority_id) for t in tasks] == [("First", 2, 3), ("Second", 1, 2)]
+
+    async def test_import_ndjson(self, db_session_with_data: AsyncSession):
+        reference = await reference_registry.load(db_session_with_data)
+        lines = [json.dumps({"title": f"T{i}", "priority_id": 1}) for i in range(3)]
+        data = "\n".join(lines[:2] + ["", "{broken", lines[2]]) + "\n"
+        report = await import_tasks(db_session_with_data, io.StringIO(data), "ndjson", reference)
+
+        assert report.total == 4
+        assert report.imported == 3
+        assert report.rejections == [(3, "Row is not an object")]
+        assert report.rows_per_second > 0
+
+
+def test_report_keeps_lowest_rejected_rows(monkeypatch):
+    monkeypatch.setattr("app.importer.MAX_REPORTED_REJECTIONS", 2)
+    report = ImportReport()
+    for row_no in (5, 9, 2, 7):
+        report.reject(row_no, "Invalid status_id")
+    report.finish(1.0)
+
+    assert report.rejected == 4
+    assert report.rejections == [(2, "Invalid status_id"), (5, "Invalid status_id")]
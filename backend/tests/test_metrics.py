@@ -0,0 +1,92 @@
+"""Tests for database pool metrics."""
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import InstrumentedQueuePool
+from app.metrics import current_query_stats, instrument_pool, instrument_queries
+
+
+@pytest.fixture
+async def pooled_engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+    )
+    instrument_pool(engine)
+    yield engine
+    await engine.dispose()
+
+
+def sample(name: str, labels: dict[str, str] | None = None) -> float | None:
+    return REGISTRY.get_sample_value(name, labels)
+
+
+class TestPoolMetrics:
+    """Tests for pool gauges and checkout histogram."""
+
+    async def test_checked_out_and_overflow(self, pooled_engine):
+        """Gauges follow connections in use, overflow counts only extra connections."""
+        assert sample("db_pool_size") == 1
+        async with pooled_engine.connect() as first:
+            await first.execute(text("SELECT 1"))
+            assert sample("db_pool_checked_out") == 1
+            assert sample("db_pool_overflow") == 0
+            async with pooled_engine.connect() as second:
+                await second.execute(text("SELECT 1"))
+                assert sample("db_pool_checked_out") == 2
+                assert sample("db_pool_overflow") == 1
+        assert sample("db_pool_checked_out") == 0
+
+    async def test_checkout_wait_observed(self, pooled_engine):
+        """Every checkout is recorded in the wait histogram."""
+        before = sample("db_pool_checkout_wait_seconds_count") or 0
+        for _ in range(3):
+            async with pooled_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        assert sample("db_pool_checkout_wait_seconds_count") == before + 3
+
+    async def test_gauges_follow_disposed_pool(self, pooled_engine):
+        """After dispose() the gauges read the replacement pool."""
+        async with pooled_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        await pooled_engine.dispose()
+        assert sample("db_pool_checked_out") == 0
+
+
+class TestQueryMetrics:
+    """Tests for per-request SQL statement metrics."""
+
+    @staticmethod
+    def observed(name: str, handler: str, method: str) -> float:
+        return sample(name, {"handler": handler, "method": method}) or 0
+
+    async def test_statements_attributed_to_route(self, client_with_tasks, async_engine):
+        instrument_queries(async_engine)
+        handler = "/api/tasks/{task_id}"
+        count_before = self.observed("db_statements_per_request_count", handler, "PATCH")
+        statements_before = self.observed("db_statements_per_request_sum", handler, "PATCH")
+        rows_before = self.observed("db_rows_per_request_sum", handler, "PATCH")
+
+        response = await client_with_tasks.patch("/api/tasks/1", json={"title": "Changed"})
+        assert response.status_code == 200
+
+        assert self.observed("db_statements_per_request_count", handler, "PATCH") == count_before + 1
+        assert self.observed("db_statements_per_request_sum", handler, "PATCH") - statements_before >= 2
+        assert self.observed("db_rows_per_request_sum", handler, "PATCH") - rows_before >= 1
+        assert self.observed("db_time_per_request_seconds_sum", handler, "PATCH") > 0
+
+    async def test_unmatched_paths_not_recorded(self, client_with_tasks, async_engine):
+        instrument_queries(async_engine)
+        await client_with_tasks.get("/api/missing")
+        assert sample("db_statements_per_request_count", {"handler": "/api/missing", "method": "GET"}) is None
+
+    async def test_queries_outside_requests_ignored(self, async_engine):
+        instrument_queries(async_engine)
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        assert current_query_stats.get() is None
@@ -0,0 +1,82 @@
+"""Tests for Alembic migrations."""
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+
+from app.config import BASE_DIR
+
+ALEMBIC_INI = BASE_DIR.parent / "alembic.ini"
+
+
+def make_config(url: str) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(BASE_DIR.parent / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+class TestMigrations:
+    """Tests for the migration chain."""
+
+    def test_upgrade_matches_models(self, tmp_path):
+        """Migrated schema has no drift from the ORM models."""
+        config = make_config(f"sqlite+aiosqlite:///{tmp_path / 'migrations.db'}")
+        command.upgrade(config, "head")
+        command.check(config)
+
+    def test_live_indexes_are_partial(self, tmp_path):
+        """Task indexes only cover non-deleted rows."""
+        path = tmp_path / "migrations.db"
+        command.upgrade(make_config(f"sqlite+aiosqlite:///{path}"), "head")
+
+        engine = create_engine(f"sqlite:///{path}")
+        with engine.connect() as conn:
+            sql = conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'ix_tasks_live_status_id'"
+            ).scalar_one()
+        engine.dispose()
+        assert "WHERE deleted_at IS NULL" in sql
+
+    def test_search_index_backfilled(self, tmp_path):
+        """Tasks existing before the search migration are searchable."""
+        path = tmp_path / "migrations.db"
+        config = make_config(f"sqlite+aiosqlite:///{path}")
+        command.upgrade(config, "0003")
+
+        engine = create_engine(f"sqlite:///{path}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO task_statuses (id, title) VALUES (1, 'To Do')")
+            conn.exec_driver_sql("INSERT INTO task_priorities (id, title) VALUES (1, 'High')")
+            conn.exec_driver_sql("INSERT INTO tasks (id, title, status_id, priority_id) VALUES (1, 'Old task', 1, 1)")
+        command.upgrade(config, "head")
+        with engine.connect() as conn:
+            rowids = conn.exec_driver_sql("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'old'").scalars().all()
+        engine.dispose()
+        assert rowids == [1]
+
+    def test_downgrade_to_base(self, tmp_path):
+        """Every migration can be rolled back."""
+        path = tmp_path / "migrations.db"
+        config = make_config(f"sqlite+aiosqlite:///{path}")
+        command.upgrade(config, "head")
+        command.downgrade(config, "base")
+
+        engine = create_engine(f"sqlite:///{path}")
+        assert set(inspect(engine).get_table_names()) == {"alembic_version"}
+        engine.dispose()
+
+    def test_done_status_flagged_final(self, tmp_path):
+        """Statuses seeded before is_final existed keep Done as the final status."""
+        path = tmp_path / "migrations.db"
+        config = make_config(f"sqlite+aiosqlite:///{path}")
+        command.upgrade(config, "0008")
+
+        engine = create_engine(f"sqlite:///{path}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO task_statuses (id, title) VALUES (1, 'To Do'), (3, 'Done')")
+        command.upgrade(config, "head")
+        with engine.connect() as conn:
+            final = conn.exec_driver_sql("SELECT id FROM task_statuses WHERE is_final").scalars().all()
+        engine.dispose()
+        assert final == [3]
@@ -0,0 +1,99 @@
+"""SQL statement budgets for hot API routes and repository methods.
+
+Budgets are the current statement counts on SQLite. If a change needs more
+round trips, raise the budget in the same change so it gets reviewed.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import TaskStatus as TaskStatusModel
+from app.reference import reference_registry
+from app.repositories import TaskRepository
+from app.repositories.base import BaseRepository
+
+
+@pytest.fixture
+async def warm_reference(client_with_tasks, async_engine):
+    """Reference data is loaded once at startup in production."""
+    async with async_sessionmaker(async_engine)() as session:
+        await reference_registry.load(session)
+
+
+class TestApiQueryBudgets:
+    """Statements per request for task routes (empty result cache)."""
+
+    @pytest.mark.parametrize(
+        ("method", "url", "body", "limit"),
+        [
+            ("get", "/api/tasks", None, 2),
+            ("get", "/api/tasks?status_id=1&sort=-created_at", None, 2),
+            ("get", "/api/tasks?q=task", None, 2),
+            ("get", "/api/tasks/1", None, 2),
+            ("get", "/api/tasks/stats", None, 2),
+            ("get", "/api/tasks/changes", None, 2),
+            ("post", "/api/tasks", {"title": "New"}, 3),
+            ("patch", "/api/tasks/1", {"title": "Renamed"}, 2),
+            ("patch", "/api/tasks/1", {"status_id": 2}, 4),
+            ("delete", "/api/tasks/1", None, 3),
+            ("patch", "/api/tasks/batch", {"ids": [1, 2], "changes": {"status_id": 3}}, 4),
+            ("post", "/api/tasks/batch/delete", {"ids": [1, 2]}, 3),
+            ("post", "/api/tasks/3/restore", None, 4),
+        ],
+    )
+    async def test_route_budget(self, client_with_tasks, warm_reference, query_budget, method, url, body, limit):
+        kwargs = {"json": body} if body is not None else {}
+        with query_budget(limit):
+            response = await getattr(client_with_tasks, method)(url, **kwargs)
+        assert response.status_code < 400
+
+    async def test_cached_reads_skip_data_queries(self, client_with_tasks, warm_reference, query_budget):
+        await client_with_tasks.get("/api/tasks")
+        await client_with_tasks.get("/api/tasks/1")
+        with query_budget(2):
+            await client_with_tasks.get("/api/tasks")
+            await client_with_tasks.get("/api/tasks/1")
+
+    async def test_batch_create_budget(self, client_with_tasks, warm_reference, query_budget):
+        rows = [{"title": f"T{i}"} for i in range(20)]
+        # SQLite inserts one row per statement to keep RETURNING in input order (PostgreSQL
+        # batches them); everything else is a fixed cost.
+        with query_budget(len(rows) + 2):
+            await client_with_tasks.post("/api/tasks/batch", json=rows)
+
+
+class TestRepositoryQueryBudgets:
+    """Statements per repository call."""
+
+    async def test_reads(self, db_session_with_tasks: AsyncSession, query_budget):
+        repo = TaskRepository(db_session_with_tasks)
+        with query_budget(1):
+            await repo.get_single(1)
+        with query_budget(1):
+            await repo.get_multi(limit=10)
+        with query_budget(1):
+            await repo.get_page(limit=10, sort="-created_at")
+        with query_budget(1):
+            await repo.get_existing_ids()
+        with query_budget(1):
+            await BaseRepository(TaskStatusModel, db_session_with_tasks).get_all()
+
+    async def test_writes(self, db_session_with_tasks: AsyncSession, query_budget):
+        repo = TaskRepository(db_session_with_tasks)
+        with query_budget(3):
+            await repo.create(title="New", status_id=1, priority_id=1)
+        with query_budget(2):
+            await repo.update(1, title="Renamed")
+        with query_budget(4):
+            await repo.update(1, status_id=2)
+        with query_budget(3):
+            await repo.soft_delete(1)
+        with query_budget(1):
+            await repo.soft_delete(1)
+
+    async def test_archive_batch(self, db_session_with_tasks: AsyncSession, query_budget):
+        repo = TaskRepository(db_session_with_tasks)
+        with query_budget(3):
+            await repo.archive_deleted(datetime.now(timezone.utc) + timedelta(seconds=1))
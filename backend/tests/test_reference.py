@@ -0,0 +1,89 @@
+"""Tests for app.reference module."""
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import TaskStatus as TaskStatusModel
+from app.reference import ReferenceRegistry, build_reference_data
+from app.schemas import TaskPriority, TaskStatus
+
+
+class TestReferenceData:
+    """Tests for ReferenceData snapshot."""
+
+    def test_defaults(self):
+        """Default status is the first one, default priority the second one."""
+        data = build_reference_data(
+            [TaskStatus(id=1, title="To Do"), TaskStatus(id=2, title="Done")],
+            [TaskPriority(id=1, title="High"), TaskPriority(id=2, title="Normal")],
+        )
+        assert data.default_status_id == 1
+        assert data.default_priority_id == 2
+
+    def test_single_priority_default(self):
+        """With only one priority it becomes the default."""
+        data = build_reference_data([], [TaskPriority(id=7, title="Only")])
+        assert data.default_status_id is None
+        assert data.default_priority_id == 7
+
+    def test_exists(self):
+        data = build_reference_data([TaskStatus(id=1, title="To Do")], [TaskPriority(id=2, title="Normal")])
+        assert data.status_exists(1) is True
+        assert data.status_exists(2) is False
+        assert data.priority_exists(2) is True
+        assert data.priority_exists(1) is False
+
+    def test_final_statuses_are_flagged(self):
+        """A status added after Done is not treated as final."""
+        data = build_reference_data(
+            [
+                TaskStatus(id=1, title="To Do"),
+                TaskStatus(id=3, title="Done", is_final=True),
+                TaskStatus(id=4, title="Blocked"),
+            ],
+            [],
+        )
+        assert data.final_status_ids == [3]
+
+    def test_version_depends_on_content(self):
+        """Version changes when titles change and is stable otherwise."""
+        first = build_reference_data([TaskStatus(id=1, title="To Do")], [])
+        same = build_reference_data([TaskStatus(id=1, title="To Do")], [])
+        renamed = build_reference_data([TaskStatus(id=1, title="Backlog")], [])
+        assert first.version == same.version
+        assert first.version != renamed.version
+
+
+class TestReferenceRegistry:
+    """Tests for ReferenceRegistry."""
+
+    async def test_get_loads_once(self, db_session_with_data: AsyncSession):
+        registry = ReferenceRegistry()
+        first = await registry.get(db_session_with_data)
+        second = await registry.get(db_session_with_data)
+        assert first is second
+        assert [s.id for s in first.statuses] == [1, 2, 3]
+        assert [p.id for p in first.priorities] == [1, 2, 3]
+
+    async def test_invalidate_reloads(self, db_session_with_data: AsyncSession):
+        registry = ReferenceRegistry()
+        first = await registry.get(db_session_with_data)
+        registry.invalidate()
+        assert registry.data is None
+        second = await registry.get(db_session_with_data)
+        assert first is not second
+        assert first.version == second.version
+
+    async def test_reloads_when_stale(self, db_session_with_data: AsyncSession):
+        """Edits made outside this process are picked up once the snapshot is max_age old."""
+        registry = ReferenceRegistry(max_age=60)
+        first = await registry.get(db_session_with_data)
+        await db_session_with_data.execute(
+            update(TaskStatusModel).where(TaskStatusModel.id == 1).values(title="Backlog")
+        )
+        assert await registry.get(db_session_with_data) is first
+
+        registry._loaded_at -= 60
+        second = await registry.get(db_session_with_data)
+        assert second.statuses[0].title == "Backlog"
+        assert second.etag != first.etag
@@ -1,14 +1,20 @@
 """Tests for BaseRepository and TaskRepository."""
-from datetime import datetime, timezone
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.models import TableVersion as TableVersionModel
 from app.models import Task as TaskModel
 from app.models import TaskPriority as TaskPriorityModel
 from app.models import TaskStatus as TaskStatusModel
+from app.pagination import CursorError, encode_cursor
 from app.repositories.base import BaseRepository
+from app.repositories.table_version import TableVersionRepository
 from app.repositories.task import TaskRepository
+from app.repositories.task_counter import TaskCounterRepository
 
 
 class TestBaseRepositoryGetSingle:
@@ -207,3 +213,482 @@ class TestTaskRepositoryFilters:
         repo = TaskRepository(db_session_with_tasks)
         result = await repo.soft_delete(999)
         assert result is False
+
+    async def test_soft_delete_already_deleted(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        assert await repo.soft_delete(3) is False
+
+    async def test_update_deleted_returns_none(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        assert await repo.update(3, title="Revived") is None
+
+    async def test_update_refreshes_loaded_instance(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        loaded = await repo.get_single(1)
+        updated = await repo.update(1, title="Changed")
+        assert updated is loaded
+        assert loaded.title == "Changed"
+
+    async def test_exists_ignores_deleted(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        assert await repo.exists(1) is True
+        assert await repo.exists(3) is False
+
+    async def test_create_returns_server_defaults(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        task = await repo.create(title="New", status_id=1, priority_id=2)
+        assert task.id is not None
+        assert task.created_at is not None
+        assert task.deleted_at is None
+
+
+class TestTaskRepositoryGetPage:
+    """Tests for TaskRepository.get_page keyset pagination."""
+
+    @pytest.fixture
+    async def session_with_many_tasks(self, db_session_with_data: AsyncSession) -> AsyncSession:
+        base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        starts = [3, None, 1, 3, None, 2, 1, 5, None]
+        db_session_with_data.add_all([
+            TaskModel(
+                id=i + 1,
+                title=f"Task {chr(ord('a') + (i * 5) % 9)}",
+                status_id=1,
+                priority_id=1,
+                start_time=None if start is None else base.replace(day=start),
+                end_time=None if start is None else base.replace(day=start + 1),
+                created_at=base.replace(hour=i // 3),
+            )
+            for i, start in enumerate(starts)
+        ])
+        db_session_with_data.add(
+            TaskModel(id=100, title="Gone", status_id=1, priority_id=1, deleted_at=base)
+        )
+        await db_session_with_data.commit()
+        return db_session_with_data
+
+    @staticmethod
+    async def collect(repo: TaskRepository, sort: str, limit: int = 2) -> list[int]:
+        ids: list[int] = []
+        cursor = None
+        while True:
+            page, cursor = await repo.get_page(limit=limit, cursor=cursor, sort=sort)
+            assert len(page) <= limit
+            ids.extend(t["id"] for t in page)
+            if cursor is None:
+                return ids
+
+    @pytest.mark.parametrize("field", ["id", "title", "created_at", "start_time", "end_time"])
+    async def test_pages_cover_sorted_order(self, session_with_many_tasks: AsyncSession, field: str):
+        """Walking all pages yields every live task exactly once in sort order."""
+        repo = TaskRepository(session_with_many_tasks)
+        everything = await repo.get_multi(limit=1000)
+
+        def key(task):
+            value = getattr(task, field)
+            return (value is None, value if value is not None else 0, task.id)
+
+        expected = [t.id for t in sorted(everything, key=key)]
+        assert await self.collect(repo, field) == expected
+        assert await self.collect(repo, f"-{field}") == list(reversed(expected))
+
+    async def test_last_page_has_no_cursor(self, session_with_many_tasks: AsyncSession):
+        repo = TaskRepository(session_with_many_tasks)
+        page, cursor = await repo.get_page(limit=100)
+        assert len(page) == 9
+        assert cursor is None
+
+    async def test_filters_apply(self, session_with_many_tasks: AsyncSession):
+        repo = TaskRepository(session_with_many_tasks)
+        page, _ = await repo.get_page(status_id=2)
+        assert page == []
+
+    async def test_unknown_sort(self, session_with_many_tasks: AsyncSession):
+        repo = TaskRepository(session_with_many_tasks)
+        with pytest.raises(CursorError):
+            await repo.get_page(sort="description")
+
+    async def test_cursor_bound_to_sort(self, session_with_many_tasks: AsyncSession):
+        repo = TaskRepository(session_with_many_tasks)
+        _, cursor = await repo.get_page(limit=2, sort="title")
+        with pytest.raises(CursorError):
+            await repo.get_page(limit=2, sort="id", cursor=cursor)
+
+    async def test_malformed_cursor(self, session_with_many_tasks: AsyncSession):
+        repo = TaskRepository(session_with_many_tasks)
+        with pytest.raises(CursorError):
+            await repo.get_page(cursor="not-a-cursor")
+
+    @pytest.mark.parametrize(
+        ("sort", "value", "last_id"),
+        [
+            ("id", "1", 1),
+            ("id", 2, 1),
+            ("id", True, True),
+            ("title", 5, 1),
+            ("title", None, 1),
+            ("created_at", None, 1),
+            ("-start_time", 1700000000, 1),
+            ("end_time", "not a date", 1),
+        ],
+    )
+    async def test_cursor_value_must_match_column(
+            self, session_with_many_tasks: AsyncSession, sort, value, last_id
+    ):
+        repo = TaskRepository(session_with_many_tasks)
+        cursor = encode_cursor({"s": sort, "v": value, "id": last_id})
+        with pytest.raises(CursorError):
+            await repo.get_page(sort=sort, cursor=cursor)
+
+    async def test_cursor_null_for_nullable_column(self, session_with_many_tasks: AsyncSession):
+        repo = TaskRepository(session_with_many_tasks)
+        cursor = encode_cursor({"s": "start_time", "v": None, "id": 1})
+        page, _ = await repo.get_page(sort="start_time", cursor=cursor)
+        assert all(row["start_time"] is None and row["id"] > 1 for row in page)
+
+
+class TestTaskRepositorySearch:
+    """Tests for TaskRepository.get_page full-text search."""
+
+    @pytest.fixture
+    async def session_with_texts(self, db_session_with_data: AsyncSession) -> AsyncSession:
+        texts = [
+            ("Buy milk", "From the corner store"),
+            ("Call plumber", "Kitchen sink leaks, buy new tap"),
+            ("Milking schedule", None),
+            ("Read book", "Novel about milk farmers"),
+            ("Buy bread", None),
+        ]
+        db_session_with_data.add_all([
+            TaskModel(id=i + 1, title=title, description=description, status_id=1, priority_id=1)
+            for i, (title, description) in enumerate(texts)
+        ])
+        await db_session_with_data.commit()
+        return db_session_with_data
+
+    async def test_matches_title_and_description(self, session_with_texts: AsyncSession):
+        repo = TaskRepository(session_with_texts)
+        page, _ = await repo.get_page(q="buy")
+        assert [t["id"] for t in page] == [1, 2, 5]
+
+    async def test_all_terms_as_prefixes(self, session_with_texts: AsyncSession):
+        repo = TaskRepository(session_with_texts)
+        page, _ = await repo.get_page(q="BUY mil")
+        assert [t["id"] for t in page] == [1]
+
+    async def test_relevance_prefers_title(self, session_with_texts: AsyncSession):
+        repo = TaskRepository(session_with_texts)
+        page, _ = await repo.get_page(q="milk", sort="relevance")
+        assert [t["id"] for t in page][-1] == 4
+        assert set(page[0]) == {c.name for c in TaskModel.__table__.columns}
+
+    async def test_relevance_pages_cover_results(self, session_with_texts: AsyncSession):
+        repo = TaskRepository(session_with_texts)
+        full, _ = await repo.get_page(q="milk", sort="relevance")
+        ids, cursor = [], None
+        while True:
+            page, cursor = await repo.get_page(q="milk", sort="relevance", limit=1, cursor=cursor)
+            ids.extend(t["id"] for t in page)
+            if cursor is None:
+                break
+        assert ids == [t["id"] for t in full]
+
+    async def test_relevance_cursor_bound_to_query(self, session_with_texts: AsyncSession):
+        repo = TaskRepository(session_with_texts)
+        _, cursor = await repo.get_page(q="milk", sort="relevance", limit=1)
+        with pytest.raises(CursorError):
+            await repo.get_page(q="buy", sort="relevance", cursor=cursor)
+
+    async def test_relevance_requires_query(self, session_with_texts: AsyncSession):
+        repo = TaskRepository(session_with_texts)
+        with pytest.raises(CursorError):
+            await repo.get_page(sort="relevance")
+
+    async def test_index_follows_writes(self, session_with_texts: AsyncSession):
+        repo = TaskRepository(session_with_texts)
+        await repo.update(5, title="Buy cheese")
+        await repo.soft_delete(1)
+        await session_with_texts.commit()
+
+        assert [t["id"] for t in (await repo.get_page(q="cheese"))[0]] == [5]
+        assert [t["id"] for t in (await repo.get_page(q="bread"))[0]] == []
+        assert [t["id"] for t in (await repo.get_page(q="buy"))[0]] == [2, 5]
+
+    async def test_query_without_words(self, session_with_texts: AsyncSession):
+        repo = TaskRepository(session_with_texts)
+        page, cursor = await repo.get_page(q='"*)(')
+        assert page == []
+        assert cursor is None
+
+
+class TestTaskRepositoryCreateMany:
+    """Tests for TaskRepository.create_many."""
+
+    async def test_create_many_preserves_order(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        rows = [{"title": f"T{i}", "status_id": 1, "priority_id": 2} for i in range(2500)]
+        tasks = await repo.create_many(rows)
+        assert [t.title for t in tasks] == [r["title"] for r in rows]
+        assert all(t.id is not None and t.created_at is not None for t in tasks)
+        assert len({t.id for t in tasks}) == 2500
+
+    async def test_create_many_empty(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        assert await repo.create_many([]) == []
+
+
+class TestTaskRepositoryUpdateMany:
+    """Tests for TaskRepository.update_many."""
+
+    async def test_update_many_by_ids(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        tasks = await repo.update_many({"title": "Same"}, ids=[1, 2, 3])
+        assert [t.id for t in tasks] == [1, 2]
+        assert (await repo.get_single(1)).title == "Same"
+
+    async def test_update_many_by_filter(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        tasks = await repo.update_many({"status_id": 3}, priority_id=2)
+        assert [t.id for t in tasks] == [2]
+        assert (await repo.get_single(1)).status_id == 1
+
+
+class TestTaskRepositorySoftDeleteMany:
+    """Tests for TaskRepository.soft_delete_many."""
+
+    async def test_soft_delete_many(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        assert await repo.soft_delete_many(ids=[2, 1, 3]) == [1, 2]
+        assert await repo.get_multi() == []
+
+    async def test_soft_delete_many_by_filter(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        assert await repo.soft_delete_many(status_id=2) == [2]
+
+
+class TestTaskRepositoryStreamBatches:
+    """Tests for TaskRepository.stream_batches."""
+
+    async def test_stream_in_batches(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        await repo.create_many([{"title": f"T{i}", "status_id": 1, "priority_id": 1} for i in range(5)])
+        batches = [batch async for batch in repo.stream_batches(batch_size=2)]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [row["title"] for batch in batches for row in batch] == [f"T{i}" for i in range(5)]
+
+    async def test_stream_filters(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        rows = [row async for batch in repo.stream_batches(priority_id=1) for row in batch]
+        assert [row["id"] for row in rows] == [1]
+
+
+class TestTaskRepositoryChanges:
+    """Tests for TaskRepository.get_changes (delta sync)."""
+
+    async def test_initial_sync_skips_deleted(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        rows, token, has_more = await repo.get_changes()
+        assert sorted(row["id"] for row in rows) == [1, 2]
+        assert token and not has_more
+
+    async def test_changes_since_token(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        _, token, _ = await repo.get_changes(settle=timedelta(0))
+
+        created = await repo.create(title="New", status_id=1, priority_id=1)
+        await repo.update(1, title="Changed")
+        await repo.soft_delete(2)
+        rows, token, _ = await repo.get_changes(since=token, settle=timedelta(0))
+        assert [row["id"] for row in rows] == [created.id, 1, 2]
+        assert rows[-1]["deleted_at"] is not None
+
+        rows, _, _ = await repo.get_changes(since=token, settle=timedelta(0))
+        assert rows == []
+
+    async def test_pages_with_has_more(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        await repo.create_many([{"title": f"T{i}", "status_id": 1, "priority_id": 1} for i in range(5)])
+
+        seen, token, has_more = [], None, True
+        while has_more:
+            rows, token, has_more = await repo.get_changes(since=token, limit=2, settle=timedelta(0))
+            seen.extend(row["id"] for row in rows)
+        assert len(seen) == 5 and len(set(seen)) == 5
+
+    async def test_recent_changes_repeat_within_settle_window(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        _, token, _ = await repo.get_changes()
+        await repo.update(1, title="Changed")
+
+        first, token, _ = await repo.get_changes(since=token)
+        second, _, _ = await repo.get_changes(since=token)
+        assert 1 in [row["id"] for row in first]
+        assert 1 in [row["id"] for row in second]
+
+    async def test_token_held_back_by_open_write(self, db_session_with_tasks: AsyncSession, monkeypatch):
+        """A write transaction still open keeps the token before its start."""
+        repo = TaskRepository(db_session_with_tasks)
+        started = datetime.now(timezone.utc) - timedelta(hours=1)
+
+        async def commit_horizon():
+            return started
+
+        monkeypatch.setattr(repo, "_commit_horizon", commit_horizon)
+        _, token, _ = await repo.get_changes(settle=timedelta(0))
+        # The long transaction commits a row stamped shortly after it began.
+        await db_session_with_tasks.execute(
+            update(TaskModel).where(TaskModel.id == 1).values(updated_at=started + timedelta(minutes=1))
+        )
+
+        rows, _, _ = await repo.get_changes(since=token, settle=timedelta(0))
+        assert 1 in [row["id"] for row in rows]
+
+    async def test_page_token_held_back_by_open_write(self, db_session_with_data: AsyncSession, monkeypatch):
+        """A page ending after the horizon does not move the token past it."""
+        repo = TaskRepository(db_session_with_data)
+        _, token, _ = await repo.get_changes(settle=timedelta(0))
+        await repo.create_many([{"title": f"T{i}", "status_id": 1, "priority_id": 1} for i in range(5)])
+        started = datetime.now(timezone.utc) - timedelta(hours=1)
+
+        async def commit_horizon():
+            return started
+
+        monkeypatch.setattr(repo, "_commit_horizon", commit_horizon)
+        first, next_token, has_more = await repo.get_changes(since=token, limit=2, settle=timedelta(0))
+        assert len(first) == 2 and not has_more
+
+        second, _, _ = await repo.get_changes(since=next_token, limit=2, settle=timedelta(0))
+        assert [row["id"] for row in second] == [row["id"] for row in first]
+
+    async def test_changes_stamped_by_database_clock(self, db_session_with_tasks: AsyncSession):
+        """Writes and tokens share the database clock, so a fresh write is after the token."""
+        repo = TaskRepository(db_session_with_tasks)
+        _, token, _ = await repo.get_changes(settle=timedelta(0))
+        task = await repo.update(1, title="Changed")
+        updated_at = task.updated_at.replace(tzinfo=timezone.utc)
+        assert repo._decode_change_token(token)[0] <= updated_at <= await repo._commit_horizon()
+
+    async def test_invalid_token(self, db_session_with_tasks: AsyncSession):
+        repo = TaskRepository(db_session_with_tasks)
+        _, cursor = await repo.get_page(limit=1)
+        with pytest.raises(CursorError):
+            await repo.get_changes(since=cursor)
+        with pytest.raises(CursorError):
+            await repo.get_changes(since="garbage")
+
+
+class TestTableVersionRepository:
+    """Tests for TableVersionRepository and version bumps on task writes."""
+
+    async def test_unknown_table_is_zero(self, db_session: AsyncSession):
+        repo = TableVersionRepository(db_session)
+        assert await repo.get_version("tasks") == 0
+
+    async def test_bump(self, db_session: AsyncSession):
+        repo = TableVersionRepository(db_session)
+        await repo.bump("tasks")
+        await repo.bump("tasks")
+        assert await repo.get_version("tasks") == 2
+        assert await repo.get_version("other") == 0
+
+    async def test_writers_use_separate_shards(self, db_session: AsyncSession, async_engine):
+        """Sessions bump their own shard row; the version counts all of them."""
+        repo = TableVersionRepository(db_session)
+        db_session.info["table_version_shard"] = 0
+        await repo.bump("tasks")
+        await db_session.commit()
+        async with async_sessionmaker(async_engine)() as other:
+            other.info["table_version_shard"] = 5
+            await TableVersionRepository(other).bump("tasks")
+            await other.commit()
+
+        rows = (await db_session.execute(select(TableVersionModel.table_name, TableVersionModel.version))).all()
+        assert sorted(rows) == [("tasks", 1), ("tasks#5", 1)]
+        assert await repo.get_version("tasks") == 2
+
+    async def test_task_writes_bump_version(self, db_session_with_tasks: AsyncSession):
+        versions = TableVersionRepository(db_session_with_tasks)
+        repo = TaskRepository(db_session_with_tasks)
+
+        await repo.create(title="New", status_id=1, priority_id=1)
+        await repo.create_many([{"title": "Bulk", "status_id": 1, "priority_id": 1}])
+        await repo.update(1, title="Changed")
+        await repo.update_many({"title": "Bulk changed"}, ids=[1, 2])
+        await repo.soft_delete(1)
+        await repo.soft_delete_many(ids=[2])
+        assert await versions.get_version("tasks") == 6
+
+    async def test_noop_writes_keep_version(self, db_session_with_tasks: AsyncSession):
+        versions = TableVersionRepository(db_session_with_tasks)
+        repo = TaskRepository(db_session_with_tasks)
+
+        await repo.update(999, title="Missing")
+        await repo.update_many({"title": "x"}, ids=[999])
+        await repo.soft_delete(3)
+        await repo.soft_delete_many(ids=[3])
+        assert await versions.get_version("tasks") == 0
+
+
+class TestTaskCounters:
+    """Tests for counters maintained by TaskRepository writes."""
+
+    @staticmethod
+    async def counts(session: AsyncSession) -> dict:
+        return await TaskCounterRepository(session).get_counts()
+
+    async def test_create_counts(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        await repo.create(title="A", status_id=1, priority_id=2)
+        await repo.create_many([
+            {"title": "B", "status_id": 1, "priority_id": 2},
+            {"title": "C", "status_id": 2, "priority_id": 3},
+        ])
+        assert await self.counts(db_session_with_data) == {(1, 2): 2, (2, 3): 1}
+
+    async def test_status_change_moves_count(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        task = await repo.create(title="A", status_id=1, priority_id=2)
+        await repo.update(task.id, status_id=3)
+        assert await self.counts(db_session_with_data) == {(3, 2): 1}
+
+    async def test_other_fields_keep_count(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        task = await repo.create(title="A", status_id=1, priority_id=2)
+        await repo.update(task.id, title="B")
+        await repo.update(999, status_id=3)
+        assert await self.counts(db_session_with_data) == {(1, 2): 1}
+
+    async def test_update_many_moves_counts(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        await repo.create_many([{"title": f"T{i}", "status_id": i % 2 + 1, "priority_id": 1} for i in range(4)])
+        await repo.update_many({"priority_id": 3}, status_id=1)
+        assert await self.counts(db_session_with_data) == {(1, 3): 2, (2, 1): 2}
+
+    async def test_soft_delete_uncounts(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        tasks = await repo.create_many([{"title": f"T{i}", "status_id": 1, "priority_id": 1} for i in range(3)])
+        await repo.soft_delete(tasks[0].id)
+        await repo.soft_delete(tasks[0].id)
+        await repo.soft_delete_many(ids=[tasks[1].id])
+        assert await self.counts(db_session_with_data) == {(1, 1): 1}
+
+    async def test_hard_delete_of_deleted_task(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        tasks = await repo.create_many([{"title": f"T{i}", "status_id": 1, "priority_id": 1} for i in range(2)])
+        await repo.soft_delete(tasks[0].id)
+        await repo.delete(tasks[0].id)
+        await repo.delete(tasks[1].id)
+        assert await self.counts(db_session_with_data) == {}
+
+    async def test_reconcile_repairs_drift(self, db_session_with_data: AsyncSession):
+        repo = TaskRepository(db_session_with_data)
+        await repo.create(title="A", status_id=1, priority_id=1)
+        # Written around the repository, so not counted.
+        db_session_with_data.add(TaskModel(title="B", status_id=2, priority_id=2))
+        await TaskCounterRepository(db_session_with_data).apply(Counter({(3, 3): 5}))
+        await db_session_with_data.flush()
+
+        drift = await TaskCounterRepository(db_session_with_data).reconcile()
+        assert drift == {(2, 2): (0, 1), (3, 3): (5, 0)}
+        assert await self.counts(db_session_with_data) == {(1, 1): 1, (2, 2): 1}
+        assert await TaskCounterRepository(db_session_with_data).reconcile() == {}
@@ -101,6 +101,11 @@ class TestTaskCreate:
         schema = TaskCreate(title="New Task", description="Desc")
         assert schema.description == "Desc"
 
+    def test_title_too_long_raises(self):
+        """Title longer than the column limit raises ValidationError."""
+        with pytest.raises(ValidationError):
+            TaskCreate(title="x" * 256)
+
 
 class TestTaskUpdate:
     """Tests for TaskUpdate schema."""
@@ -151,6 +156,7 @@ class TestTaskResponse:
             start_time=now,
             end_time=now,
             created_at=now,
+            updated_at=now,
             deleted_at=None,
         )
         assert schema.id == 1
@@ -169,6 +175,7 @@ class TestTaskResponse:
             start_time=now,
             end_time=now,
             created_at=now,
+            updated_at=now,
             deleted_at=now,
         )
         assert schema.deleted_at == now
@@ -186,6 +193,7 @@ class TestTaskResponse:
             start_time = now
             end_time = now
             created_at = now
+            updated_at = now
             deleted_at = None
 
         schema = TaskResponse.model_validate(FakeTask())
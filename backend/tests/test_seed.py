@@ -0,0 +1,63 @@
+"""Tests for app.seed module."""
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.metrics import record_startup
+from app.models import TaskStatus as TaskStatusModel
+from app.repositories import AppStateRepository
+from app.seed import SEED_VERSION_KEY, load_json, schema_head, seed_all, seed_version
+
+
+@pytest.fixture
+def session_maker(async_engine):
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+class TestSeedAll:
+    """Tests for startup seeding."""
+
+    async def test_seeds_and_records_version(self, session_maker):
+        assert await seed_all("auto", session_maker) is True
+        async with session_maker() as session:
+            titles = (await session.scalars(select(TaskStatusModel.title).order_by(TaskStatusModel.id))).all()
+            assert titles == [row["title"] for row in load_json("statuses.json")]
+            assert await AppStateRepository(session).get(SEED_VERSION_KEY) == seed_version()
+
+    async def test_current_version_is_one_query(self, session_maker, async_engine, query_budget):
+        async with async_engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            await conn.execute(text("INSERT INTO alembic_version VALUES (:head)"), {"head": schema_head()})
+        await seed_all("auto", session_maker)
+
+        with query_budget(1):
+            assert await seed_all("auto", session_maker) is False
+
+    async def test_keeps_existing_rows(self, session_maker):
+        async with session_maker() as session:
+            session.add(TaskStatusModel(id=1, title="Renamed"))
+            await session.commit()
+
+        await seed_all("always", session_maker)
+        async with session_maker() as session:
+            assert (await session.get(TaskStatusModel, 1)).title == "Renamed"
+            assert len((await session.scalars(select(TaskStatusModel))).all()) == len(load_json("statuses.json"))
+
+    async def test_changed_seed_reseeds(self, session_maker):
+        async with session_maker() as session:
+            await AppStateRepository(session).set(SEED_VERSION_KEY, "outdated")
+            await session.commit()
+        assert await seed_all("auto", session_maker) is True
+
+    async def test_never(self, session_maker):
+        assert await seed_all("never", session_maker) is False
+        async with session_maker() as session:
+            assert (await session.scalars(select(TaskStatusModel))).all() == []
+
+
+def test_record_startup():
+    elapsed = record_startup()
+    assert elapsed > 0
+    assert REGISTRY.get_sample_value("app_startup_seconds") == elapsed
@@ -0,0 +1,176 @@
+"""Tests for the slow query log."""
+
+import logging
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import SlowQuerySettings
+from app.database import Base
+from app.metrics import QueryStats, current_query_stats, instrument_queries
+from app.models import Task as TaskModel
+from app.slow_queries import SlowQueryLog, explain_sql, format_parameters
+
+LOGGER = "app.slow_queries"
+
+
+@pytest.fixture
+async def file_engine(tmp_path):
+    """SQLite file database, so EXPLAIN can run on a second connection."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'slow.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+def slow_records(caplog) -> list[logging.LogRecord]:
+    return [record for record in caplog.records if record.name == LOGGER]
+
+
+class TestSlowQueryLog:
+    """Tests for SlowQueryLog."""
+
+    async def test_logs_parameters_and_plan(self, file_engine, caplog):
+        log = SlowQueryLog(SlowQuerySettings(threshold_ms=0))
+        log.instrument(file_engine)
+
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            async with file_engine.connect() as conn:
+                await conn.execute(select(TaskModel.id).where(TaskModel.status_id == 2))
+            await log.drain()
+
+        [record] = slow_records(caplog)
+        entry = record.slow_query
+        assert entry["route"] == "-"
+        assert "FROM tasks" in entry["statement"]
+        assert "2" in entry["parameters"]
+        assert "tasks" in entry["plan"]
+        assert "plan:" in record.getMessage()
+
+    async def test_explain_not_counted_in_request_stats(self, file_engine, caplog):
+        """The EXPLAIN runs outside the request's QueryStats."""
+        instrument_queries(file_engine)
+        log = SlowQueryLog(SlowQuerySettings(threshold_ms=0))
+        log.instrument(file_engine)
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        try:
+            with caplog.at_level(logging.WARNING, logger=LOGGER):
+                async with file_engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                await log.drain()
+        finally:
+            current_query_stats.reset(token)
+
+        assert stats.statements == 1
+        assert slow_records(caplog)[0].slow_query["plan"] is not None
+
+    async def test_cancelled_explain_frees_slot(self, file_engine):
+        """A cancelled EXPLAIN task does not block later ones."""
+        log = SlowQueryLog(SlowQuerySettings(threshold_ms=0))
+        log.instrument(file_engine)
+        async with file_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        for task in list(log._tasks):
+            task.cancel()
+        await log.drain()
+        assert not log._explain_running
+
+    async def test_fast_queries_not_logged(self, file_engine, caplog):
+        log = SlowQueryLog(SlowQuerySettings(threshold_ms=10_000))
+        log.instrument(file_engine)
+
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            async with file_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            await log.drain()
+
+        assert slow_records(caplog) == []
+
+    async def test_rate_limited(self, file_engine, caplog):
+        log = SlowQueryLog(SlowQuerySettings(threshold_ms=0, max_per_minute=2, explain=False))
+        log.instrument(file_engine)
+
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            async with file_engine.connect() as conn:
+                for _ in range(5):
+                    await conn.execute(text("SELECT 1"))
+            log._window_started -= 60
+            async with file_engine.connect() as conn:
+                await conn.execute(text("SELECT 2"))
+
+        records = slow_records(caplog)
+        assert len(records) == 3
+        assert records[2].slow_query["suppressed"] == 3
+        assert "3 more not logged" in records[2].getMessage()
+
+    async def test_sampled_out(self, file_engine, caplog):
+        log = SlowQueryLog(SlowQuerySettings(threshold_ms=0, sample_rate=0))
+        log.instrument(file_engine)
+
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            async with file_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        assert slow_records(caplog) == []
+
+    async def test_route_attributed(self, client_with_tasks, async_engine, caplog):
+        # The in-memory test database has a single connection, so no EXPLAIN here.
+        log = SlowQueryLog(SlowQuerySettings(threshold_ms=0, max_per_minute=100, explain=False))
+        log.instrument(async_engine)
+
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            response = await client_with_tasks.get("/api/tasks/1")
+        assert response.status_code == 200
+
+        routes = {record.slow_query["route"] for record in slow_records(caplog)}
+        assert routes == {"GET /api/tasks/{task_id}"}
+
+    async def test_disabled(self, file_engine, caplog):
+        log = SlowQueryLog(SlowQuerySettings(enabled=False, threshold_ms=0))
+        log.instrument(file_engine)
+
+        with caplog.at_level(logging.WARNING, logger=LOGGER):
+            async with file_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        assert slow_records(caplog) == []
+
+
+class TestExplainSql:
+    """Tests for choosing the EXPLAIN form."""
+
+    @pytest.mark.parametrize(
+        ("statement", "expected"),
+        [
+            ("SELECT * FROM tasks WHERE id = $1", "EXPLAIN (ANALYZE, BUFFERS) SELECT"),
+            ("WITH t AS (SELECT 1) SELECT * FROM t", "EXPLAIN (ANALYZE, BUFFERS) WITH"),
+            ("SELECT id FROM tasks FOR UPDATE SKIP LOCKED", "EXPLAIN SELECT"),
+            ("UPDATE tasks SET title = $1", "EXPLAIN UPDATE"),
+            ("WITH moved AS (DELETE FROM tasks RETURNING *) SELECT * FROM moved", "EXPLAIN WITH"),
+            ("SELECT updated_at FROM tasks", "EXPLAIN (ANALYZE, BUFFERS) SELECT"),
+        ],
+    )
+    def test_postgresql(self, statement, expected):
+        assert explain_sql("postgresql", statement).startswith(expected)
+
+    def test_sqlite(self):
+        assert explain_sql("sqlite", "DELETE FROM tasks") == "EXPLAIN QUERY PLAN DELETE FROM tasks"
+
+    @pytest.mark.parametrize(
+        ("dialect", "statement"),
+        [
+            ("postgresql", "COMMIT"),
+            ("postgresql", "SET LOCAL statement_timeout = 1"),
+            ("mysql", "SELECT 1"),
+        ],
+    )
+    def test_not_explained(self, dialect, statement):
+        assert explain_sql(dialect, statement) is None
+
+
+def test_format_parameters_truncates():
+    assert format_parameters(("x" * 50, 1), False, 10) == "('xxxxxxxxx..., 1)"
+    assert format_parameters([(1,), (2,)], True, 10) == "2 sets, first (1)"